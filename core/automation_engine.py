@@ -0,0 +1,517 @@
+# core/automation_engine.py
+import time
+import traceback
+import os
+import threading
+from .startup_planner import StartupPlanner
+from .phase_timer import PromptPhaseTimer, PHASE_INTER_PROMPT_PAUSE, PHASE_RENDER_WAIT
+from .metrics import PROMPTS_TOTAL, PROMPT_RETRIES_TOTAL, VPN_CONNECTS_TOTAL
+from .iteration_profiler import IterationProfiler
+from .network_health_monitor import NetworkHealthMonitor
+from .session_recorder import SessionRecorder
+from .browser_manager import READY_PAGE_LOADED
+
+
+class InterruptedByUserError(Exception):
+    """Egyedi kivétel a felhasználói megszakítás jelzésére."""
+    pass
+
+class PromptLoadError(Exception):
+    """A promptok betöltése sikertelen (üres vagy hibás fájl, érvénytelen tartomány)."""
+    pass
+
+
+# A futás kimenetele; a fej nélküli (batch) belépési pont ebből képzi a kilépési kódot.
+OUTCOME_COMPLETED = "completed"
+OUTCOME_PARTIAL = "partial"
+OUTCOME_PROMPT_LOAD_FAILED = "prompt_load_failed"
+OUTCOME_BROWSER_FAILED = "browser_failed"
+OUTCOME_PAGE_SETUP_FAILED = "page_setup_failed"
+OUTCOME_INTERRUPTED = "interrupted"
+OUTCOME_CRASHED = "crashed"
+
+
+class EngineEvents:
+    """
+    Az AutomationEngine eseményeinek fogadója. Az alapértelmezett megvalósítás
+    a konzolra ír; a Qt-s AutomationWorker signálokká, a batch futtató JSON sorokká alakítja őket.
+    """
+    def status(self, message, is_error=False):
+        print(f"[AutomationEngine]: {message}")
+
+    def progress(self, current_step, total_steps):
+        pass
+
+    def image_count(self, current_image, total_images):
+        pass
+
+    def image_downloaded(self, prompt_line_no, file_path):
+        pass
+
+    def prompt_finished(self, prompt_line_no, outcome, duration_s, render_wait_s, remaining):
+        """Egy prompt lezárult (a szünettel együtt mért idővel); a hátralévő promptok számával az ETA-hoz."""
+        pass
+
+    def finished(self, summary_message):
+        print(f"[AutomationEngine] Befejezve: {summary_message}")
+
+    def show_overlay(self):
+        pass
+
+    def hide_overlay(self):
+        pass
+
+
+class AutomationEngine:
+    """
+    A teljes automatizálási folyamat (promptok betöltése, VPN, böngésző, oldal előkészítés,
+    prompt ciklus) Qt-tól független megvalósítása.
+
+    A controller objektumtól a következőket várja: prompt_handler, gui_automator,
+    vpn_manager, browser_manager attribútumok és _stop_requested_by_user jelző
+    (ezt a ProcessController és a fej nélküli HeadlessController is biztosítja).
+    """
+    def __init__(self, controller, prompt_file_path, start_line, end_line, events=None,
+                 use_vpn=True, target_vpn_server_group="Singapore", target_vpn_country_code="SG",
+                 inter_prompt_pause_s=2):
+        self.pc_ref = controller
+        self.prompt_file_path = prompt_file_path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.events = events or EngineEvents()
+        self.use_vpn = use_vpn
+        self.target_vpn_server_group = target_vpn_server_group
+        self.target_vpn_country_code = target_vpn_country_code
+        self.inter_prompt_pause_s = inter_prompt_pause_s
+
+        self.is_running = False
+        self._stop_requested_by_main = False    # Kemény stop kérés
+        self._is_paused = False
+        self._pause_event = threading.Event()
+        self._pause_event.set()
+        self._network_ok_event = threading.Event()  # A NetworkHealthMonitor törli, amíg újracsatlakozik
+        self._network_ok_event.set()
+        self.network_monitor = None
+        self._startup_planner = None
+
+        self.outcome = None
+        self.retry_queue = []   # (sorszám, prompt) párok, amelyek képét az ellenőrzés visszautasította
+        self.phase_timer = PromptPhaseTimer(enabled=False)
+        self.iteration_profiler = None  # Csak a settings.json "iteration_profiler" szakaszával kapcsolható be
+        self.session_recorder = None    # Csak a settings.json "session_recorder" szakaszával kapcsolható be
+        self.prompts_processed_count = 0
+        self.total_prompts_to_process = 0
+
+        if hasattr(self.pc_ref.gui_automator, 'stop_requested'):
+            self.pc_ref.gui_automator.stop_requested = False
+
+    @property
+    def is_paused(self):
+        return self._is_paused
+
+    def check_pause_and_stop(self):
+        if self._stop_requested_by_main:
+            self.events.status("Worker: Kemény stop kérés feldolgozva a _check_pause_and_stop-ban.", False)
+            raise InterruptedByUserError("Kemény stop kérés.")
+
+        if self._is_paused:
+            current_thread_id = threading.get_ident()
+            self.events.status(f"Automatizálás szünetel (Worker szál: {current_thread_id}). Várakozás... Numpad 0 a folytatáshoz.", False)
+            print(f"Worker DBG (szál: {current_thread_id}): Állapot SZÜNETEL. _is_paused={self._is_paused}. _pause_event.wait() hívás...")
+            self._pause_event.wait()
+            print(f"Worker DBG (szál: {current_thread_id}): Szüneteltetés feloldva, _pause_event.wait() visszatért. _is_paused={self._is_paused}")
+
+        if not self._network_ok_event.is_set():
+            self.events.status("Worker: Hálózati hiba, várakozás az újracsatlakozásra...", False)
+            self._network_ok_event.wait()
+
+        if self._stop_requested_by_main:
+            self.events.status("Worker: Kemény stop kérés feldolgozva szünet után.", False)
+            raise InterruptedByUserError("Megszakítva szüneteltetés feloldása után (kemény stop).")
+
+    def request_hard_stop(self):
+        self.events.status("Worker: Kemény leállítási kérelem fogadva.", False)
+        print("Worker DBG: request_hard_stop hívva.")
+        self._stop_requested_by_main = True
+        if hasattr(self.pc_ref.gui_automator, 'request_stop'):
+            self.pc_ref.gui_automator.request_stop()
+
+        if self._is_paused:
+            self._is_paused = False
+            self._pause_event.set()
+            print("Worker DBG: Szüneteltetés feloldva kemény stop miatt.")
+        self._network_ok_event.set()
+
+    def suspend_for_network(self, reason):
+        """A NetworkHealthMonitor hívja: a worker a következő check_pause_and_stop()-nál megáll."""
+        self._network_ok_event.clear()
+        self.events.status(f"Worker: {reason}. Feldolgozás felfüggesztve az újracsatlakozásig.", True)
+
+    def resume_after_network(self):
+        self._network_ok_event.set()
+
+    def _network_incident_count(self):
+        return self.network_monitor.incident_count if self.network_monitor else 0
+
+    def _start_session_recording(self):
+        self.session_recorder = SessionRecorder.from_settings(
+            self.phase_timer.run_id, notify_callback=lambda msg: self.events.status(f"Worker: {msg}", False))
+        if not self.session_recorder:
+            return
+        gui_automator = self.pc_ref.gui_automator
+        store = getattr(gui_automator, 'coordinate_store', None)
+        metadata = {"run_id": self.phase_timer.run_id, "start_line": self.start_line,
+                    "coordinates": dict(getattr(gui_automator, 'coordinates', {})),
+                    "signatures": dict(store.signatures) if store else {},
+                    "profile_key": store.profile_key if store else None}
+        if not self.session_recorder.install(metadata):
+            self.session_recorder = None
+
+    def _start_network_monitor(self):
+        vpn_manager = self.pc_ref.vpn_manager
+        if not self.use_vpn or not vpn_manager or not getattr(vpn_manager, 'is_connected_to_target_server', False):
+            return
+        self.network_monitor = NetworkHealthMonitor.from_settings(
+            self, vpn_manager, notify_callback=lambda msg, is_error=False: self.events.status(f"Worker: {msg}", is_error))
+        if self.network_monitor:
+            self.network_monitor.start()
+
+    def _stop_network_monitor(self):
+        if self.network_monitor:
+            self.network_monitor.stop()
+        self._network_ok_event.set()
+
+    def toggle_pause_resume(self):
+        current_thread_id = threading.get_ident()
+        print(f"Worker DBG (szál: {current_thread_id}): toggle_pause_resume HÍVVA. Jelenlegi _is_paused: {self._is_paused}, is_running: {self.is_running}")
+
+        if not self.is_running:
+            self.events.status("Worker: Nincs futó feladat, amit szüneteltetni/folytatni lehetne.", True)
+            return
+
+        if self._is_paused:
+            self._is_paused = False
+            self._pause_event.set()
+            self.events.status("Automatizálás folytatva.", False)
+        else:
+            self._is_paused = True
+            self._pause_event.clear()
+            self.events.status("Automatizálás szüneteltetve. Numpad 0 a folytatáshoz.", False)
+
+    # --- Indítási fázisok (a StartupPlanner saját szálain futnak) ---
+    def _startup_load_prompts(self):
+        self.check_pause_and_stop()
+        self.events.status(f"Worker: Promptok betöltése: '{os.path.basename(self.prompt_file_path)}'", False)
+        prompts = self.pc_ref.prompt_handler.load_prompts(self.prompt_file_path, self.start_line, self.end_line)
+        if not prompts:
+            raise PromptLoadError(self.prompt_file_path)
+        total = len(prompts)
+        self.events.status(f"Worker: {total} prompt betöltve.", False)
+        self.events.progress(0, total)
+        self.events.image_count(0, total)
+        return prompts
+
+    def _startup_warm_up_ocr(self):
+        gui_automator = self.pc_ref.gui_automator
+        if gui_automator and hasattr(gui_automator, 'warm_up_ocr'):
+            return gui_automator.warm_up_ocr()
+        return False
+
+    def _startup_prepare_network(self):
+        """IP ellenőrzés és szükség esetén VPN csatlakozás. True, ha a hálózat a célországban van (vagy feltételezhetően ott lesz)."""
+        if not self.use_vpn:
+            self.events.status("Worker: VPN lépés kikapcsolva, kihagyva.", False)
+            return True
+
+        vpn_manager = self.pc_ref.vpn_manager
+        target_vpn_server_group = self.target_vpn_server_group
+        target_vpn_country_code = self.target_vpn_country_code
+
+        from utils.ip_geolocation import get_public_ip_info  # 'requests' csak itt kell
+
+        self.check_pause_and_stop()
+        if vpn_manager and hasattr(vpn_manager, 'try_reuse_connection') and \
+           vpn_manager.try_reuse_connection(target_vpn_server_group, target_vpn_country_code):
+            self.events.status("Worker: Az előző futás VPN kapcsolata újrahasznosítva.", False)
+            return True
+
+        self.check_pause_and_stop()
+        self.events.status("Worker: IP ellenőrzés VPN előtt...", False)
+        current_ip_info_before_vpn = get_public_ip_info()
+        if current_ip_info_before_vpn and current_ip_info_before_vpn.get('country_code') == target_vpn_country_code.upper():
+            self.events.status(f"Worker: Már a célországban ({target_vpn_country_code}). VPN kihagyva.", False)
+            return True
+
+        self.check_pause_and_stop()
+        if self._startup_phase_failed("prompts"):
+            return False  # A futás úgyis leáll; nem csatlakozunk feleslegesen
+        if vpn_manager and vpn_manager.nordvpn_executable_path:
+            self.events.status(f"Worker: VPN kapcsolat ({target_vpn_server_group})...", False)
+            if vpn_manager.connect_to_server(target_vpn_server_group, target_vpn_country_code):
+                VPN_CONNECTS_TOTAL.inc(result="ok")
+                if not self.pc_ref._stop_requested_by_user:
+                    self.events.status("Worker: VPN csatlakozás sikeresnek tűnik.", False)
+                return True
+            VPN_CONNECTS_TOTAL.inc(result="failed")
+            if not self.pc_ref._stop_requested_by_user:
+                self.events.status("Worker Figyelmeztetés: VPN csatlakozás sikertelennek tűnik.", True)
+        elif not vpn_manager:
+            self.events.status("Worker Hiba: VPN Manager nincs inicializálva.", True)
+        else:
+            self.events.status("Worker Hiba: NordVPN végrehajtható nem található, VPN kihagyva.", True)
+        return False
+
+    def _startup_open_browser(self):
+        browser_manager = self.pc_ref.browser_manager
+        self.check_pause_and_stop()
+        if not browser_manager or self._startup_phase_failed("prompts"):
+            return False
+        self.events.status("Worker: Böngésző indítása...", False)
+        if not browser_manager.open_target_url():
+            if not self._stop_requested_by_main:
+                self.events.status("Worker Hiba: Böngésző megnyitása sikertelen.", True)
+            return False
+
+        self.events.show_overlay()
+        if getattr(browser_manager, 'attached_to_existing_window', False):
+            # A meglévő ablak már betöltött; a page_is_prepared megmarad, ha az eszköz még látható.
+            self.events.status("Worker: Meglévő böngészőablak használata, várakozás kihagyva.", False)
+            return True
+        gui_automator = self.pc_ref.gui_automator
+        if hasattr(gui_automator, 'page_is_prepared'): gui_automator.page_is_prepared = False  # Új lap: újra elő kell készíteni
+        timeout_s = getattr(browser_manager, 'ready_timeout_s', 45)
+        self.events.status(f"Worker: Várakozás a böngésző betöltődésére (max {timeout_s}s)...", False)
+        started = time.monotonic()
+        ready_state = browser_manager.wait_until_ready(timeout_s, page_loaded_check=getattr(gui_automator, 'is_page_loaded', None),
+                                                       tick=self.check_pause_and_stop)
+        elapsed_s = time.monotonic() - started
+        if ready_state == READY_PAGE_LOADED:
+            self.events.status(f"Worker: Böngésző betöltődött ({elapsed_s:.1f}s).", False)
+        else:
+            # Nem végzetes: az oldal előkészítése a saját OCR keresésével még megpróbálja.
+            self.events.status(f"Worker Figyelmeztetés: A betöltődés nem volt igazolható {elapsed_s:.0f}s alatt ({ready_state}), folytatás.", True)
+        return True
+
+    def _startup_prepare_page(self):
+        gui_automator = self.pc_ref.gui_automator
+        if not gui_automator or not self._startup_planner or not self._startup_planner.result("browser"):
+            return False
+        self.check_pause_and_stop()
+        self.events.status("Worker: Oldal előkészítése (PyAutoGUI)...", False)
+        if gui_automator.initial_page_setup():
+            self.events.status("Worker: Oldal előkészítve.", False)
+            return True
+        if not self.pc_ref._stop_requested_by_user and not gui_automator.stop_requested:
+            self.events.status("Worker Hiba: Oldal előkészítése sikertelen.", True)
+        return False
+
+    def _startup_phase_failed(self, name):
+        """A párhuzamos fázisokból: True, ha a megnevezett fázis már hibával véget ért."""
+        phase = self._startup_planner.phases.get(name) if self._startup_planner else None
+        return bool(phase and phase.error is not None)
+
+    def _run_startup_phases(self):
+        # Indítási fázisok párhuzamosan: a promptok betöltése, az OCR bemelegítése és a hálózati (VPN)
+        # lépés azonnal indul, a böngésző a hálózati lépés után, az oldal előkészítése pedig amikor
+        # a böngésző és az OCR is kész.
+        planner = StartupPlanner(notify_callback=lambda msg: self.events.status(f"Worker: {msg}", False))
+        self._startup_planner = planner
+        planner.add_phase("prompts", self._startup_load_prompts)
+        planner.add_phase("ocr_warmup", self._startup_warm_up_ocr)
+        planner.add_phase("network", self._startup_prepare_network)
+        planner.add_phase("browser", self._startup_open_browser, depends_on=("network",))
+        planner.add_phase("page_setup", self._startup_prepare_page, depends_on=("browser", "ocr_warmup"))
+        try:
+            planner.run()
+        finally:
+            report = planner.report()
+            print(f"AutomationWorker DBG: {report}")
+            self.events.status(f"Worker: {report}", False)
+        return planner
+
+    def _finish(self, outcome, summary_message):
+        self.outcome = outcome
+        self.events.finished(summary_message)
+
+    def run(self):
+        """
+        Lefuttatja a teljes folyamatot a hívó szálán. A futás végén az `outcome`
+        attribútum a kimenetelt tartalmazza (OUTCOME_* konstansok).
+        """
+        if self.is_running:
+            self.events.status("Worker: run_automation_task már fut, új hívás figyelmen kívül hagyva.", True)
+            return self.outcome
+
+        current_thread_id = threading.get_ident()
+        print(f"AutomationWorker DBG: run_automation_task elindult a worker szálon (ID: {current_thread_id}).")
+
+        self.is_running = True
+        self._stop_requested_by_main = False
+        self._is_paused = False
+        self._pause_event.set()
+        self.outcome = None
+
+        gui_automator = self.pc_ref.gui_automator
+        if hasattr(gui_automator, 'stop_requested'): gui_automator.stop_requested = False
+        if hasattr(gui_automator, 'output_checker'): gui_automator.output_checker.reset()
+        self.retry_queue = []
+        self.phase_timer = getattr(gui_automator, 'phase_timer', None) or self.phase_timer
+        self.phase_timer.new_run()
+        self.iteration_profiler = IterationProfiler.from_settings(
+            notify_callback=lambda msg: self.events.status(f"Worker: {msg}", False))
+        if self.iteration_profiler:
+            self.iteration_profiler.new_run(self.phase_timer.run_id)
+        self._start_session_recording()
+
+        self.events.status("Worker: Folyamat indítása...", False)
+        self.prompts_processed_count = 0
+        self.total_prompts_to_process = 0
+
+        try:
+            self.check_pause_and_stop()
+            planner = self._run_startup_phases()
+
+            prompts = planner.result("prompts")
+            self.total_prompts_to_process = len(prompts)
+            browser_opened_successfully = planner.result("browser")
+            initial_gui_setup_success = planner.result("page_setup")
+
+            self.check_pause_and_stop()
+            if not browser_opened_successfully:
+                self._finish(OUTCOME_BROWSER_FAILED, "Böngészőhiba")
+                return self.outcome
+
+            self.check_pause_and_stop()
+            if not initial_gui_setup_success:
+                self._finish(OUTCOME_PAGE_SETUP_FAILED, "PyAutoGUI előkészítési hiba")
+                return self.outcome
+
+            self._start_network_monitor()
+            self._run_prompt_loop(prompts)
+            self._run_retry_pass()
+
+            self.check_pause_and_stop()
+            summary_msg = f"Feldolgozva: {self.prompts_processed_count}/{self.total_prompts_to_process}."
+            outcome = OUTCOME_COMPLETED if self.prompts_processed_count == self.total_prompts_to_process else OUTCOME_PARTIAL
+            self._finish(outcome, summary_msg)
+
+        except PromptLoadError:
+            self.events.status("Worker Hiba: Nem sikerült promptokat betölteni.", True)
+            self._finish(OUTCOME_PROMPT_LOAD_FAILED, "Sikertelen prompt betöltés")
+        except InterruptedByUserError as e:
+            self.events.status(f"Worker: Folyamat megszakítva - {e}", False)
+            self._finish(OUTCOME_INTERRUPTED, f"Felhasználó által megszakítva/leállítva. Feldolgozva: {self.prompts_processed_count}/{self.total_prompts_to_process}.")
+        except Exception as e:
+            error_msg = f"Worker Kritikus Hiba: {e}"
+            self.events.status(error_msg, True)
+            print(f"WORKER KRITIKUS HIBA: {e}\n{traceback.format_exc()}")
+            self._finish(OUTCOME_CRASHED, "Kritikus hiba történt a workerben.")
+        finally:
+            print(f"AutomationWorker DBG: run_automation_task finally blokk. is_running -> False")
+            self.is_running = False
+            self._is_paused = False
+            self._pause_event.set()
+            self._stop_network_monitor()
+            self.phase_timer.end_prompt("interrupted")  # Csak ha egy prompt mérése félbeszakadt
+            if self.iteration_profiler:
+                self.iteration_profiler.close()
+            if self.session_recorder:
+                self.session_recorder.close()
+                self.session_recorder = None
+            self.events.hide_overlay()
+        return self.outcome
+
+    def _run_prompt_loop(self, prompts):
+        total_prompts_to_process = self.total_prompts_to_process
+
+        self.events.status("Worker: Promptok feldolgozásának indítása...", False)
+        for i, prompt_text in enumerate(prompts):
+            self.check_pause_and_stop()
+
+            current_prompt_no = self.start_line + i
+            self.events.status(f"Worker: Feldolgozás: Prompt #{current_prompt_no} ({i+1}/{total_prompts_to_process})", False)
+            self.events.image_count(i + 1, total_prompts_to_process)
+
+            self.phase_timer.begin_prompt(current_prompt_no)
+            if self.iteration_profiler:
+                self.iteration_profiler.begin(i, current_prompt_no)
+            prompt_ok = self._process_prompt(current_prompt_no, prompt_text, allow_requeue=True)
+            if self.iteration_profiler:
+                self.iteration_profiler.end()
+
+            self.check_pause_and_stop()
+
+            if i < total_prompts_to_process - 1:
+                self._inter_prompt_pause()
+            self._end_prompt_timing(current_prompt_no, prompt_ok,
+                                    remaining=total_prompts_to_process - (i + 1) + len(self.retry_queue))
+
+    def _run_retry_pass(self):
+        """A visszautasított (üres/duplikált/hibakártya) kimenetű és a hálózati kiesés alatt elbukott promptok egyszeri újrafuttatása a futás végén."""
+        if not self.retry_queue:
+            return
+        retries, self.retry_queue = self.retry_queue, []
+        self.events.status(f"Worker: Újrapróbálási kör: {len(retries)} visszautasított kimenetű prompt.", False)
+        for index, (prompt_no, prompt_text) in enumerate(retries):
+            PROMPT_RETRIES_TOTAL.inc()
+            self.phase_timer.begin_prompt(prompt_no, attempt=2)
+            self._inter_prompt_pause()
+            self.check_pause_and_stop()
+            self.events.status(f"Worker: Újrapróbálás: Prompt #{prompt_no} ({index+1}/{len(retries)})", False)
+            prompt_ok = self._process_prompt(prompt_no, prompt_text, allow_requeue=False)
+            self._end_prompt_timing(prompt_no, prompt_ok, remaining=len(retries) - (index + 1))
+
+    def _end_prompt_timing(self, prompt_line_no, prompt_ok, remaining):
+        if prompt_ok:
+            outcome = "ok"
+        elif getattr(self.pc_ref.gui_automator, 'last_output_rejection', None):
+            outcome = "rejected"
+        else:
+            outcome = "failed"
+        PROMPTS_TOTAL.inc(outcome=outcome)
+        record = self.phase_timer.end_prompt(outcome)
+        if record:
+            render_wait_s = record["phases"].get(PHASE_RENDER_WAIT, {}).get("duration_s", 0.0)
+            self.events.prompt_finished(prompt_line_no, outcome, record["total_s"], render_wait_s, remaining)
+
+    def _process_prompt(self, current_prompt_no, prompt_text, allow_requeue):
+        gui_automator = self.pc_ref.gui_automator
+        incidents_before = self._network_incident_count()
+        if self.session_recorder:
+            self.session_recorder.mark("prompt_start", prompt_line_no=current_prompt_no, prompt=prompt_text,
+                                       coordinates=dict(getattr(gui_automator, 'coordinates', {})),
+                                       signatures=dict(gui_automator.coordinate_store.signatures) if hasattr(gui_automator, 'coordinate_store') else {})
+        prompt_ok = gui_automator.process_single_prompt(prompt_text, current_prompt_no)
+        if self.session_recorder:
+            # A letöltés akkor is megtörtént, ha a kimenet-ellenőrzés utólag visszautasította
+            self.session_recorder.mark("prompt_end", prompt_line_no=current_prompt_no, ok=prompt_ok,
+                                       downloaded=bool(getattr(gui_automator, 'last_downloaded_file', None)
+                                                       or getattr(gui_automator, 'last_output_rejection', None)))
+        if prompt_ok:
+            self.prompts_processed_count += 1
+            self.events.progress(self.prompts_processed_count, self.total_prompts_to_process)
+            downloaded_file = getattr(gui_automator, 'last_downloaded_file', None)
+            if downloaded_file:
+                self.events.image_downloaded(current_prompt_no, downloaded_file)
+                post_processor = getattr(self.pc_ref, 'post_processor', None)
+                if post_processor:
+                    post_processor.submit(downloaded_file, prompt_text, current_prompt_no)
+            return True
+
+        if getattr(gui_automator, 'last_output_rejection', None) and allow_requeue:
+            self.retry_queue.append((current_prompt_no, prompt_text))
+        elif self._network_incident_count() != incidents_before and allow_requeue:
+            # A prompt a hálózati kiesés alatt futott (tipikusan időtúllépés): a végén újrapróbáljuk.
+            self.events.status(f"Worker: #{current_prompt_no} prompt a hálózati kiesés miatt újrapróbálásra sorolva.", False)
+            self.retry_queue.append((current_prompt_no, prompt_text))
+        elif not self.pc_ref._stop_requested_by_user and not gui_automator.stop_requested:
+            self.events.status(f"Worker Hiba: #{current_prompt_no} prompt feldolgozásakor.", True)
+        return False
+
+    def _inter_prompt_pause(self):
+        pause_s = self.inter_prompt_pause_s
+        self.phase_timer.start_phase(PHASE_INTER_PROMPT_PAUSE)
+        self.events.status(f"Worker: Szünet ({pause_s}s)...", False)
+        for _sec_idx in range(pause_s):
+            self.check_pause_and_stop()
+            time.sleep(1)
@@ -0,0 +1,190 @@
+# core/batch_runner.py
+"""
+Fej nélküli (Qt GUI nélküli) batch belépési pont ütemezett, felügyelet nélküli futtatásokhoz.
+
+Használat:
+    python -m core.batch_runner promptok.txt --start 1 --end 50 [--no-vpn]
+
+A haladást JSON sorokként írja a standard kimenetre (egy esemény = egy sor),
+minden egyéb diagnosztikai kiírás a standard hibakimenetre kerül.
+Kilépési kódok: lásd az EXIT_CODES szótárat.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+
+from .post_processor import PostProcessor
+from .status_bus import resolve_level
+from .metrics import start_metrics_server_from_settings
+from .automation_engine import (AutomationEngine, EngineEvents,
+                                OUTCOME_COMPLETED, OUTCOME_PARTIAL, OUTCOME_PROMPT_LOAD_FAILED,
+                                OUTCOME_BROWSER_FAILED, OUTCOME_PAGE_SETUP_FAILED,
+                                OUTCOME_INTERRUPTED, OUTCOME_CRASHED)
+
+EXIT_CODES = {
+    OUTCOME_COMPLETED: 0,           # Minden prompt sikeresen feldolgozva
+    OUTCOME_PARTIAL: 1,             # Legalább egy prompt sikertelen volt
+    OUTCOME_PROMPT_LOAD_FAILED: 3,  # A prompt fájl nem olvasható / üres / rossz tartomány
+    OUTCOME_BROWSER_FAILED: 4,      # A böngésző nem indítható
+    OUTCOME_PAGE_SETUP_FAILED: 5,   # Az oldal előkészítése (ESZKÖZ MEGNYITÁSA) sikertelen
+    OUTCOME_CRASHED: 6,             # Váratlan kivétel
+    OUTCOME_INTERRUPTED: 130,       # Megszakítva (SIGINT/SIGTERM)
+}
+# Az argparse a hibás argumentumokra 2-es kóddal lép ki.
+
+
+class JsonLinesWriter:
+    """Szálbiztos JSON Lines író; minden rekord külön sor, azonnal ürítve."""
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        record = {"ts": round(time.time(), 3), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class JsonLinesEvents(EngineEvents):
+    def __init__(self, writer):
+        self.writer = writer
+
+    def status(self, message, is_error=False):
+        self.writer.write("status", message=message, is_error=bool(is_error))
+
+    def progress(self, current_step, total_steps):
+        self.writer.write("progress", current=current_step, total=total_steps)
+
+    def image_count(self, current_image, total_images):
+        self.writer.write("image", current=current_image, total=total_images)
+
+    def image_downloaded(self, prompt_line_no, file_path):
+        self.writer.write("download", prompt_line=prompt_line_no, path=file_path)
+
+    def prompt_finished(self, prompt_line_no, outcome, duration_s, render_wait_s, remaining):
+        self.writer.write("prompt", prompt_line=prompt_line_no, outcome=outcome, duration_s=duration_s,
+                          render_wait_s=render_wait_s, remaining=remaining)
+
+    def finished(self, summary_message):
+        self.writer.write("finished", summary=summary_message)
+
+
+class HeadlessController:
+    """
+    A ProcessController fej nélküli megfelelője: ugyanazokat az attribútumokat és
+    az update_gui_status() metódust biztosítja a komponenseknek, Qt nélkül.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self._stop_requested_by_user = False
+
+        current_file_path = os.path.abspath(__file__)
+        self.project_root_path = os.path.dirname(os.path.dirname(current_file_path))
+        self.downloads_dir = os.path.join(self.project_root_path, "downloads")
+        os.makedirs(self.downloads_dir, exist_ok=True)
+
+        # A nehéz komponenseket csak itt importáljuk, hogy a --help azonnal válaszoljon.
+        from .prompt_handler import PromptHandler
+        from .pyautogui_automator import PyAutoGuiAutomator
+        from .vpn_manager import VpnManager
+        from .browser_manager import BrowserManager
+
+        self.prompt_handler = PromptHandler(self)
+        self.post_processor = PostProcessor.from_settings(notify_callback=self.update_gui_status)
+        self.metrics_server = start_metrics_server_from_settings(notify_callback=self.update_gui_status)
+        self.gui_automator = PyAutoGuiAutomator(self)
+        self.vpn_manager = VpnManager(self)
+        self.browser_manager = BrowserManager(self)
+
+    def update_gui_status(self, message, is_error=False, level=None):
+        self.writer.write("status", message=message, is_error=bool(is_error), level=resolve_level(is_error, level))
+
+    def is_running(self):
+        return not self._stop_requested_by_user
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.batch_runner",
+        description="Automatikus Képgenerátor - fej nélküli batch futtatás (JSON Lines kimenet).")
+    parser.add_argument("prompt_file", help="A promptokat tartalmazó .txt fájl (soronként egy prompt).")
+    parser.add_argument("--start", type=int, default=1, help="Kezdő sor (1-alapú, alapértelmezés: 1).")
+    parser.add_argument("--end", type=int, default=None, help="Befejező sor (1-alapú, bezárólag; alapértelmezés: a fájl vége).")
+    parser.add_argument("--no-vpn", action="store_true", help="A VPN lépés kihagyása.")
+    parser.add_argument("--vpn-server", default="Singapore", help="NordVPN szervercsoport (alapértelmezés: Singapore).")
+    parser.add_argument("--vpn-country", default="SG", help="Elvárt országkód a VPN után (alapértelmezés: SG).")
+    parser.add_argument("--keep-vpn", action="store_true",
+                        help="A VPN kapcsolat megtartása kilépéskor (a következő batch az IP ellenőrzés után átveszi).")
+    parser.add_argument("--pause", type=int, default=2, help="Szünet két prompt között másodpercben (alapértelmezés: 2).")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.start < 1 or (args.end is not None and args.end < args.start):
+        print("Érvénytelen kezdő vagy befejező sor.", file=sys.stderr)
+        return 2
+
+    # A stdout csak a JSON soroké; a komponensek print() kiírásai a stderr-re kerülnek.
+    writer = JsonLinesWriter(sys.stdout)
+    sys.stdout = sys.stderr
+
+    writer.write("start", prompt_file=os.path.abspath(args.prompt_file), start=args.start, end=args.end)
+    try:
+        controller = HeadlessController(writer)
+        engine = AutomationEngine(controller, args.prompt_file, args.start,
+                                  args.end if args.end is not None else sys.maxsize,
+                                  events=JsonLinesEvents(writer),
+                                  use_vpn=not args.no_vpn,
+                                  target_vpn_server_group=args.vpn_server,
+                                  target_vpn_country_code=args.vpn_country,
+                                  inter_prompt_pause_s=args.pause)
+    except Exception as e:
+        # Tipikusan: a pyautogui nem tölthető be kijelző (DISPLAY / X) nélkül
+        print(traceback.format_exc(), file=sys.stderr)
+        exit_code = EXIT_CODES[OUTCOME_CRASHED]
+        writer.write("exit", outcome=OUTCOME_CRASHED, code=exit_code, error=f"{type(e).__name__}: {e}",
+                     processed=0, total=0)
+        return exit_code
+
+    def _handle_termination(signum, _frame):
+        writer.write("signal", signal=signum)
+        controller._stop_requested_by_user = True
+        engine.request_hard_stop()
+
+    signal.signal(signal.SIGINT, _handle_termination)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _handle_termination)
+
+    outcome = engine.run()
+    # Ugyanaz a takarítás, mint a ProcessController._handle_automation_finished-ben: a close_browser()
+    # írja ki a késleltetett koordináta mentést és a sorban álló hibakeresési képeket.
+    try:
+        controller.gui_automator.close_browser()
+        vpn_manager = controller.vpn_manager
+        if vpn_manager and vpn_manager.is_connected_to_target_server and not args.keep_vpn:
+            vpn_manager.release_session()
+            vpn_manager.shutdown()  # A folyamat kilép: a tétlenségi időzítőt nem várjuk meg
+    except Exception as e:
+        writer.write("status", message=f"Hiba a futás utáni takarításkor: {e}", is_error=True)
+    if controller.post_processor:
+        controller.post_processor.drain()
+    if controller.metrics_server:
+        controller.metrics_server.stop()
+
+    exit_code = EXIT_CODES.get(outcome, EXIT_CODES[OUTCOME_CRASHED])
+    writer.write("exit", outcome=outcome, code=exit_code,
+                 processed=engine.prompts_processed_count, total=engine.total_prompts_to_process)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,12 @@ import platform
 import subprocess
 import time
 from utils.system_helper import find_executable_path
+from utils.settings_loader import get_section
+from utils.window_finder import find_windows, activate_window, is_window_lookup_available
+
+READY_PAGE_LOADED = "page_loaded"       # A vizuális ellenőrzés szerint az oldal betöltött
+READY_WINDOW_MAPPED = "window_mapped"   # Csak az ablak jelent meg a várt címmel (a vizuális jel időtúllépett)
+READY_TIMEOUT = "timeout"
 
 class BrowserManager:
     def __init__(self, process_controller_ref=None):
@@ -17,6 +23,14 @@ class BrowserManager:
         # pl. macOS: "Google Chrome.app", "Opera.app"
         self.target_url = "https://labs.google/fx/tools/whisk" # Ezt később configból is vehetnénk
 
+        # Meleg újraindítás: ha már nyitva van egy böngészőablak a cél oldalon (a címe az aktív
+        # lap címe, pl. "Whisk - Google Chrome"), azt hozzuk előtérbe új böngésző indítása helyett.
+        cfg = get_section("browser")
+        self.reuse_existing_window = cfg.get("reuse_existing_window", True)
+        self.window_title_keywords = cfg.get("window_title_keywords", ["Whisk"])
+        self.attached_to_existing_window = False
+        self.ready_timeout_s = cfg.get("ready_timeout_s", 45)
+
         print("BrowserManager inicializálva.")
 
     def _notify_status(self, message, is_error=False):
@@ -41,11 +55,57 @@ class BrowserManager:
             self._notify_status(f"Hiba a(z) '{browser_executable_path}' böngésző explicit indítása közben: {e}", is_error=True)
             return False
 
+    def attach_to_existing_window(self):
+        """Megkeresi a cél oldalon álló böngészőablakot és előtérbe hozza. True, ha sikerült."""
+        windows = find_windows(self.window_title_keywords)
+        if not windows:
+            return False
+        window = windows[0]
+        if not activate_window(window):
+            self._notify_status(f"A meglévő ablak ('{window.title}') előtérbe hozása sikertelen.", is_error=True)
+            return False
+        self._notify_status(f"Meglévő böngészőablak használata: '{window.title}' ({window.backend}).")
+        time.sleep(0.5)  # Az ablakkezelőnek idő kell, amíg az ablak ténylegesen felülre kerül
+        return True
+
+    def wait_until_ready(self, timeout_s, page_loaded_check=None, tick=None, poll_interval_s=0.5):
+        """
+        Indítás után a böngésző készenlétére vár megfigyelhető jelek alapján, fix várakozás helyett:
+          1. megjelent-e a várt című ablak (ha az ablakok listázhatók; meglévő ablaknál kihagyva),
+          2. page_loaded_check() igazat ad-e (pl. az "ESZKÖZ MEGNYITÁSA" gomb látható).
+        A tick() minden lekérdezés előtt meghívódik (szünet/stop kezelés, kivételt dobhat).
+        Visszatérési érték: READY_PAGE_LOADED, READY_WINDOW_MAPPED vagy READY_TIMEOUT.
+        """
+        deadline = time.monotonic() + timeout_s
+        window_mapped = self.attached_to_existing_window or not is_window_lookup_available()
+        while True:
+            if tick:
+                tick()
+            if not window_mapped:
+                windows = find_windows(self.window_title_keywords)
+                if windows:
+                    window_mapped = True
+                    self._notify_status(f"Böngészőablak megjelent: '{windows[0].title}'.")
+            if window_mapped:
+                if page_loaded_check is None:
+                    return READY_WINDOW_MAPPED
+                if page_loaded_check():
+                    return READY_PAGE_LOADED
+            if time.monotonic() >= deadline:
+                return READY_WINDOW_MAPPED if window_mapped and is_window_lookup_available() else READY_TIMEOUT
+            time.sleep(poll_interval_s)
+
     def open_target_url(self):
         """
         Megnyitja a cél URL-t az előnyben részesített böngészővel,
-        vagy az alapértelmezett böngészővel.
+        vagy az alapértelmezett böngészővel. Ha már van a cél oldalon álló ablak
+        (és a reuse_existing_window be van kapcsolva), azt hozza előtérbe.
         """
+        self.attached_to_existing_window = False
+        if self.reuse_existing_window and self.attach_to_existing_window():
+            self.attached_to_existing_window = True
+            return True
+
         self._notify_status(f"Cél URL megnyitási kísérlet: {self.target_url}")
 
         # Specifikus böngészők keresése és indítása (Windows példa)
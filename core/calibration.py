@@ -0,0 +1,235 @@
+# core/calibration.py
+"""
+Egyszeri kalibráció: egy próbaprompt végigvitele az oldalon, és közben a teljes elrendezés
+felmérése és elmentése az aktuális kijelzőprofilba (CoordinateStore):
+  - prompt terület (téglalap + kattintási pont),
+  - generálás gomb,
+  - a renderelés figyelt pixele és annak "generálás közbeni" színe (a legnagyobb összefüggő
+    változó képernyőrész egy ténylegesen megváltozott, generálás közben stabil pixele),
+  - letöltés gomb (az egér pozíciója, amikor a felhasználó Entert nyom),
+mindegyikhez pixel aláírással. Ezután a prompt ciklusban nincs szükség keresésre és OCR-re.
+
+Használat (a Whisk eszköz legyen nyitva a böngészőben, vagy --setup):
+    python -m core.calibration [--setup] [--prompt "a red apple"] [--no-download]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pyautogui
+
+from .pyautogui_automator import PyAutoGuiAutomator
+from .browser_manager import BrowserManager
+
+RENDER_DIFF_THRESHOLD = 40     # csatornánkénti eltérés, amitől egy pixel "megváltozottnak" számít
+RENDER_START_WAIT_S = 3
+RENDER_TIMEOUT_S = 90
+RENDER_CELL_PX = 8             # a változó részek összefüggőségét ekkora cellákon vizsgáljuk
+WATCH_STABLE_SAMPLES = 4       # a figyelt pixelnek ennyi további képernyőképen át a generálás közbeni színén
+WATCH_STABLE_INTERVAL_S = 0.25 # kell maradnia (animált töltésjelző kizárása)
+
+
+def _screen_array():
+    return np.asarray(pyautogui.screenshot().convert("RGB")).astype(np.int16)
+
+
+def changed_pixel_mask(before, after, exclude_rect=None, threshold=RENDER_DIFF_THRESHOLD):
+    """A két képernyőkép között megváltozott pixelek logikai maszkja (az exclude_rect kivételével)."""
+    changed = np.any(np.abs(after - before) > threshold, axis=-1)
+    if exclude_rect:
+        changed[exclude_rect['y']:exclude_rect['y'] + exclude_rect['height'],
+                exclude_rect['x']:exclude_rect['x'] + exclude_rect['width']] = False
+    return changed
+
+
+def largest_changed_component(changed, cell_px=RENDER_CELL_PX):
+    """
+    A megváltozott pixelek legnagyobb összefüggő része maszkként, vagy None. Az összefüggőséget
+    cell_px méretű cellákon (4-szomszédsággal) nézzük, így az élsimítás miatti apró rések nem
+    bontják szét a render csempét; a méret a megváltozott pixelek száma.
+    """
+    height, width = changed.shape
+    rows, cols = -(-height // cell_px), -(-width // cell_px)
+    padded = np.zeros((rows * cell_px, cols * cell_px), dtype=bool)
+    padded[:height, :width] = changed
+    counts = padded.reshape(rows, cell_px, cols, cell_px).sum(axis=(1, 3))
+    labels = np.zeros((rows, cols), dtype=np.int32)
+    best_label, best_count, label = 0, 0, 0
+    for row, col in zip(*np.nonzero(counts)):
+        if labels[row, col]:
+            continue
+        label += 1
+        labels[row, col] = label
+        stack, total = [(row, col)], 0
+        while stack:
+            y, x = stack.pop()
+            total += int(counts[y, x])
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                if 0 <= ny < rows and 0 <= nx < cols and counts[ny, nx] and not labels[ny, nx]:
+                    labels[ny, nx] = label
+                    stack.append((ny, nx))
+        if total > best_count:
+            best_label, best_count = label, total
+    if not best_label:
+        return None
+    cells = np.repeat(np.repeat(labels == best_label, cell_px, axis=0), cell_px, axis=1)
+    return changed & cells[:height, :width]
+
+
+def find_changed_region(before, after, exclude_rect=None, threshold=RENDER_DIFF_THRESHOLD):
+    """A legnagyobb összefüggő megváltozott rész befoglaló téglalapja (dict), vagy None."""
+    component = largest_changed_component(changed_pixel_mask(before, after, exclude_rect, threshold))
+    return _bounding_region(component) if component is not None else None
+
+
+def _bounding_region(mask):
+    ys, xs = np.nonzero(mask)
+    x, y = int(xs.min()), int(ys.min())
+    width, height = int(xs.max()) - x + 1, int(ys.max()) - y + 1
+    return {'x': x, 'y': y, 'width': width, 'height': height,
+            'center_x': x + width // 2, 'center_y': y + height // 2}
+
+
+def pick_stable_watch_pixel(component, during, later_frames):
+    """
+    A komponens egy ténylegesen megváltozott pixele, amely a later_frames mindegyikén is a
+    during-beli színén maradt; a komponens súlypontjához legközelebbi. (x, y) vagy None.
+    """
+    stable = component.copy()
+    for frame in later_frames:
+        stable &= np.all(frame == during, axis=-1)
+    ys, xs = np.nonzero(stable)
+    if len(xs) == 0:
+        return None
+    component_ys, component_xs = np.nonzero(component)
+    distances = (ys - component_ys.mean()) ** 2 + (xs - component_xs.mean()) ** 2
+    nearest = int(np.argmin(distances))
+    return int(xs[nearest]), int(ys[nearest])
+
+
+class CalibrationWizard:
+    def __init__(self, automator, prompt_text="a red apple on a white table", confirm_download=True):
+        self.automator = automator
+        self.prompt_text = prompt_text
+        self.confirm_download = confirm_download
+        self.store = automator.coordinate_store
+
+    def _say(self, message):
+        print(f"[Kalibráció]: {message}")
+
+    def _step_prompt_area(self):
+        # A mentett értékeket eldobjuk, hogy a keresés biztosan a mostani elrendezést mérje fel.
+        self.store.forget("prompt_area", ("prompt_click_x", "prompt_click_y", "prompt_rect"))
+        self.automator.last_known_prompt_rect = None
+        if not self.automator._find_and_activate_prompt_field():
+            raise RuntimeError("A prompt terület nem található. Nyitva van a Whisk eszköz?")
+        self._say(f"Prompt terület: {self.automator.coordinates['prompt_rect']}")
+
+    def _step_generate_button(self):
+        self.store.forget("generate_button", ("generate_button_click_x", "generate_button_click_y"))
+        self.automator.last_known_generate_point = None
+        before = _screen_array()
+        # A gépelés és a generálás gomb keresése + kattintás ugyanazon az úton, mint éles futásban
+        if not self.automator.prompt_executor.enter_prompt_and_initiate_generation(self.prompt_text):
+            raise RuntimeError("A próbaprompt beírása vagy a generálás gomb megtalálása sikertelen.")
+        self._say(f"Generálás gomb: X={self.automator.coordinates['generate_button_click_x']}, "
+                  f"Y={self.automator.coordinates['generate_button_click_y']}")
+        return before
+
+    def _step_render_watch(self, before):
+        time.sleep(RENDER_START_WAIT_S)
+        during = _screen_array()
+        changed = changed_pixel_mask(before, during, exclude_rect=self.automator.coordinates.get("prompt_rect"))
+        component = largest_changed_component(changed)
+        if component is None:
+            raise RuntimeError("A generálás indulása után nem változott a képernyő; a render régió nem mérhető fel.")
+        region = _bounding_region(component)
+        later_frames = []
+        for _ in range(WATCH_STABLE_SAMPLES):
+            time.sleep(WATCH_STABLE_INTERVAL_S)
+            later_frames.append(_screen_array())
+        watch_point = pick_stable_watch_pixel(component, during, later_frames)
+        if watch_point is None:
+            raise RuntimeError("A render régióban nincs a generálás közben változatlan pixel (csak animáció?); "
+                               "próbáld újra.")
+        watch_x, watch_y = watch_point
+        busy_color = [int(c) for c in during[watch_y, watch_x]]
+        self._say(f"Render régió: {region}; figyelt pixel: ({watch_x},{watch_y}), szín generálás közben: {tuple(busy_color)}")
+
+        started = time.monotonic()
+        while time.monotonic() - started < RENDER_TIMEOUT_S:
+            if tuple(pyautogui.pixel(watch_x, watch_y)) != tuple(busy_color):
+                break
+            time.sleep(0.5)
+        else:
+            raise RuntimeError(f"A figyelt pixel {RENDER_TIMEOUT_S}s alatt sem változott meg.")
+        self._say(f"Renderelés kész ({time.monotonic() - started + RENDER_START_WAIT_S + WATCH_STABLE_SAMPLES * WATCH_STABLE_INTERVAL_S:.1f}s).")
+        self.automator.coordinates["render_watch"] = {"x": watch_x, "y": watch_y, "busy_color": busy_color, "region": region}
+        self.automator._save_coordinates()
+
+    def _step_download_button(self):
+        time.sleep(2)  # Ugyanannyi, mint az ImageFlowHandler-ben a színváltozás után
+        input("[Kalibráció]: Vidd az egeret a kész kép LETÖLTÉS gombjára (ne kattints), majd nyomj Entert itt... ")
+        x, y = pyautogui.position()
+        self.automator.coordinates["download_button_click_x"] = x
+        self.automator.coordinates["download_button_click_y"] = y
+        self.automator._save_coordinates()
+        self.store.capture_signature("download_button", x, y)
+        self._say(f"Letöltés gomb: X={x}, Y={y}")
+
+        if not self.confirm_download:
+            return
+        watcher = self.automator.download_watcher
+        if not watcher.arm():
+            self._say("A letöltési mappa nem figyelhető; a letöltés ellenőrzése kimarad.")
+            return
+        pyautogui.moveTo(x, y, duration=0.2)
+        pyautogui.click()
+        downloaded_path = watcher.wait_for_new_file(timeout_s=self.automator.download_confirm_timeout_s)
+        if not downloaded_path:
+            raise RuntimeError("A letöltés gombra kattintás után nem jelent meg új fájl.")
+        self._say(f"Letöltés ellenőrizve: {downloaded_path} (próbakép, törölve)")
+        try:
+            os.remove(downloaded_path)
+        except OSError:
+            pass
+
+    def run(self):
+        self._step_prompt_area()
+        before = self._step_generate_button()
+        self._step_render_watch(before)
+        self._step_download_button()
+        self.automator.coordinates["calibrated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.store.flush()
+        self._say(f"Kalibráció mentve a(z) '{self.store.profile_key}' profilba: {self.store.file_path}")
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.calibration",
+                                     description="Az oldal elrendezésének egyszeri felmérése egy próbapromptal.")
+    parser.add_argument("--setup", action="store_true", help="Az eszköz megnyitása OCR-rel ('ESZKÖZ MEGNYITÁSA') a mérés előtt.")
+    parser.add_argument("--prompt", default="a red apple on a white table", help="A kalibrációhoz használt próbaprompt.")
+    parser.add_argument("--no-download", action="store_true", help="A letöltés gomb ellenőrző kattintásának kihagyása.")
+    args = parser.parse_args(argv)
+
+    automator = PyAutoGuiAutomator()
+    if not BrowserManager().attach_to_existing_window():
+        print("[Kalibráció]: A böngészőablak nem hozható előtérbe automatikusan; 5s a böngészőre váltáshoz...")
+        time.sleep(5)
+    if args.setup and not (automator.warm_up_ocr() and automator.initial_page_setup()):
+        print("[Kalibráció]: Az oldal előkészítése sikertelen.", file=sys.stderr)
+        return 1
+    try:
+        CalibrationWizard(automator, prompt_text=args.prompt, confirm_download=not args.no_download).run()
+    except RuntimeError as e:
+        print(f"[Kalibráció]: HIBA: {e}", file=sys.stderr)
+        automator.coordinate_store.flush()
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# core/coordinate_store.py
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+try:
+    import pyautogui
+except ImportError:
+    pyautogui = None
+
+STORE_VERSION = 2
+SIGNATURE_OFFSETS = ((0, 0), (-4, 0), (4, 0), (0, -4), (0, 4))
+SIGNATURE_TOLERANCE = 12   # csatornánkénti eltérés, amit még egyezésnek veszünk (élsimítás, színprofil)
+
+
+def build_profile_key(screen_width, screen_height, dpi_scale, url):
+    """A kijelzőprofil kulcsa, pl. "1920x1080@1.25|https://labs.google/fx/tools/whisk"."""
+    return f"{screen_width}x{screen_height}@{dpi_scale:g}|{url or ''}"
+
+
+class _FileLock:
+    """Folyamatok közötti kizárólagos zár egy külön .lock fájlon (fcntl / msvcrt)."""
+    def __init__(self, lock_path, timeout_s=5.0):
+        self.lock_path = lock_path
+        self.timeout_s = timeout_s
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.lock_path, "a+b")
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                elif msvcrt:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    raise TimeoutError(f"A zár nem szerezhető meg: {self.lock_path}")
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+        return False
+
+
+class CoordinateStore:
+    """
+    Az UI koordináták tárolója kijelzőprofilonként (képernyőméret, DPI skálázás, URL).
+
+    Fájlformátum (config/ui_coordinates.json, 2. verzió):
+        {"version": 2, "profiles": {"<kulcs>": {"values": {...}, "signatures": {...}, "updated_at": "..."}}}
+    A "values" a korábbi lapos formátum kulcsait tartalmazza (prompt_click_x, prompt_rect, ...);
+    a régi lapos fájlt az első betöltés az aktuális profilba emeli.
+
+    Minden elemhez egy kis pixel aláírás tartozhat (néhány pixel egy horgonypont körül), amit
+    használat előtt egyetlen apró képernyőképpel ellenőrzünk (verify), így egy felbontás-, zoom-
+    vagy elrendezésváltozás után nem kattintunk vakon a régi helyre.
+
+    Az írás késleltetett (save_delay_s alatt érkező változások egy írásba olvadnak), atomi
+    (ideiglenes fájl + os.replace) és fájlzárral védett; íráskor a többi profilt a lemezről
+    olvassuk újra, így több egyidejű alkalmazáspéldány sem írja felül egymás profiljait.
+    """
+    def __init__(self, file_path, profile_key, save_delay_s=1.0, notify_callback=None):
+        self.file_path = file_path
+        self.lock_path = file_path + ".lock"
+        self.profile_key = profile_key
+        self.save_delay_s = save_delay_s
+        self.notify_callback = notify_callback
+        self.values = {}
+        self.signatures = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # A folyamaton belüli írások sorrendje (a régebbi pillanatkép ne írja felül az újabbat)
+        self._save_timer = None
+        self._dirty = False
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(message, is_error)
+        else:
+            print(f"[CoordinateStore]: {message}")
+
+    # --- Fájlkezelés ---
+    def _read_document(self):
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {"version": STORE_VERSION, "profiles": {}}
+        if not isinstance(data, dict):
+            return {"version": STORE_VERSION, "profiles": {}}
+        if data.get("version") != STORE_VERSION:
+            # Régi lapos formátum: az aktuális profil értékei lesznek (aláírás nélkül, első használatkor készül)
+            return {"version": STORE_VERSION, "profiles": {self.profile_key: {"values": data, "signatures": {}}} if data else {}}
+        data.setdefault("profiles", {})
+        return data
+
+    def _write_document(self, document):
+        directory = os.path.dirname(self.file_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def load(self):
+        """
+        Betölti az aktuális profil értékeit. A visszaadott dict maga a tároló állapota: a hívó
+        közvetlenül módosíthatja, majd save()-vel kéri a mentést.
+        """
+        try:
+            with _FileLock(self.lock_path):
+                document = self._read_document()
+        except Exception as e:
+            self._notify(f"Hiba a koordináták betöltése közben: {e}", is_error=True)
+            return self.values
+        profile = document["profiles"].get(self.profile_key) or {}
+        with self._lock:
+            self.values.clear()
+            self.values.update(profile.get("values") or {})
+            self.signatures = dict(profile.get("signatures") or {})
+        if self.values:
+            self._notify(f"UI koordináták betöltve ({self.profile_key}): {self.file_path}")
+        else:
+            self._notify(f"Nincs mentett koordináta ehhez a kijelzőprofilhoz ({self.profile_key}). Dinamikus keresés szükséges.")
+        return self.values
+
+    def save(self):
+        """Késleltetett mentés (a save_delay_s-on belüli hívások egy írásba olvadnak)."""
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay_s, self.flush)
+                self._save_timer.start()
+
+    def flush(self):
+        """A függő változások azonnali kiírása (kilépés / futás vége előtt hívandó)."""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return True
+                self._dirty = False
+                values, signatures = dict(self.values), dict(self.signatures)
+            try:
+                with _FileLock(self.lock_path):
+                    document = self._read_document()
+                    document["profiles"][self.profile_key] = {
+                        "values": values, "signatures": signatures,
+                        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                    self._write_document(document)
+            except Exception as e:
+                self._notify(f"Hiba a koordináták mentése közben: {e}", is_error=True)
+                with self._lock:
+                    self._dirty = True  # A következő flush újrapróbálja
+                return False
+        self._notify(f"UI koordináták elmentve ({self.profile_key}): {self.file_path}")
+        return True
+
+    # --- Pixel aláírások ---
+    @staticmethod
+    def _grab_pixels(anchor_x, anchor_y):
+        reach = max(max(abs(dx), abs(dy)) for dx, dy in SIGNATURE_OFFSETS)
+        left, top = anchor_x - reach, anchor_y - reach
+        image = pyautogui.screenshot(region=(left, top, 2 * reach + 1, 2 * reach + 1)).convert("RGB")
+        return [list(image.getpixel((reach + dx, reach + dy))) for dx, dy in SIGNATURE_OFFSETS]
+
+    def capture_signature(self, name, anchor_x, anchor_y):
+        """Elmenti a horgonypont körüli pixeleket az elem aláírásaként."""
+        if not pyautogui:
+            return False
+        try:
+            pixels = self._grab_pixels(anchor_x, anchor_y)
+        except Exception as e:
+            self._notify(f"Hiba a(z) '{name}' pixel aláírásának rögzítésekor: {e}", is_error=True)
+            return False
+        with self._lock:
+            self.signatures[name] = {"x": anchor_x, "y": anchor_y, "pixels": pixels}
+        self.save()
+        return True
+
+    def verify(self, name):
+        """
+        Egyezik-e a képernyő az elem mentett aláírásával. None, ha nincs aláírás (nem eldönthető).
+        Egyetlen 9x9-es képernyőkép, így kb. egy pyautogui.pixel() hívás költsége.
+        """
+        signature = self.signatures.get(name)
+        if not signature or not pyautogui:
+            return None
+        try:
+            current = self._grab_pixels(signature["x"], signature["y"])
+        except Exception:
+            return False
+        return all(abs(a - b) <= SIGNATURE_TOLERANCE
+                   for expected, actual in zip(signature["pixels"], current)
+                   for a, b in zip(expected, actual))
+
+    def forget(self, name, value_keys=()):
+        """Egy elem aláírásának és értékeinek törlése (pl. sikertelen kattintás után)."""
+        with self._lock:
+            self.signatures.pop(name, None)
+            for key in value_keys:
+                self.values.pop(key, None)
+        self.save()
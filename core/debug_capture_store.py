@@ -0,0 +1,180 @@
+# core/debug_capture_store.py
+import json
+import os
+import queue
+import threading
+import time
+
+from utils.settings_loader import get_section
+
+INDEX_FILE_NAME = "index.jsonl"
+_IMAGE_EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+
+def _project_root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _slug(text, max_len=40):
+    return "".join(c if c.isalnum() else "_" for c in (text or ""))[:max_len].strip("_") or "capture"
+
+
+class DebugCaptureStore:
+    """
+    Hibakereső képernyőképek háttérszálas, korlátos tárolója (config/settings.json "debug_captures",
+    alapértelmezés: logs/debug_captures/).
+
+    A submit() nem blokkol: a képet egy korlátos sorba teszi (tele sornál eldobja és számolja),
+    a kicsinyítést, kódolást és írást egy háttérszál végzi. A tároló forog: ha a fájlok száma
+    (max_files) vagy összmérete (max_total_mb) túllépi a korlátot, a legrégebbiek törlődnek.
+    Az index.jsonl minden megmaradt képhez egy sort tartalmaz (futás, prompt, ok, méretek).
+    """
+    def __init__(self, output_dir=None, max_files=200, max_total_mb=200, max_side_px=1280,
+                 image_format="png", jpeg_quality=80, queue_size=8, notify_callback=None):
+        self.output_dir = output_dir or os.path.join(_project_root(), "logs", "debug_captures")
+        self.index_path = os.path.join(self.output_dir, INDEX_FILE_NAME)
+        self.max_files = max(1, int(max_files))
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.max_side_px = int(max_side_px or 0)
+        self.image_format = image_format if image_format in _IMAGE_EXTENSIONS else "png"
+        self.jpeg_quality = jpeg_quality
+        self.notify_callback = notify_callback
+        self.saved_count = 0
+        self.dropped_count = 0
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._records = None    # Az index a lemezen lévő képekről, a legrégebbitől (a háttérszál tölti be)
+        self._sequence = 0
+
+    @classmethod
+    def from_settings(cls, notify_callback=None):
+        """None, ha a settings.json "debug_captures" szakasza kikapcsolja."""
+        cfg = get_section("debug_captures")
+        if not cfg.get("enabled", True):
+            return None
+        output_dir = cfg.get("output_dir") or None
+        if output_dir and not os.path.isabs(output_dir):
+            output_dir = os.path.join(_project_root(), output_dir)
+        return cls(output_dir=output_dir,
+                   max_files=cfg.get("max_files", 200),
+                   max_total_mb=cfg.get("max_total_mb", 200),
+                   max_side_px=cfg.get("max_side_px", 1280),
+                   image_format=cfg.get("format", "png"),
+                   jpeg_quality=cfg.get("jpeg_quality", 80),
+                   queue_size=cfg.get("queue_size", 8),
+                   notify_callback=notify_callback)
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(message, is_error)
+        else:
+            print(f"[DebugCaptureStore]: {message}")
+
+    def submit(self, image, reason, run_id=None, prompt_line_no=None, **extra):
+        """
+        Egy PIL kép mentésének kérése. Azonnal visszatér; False, ha a sor tele volt és a kép eldobódott.
+        A hívó a képet átadás után ne módosítsa.
+        """
+        self._ensure_thread()
+        item = {"image": image, "reason": reason, "run_id": run_id, "prompt_line_no": prompt_line_no,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "extra": extra}
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped_count += 1
+            return False
+
+    def flush(self, timeout_s=5.0):
+        """Megvárja, amíg a sorban lévő képek kiíródnak (legfeljebb timeout_s-ig). True, ha kiürült."""
+        deadline = time.monotonic() + timeout_s
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="debug-captures", daemon=True)
+                self._thread.start()
+
+    # --- Háttérszál ---
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._write(item)
+            except Exception as e:
+                self._notify(f"Hiba a hibakeresési kép mentésekor ({item['reason']}): {e}", is_error=True)
+            finally:
+                self._queue.task_done()
+
+    def _load_index(self):
+        records = []
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if os.path.exists(os.path.join(self.output_dir, record.get("file", ""))):
+                        records.append(record)
+        except OSError:
+            pass
+        return records
+
+    def _write(self, item):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self._records is None:
+            self._records = self._load_index()
+        image = item["image"]
+        original_size = list(image.size)
+        if self.max_side_px and max(image.size) > self.max_side_px:
+            image = image.copy()
+            image.thumbnail((self.max_side_px, self.max_side_px))
+        self._sequence += 1
+        file_name = (f"{time.strftime('%Y%m%d_%H%M%S')}_{self._sequence:04d}_{_slug(item['reason'])}"
+                     f"{_IMAGE_EXTENSIONS[self.image_format]}")
+        path = os.path.join(self.output_dir, file_name)
+        if self.image_format == "png":
+            image.save(path, format="PNG", optimize=True)
+        else:
+            image.convert("RGB").save(path, format=self.image_format.upper(), quality=self.jpeg_quality)
+        record = {"file": file_name, "reason": item["reason"], "run_id": item["run_id"],
+                  "prompt_line_no": item["prompt_line_no"], "created_at": item["created_at"],
+                  "original_size": original_size, "saved_size": list(image.size),
+                  "bytes": os.path.getsize(path)}
+        record.update(item["extra"])
+        self._records.append(record)
+        self.saved_count += 1
+        if self._rotate():
+            self._rewrite_index()
+        else:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._notify(f"Hibakeresési kép mentve ({item['reason']}): {path}")
+
+    def _rotate(self):
+        """A legrégebbi képek törlése a korlátokig. True, ha törölt (ilyenkor az indexet újra kell írni)."""
+        removed = False
+        total_bytes = sum(r.get("bytes", 0) for r in self._records)
+        while len(self._records) > 1 and (len(self._records) > self.max_files or total_bytes > self.max_total_bytes):
+            oldest = self._records.pop(0)
+            total_bytes -= oldest.get("bytes", 0)
+            try:
+                os.remove(os.path.join(self.output_dir, oldest["file"]))
+            except OSError:
+                pass
+            removed = True
+        return removed
+
+    def _rewrite_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self._records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.index_path)
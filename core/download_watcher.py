@@ -0,0 +1,184 @@
+# core/download_watcher.py
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import shutil
+import time
+
+# A böngészők által letöltés közben használt ideiglenes kiterjesztések (Chrome, Opera, Firefox, Edge).
+PARTIAL_DOWNLOAD_SUFFIXES = (".crdownload", ".opdownload", ".part", ".partial", ".download", ".tmp")
+
+# inotify konstansok (linux/inotify.h)
+_IN_CREATE = 0x00000100
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+
+def default_browser_download_dir():
+    return os.path.join(os.path.expanduser("~"), "Downloads")
+
+
+def is_partial_download(file_name):
+    lower = file_name.lower()
+    return lower.startswith(".") or lower.endswith(PARTIAL_DOWNLOAD_SUFFIXES)
+
+
+def _load_libc_inotify():
+    if platform.system() != "Linux":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class DownloadWatcher:
+    """
+    A böngésző letöltési mappáját figyeli, és megerősíti, hogy egy új, befejezett fájl jelent meg.
+    Linuxon inotify-t használ (ctypes-on keresztül, külső függőség nélkül) a felébredéshez,
+    más platformon vagy hiba esetén rövid időközű könyvtár-lekérdezésre (polling) vált.
+    A részleges letöltéseket (.crdownload, .part, ...) figyelmen kívül hagyja, és csak akkor
+    fogad el egy fájlt, ha a mérete két egymást követő ellenőrzésnél nem változott.
+
+    Használat: arm() a letöltés gomb megnyomása ELŐTT, majd wait_for_new_file() utána.
+    """
+    def __init__(self, watch_dir=None, notify_callback=None, poll_interval_s=0.25, settle_s=0.3):
+        self.watch_dir = watch_dir or default_browser_download_dir()
+        self.notify_callback = notify_callback
+        self.poll_interval_s = poll_interval_s
+        self.settle_s = settle_s
+        self._known_names = set()
+        self._inotify_fd = None
+        self._libc = _load_libc_inotify()
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(message, is_error=is_error)
+        else:
+            print(f"[DownloadWatcher]: {message}")
+
+    def _list_names(self):
+        try:
+            return {entry.name for entry in os.scandir(self.watch_dir) if entry.is_file()}
+        except OSError:
+            return set()
+
+    def _open_inotify(self):
+        if not self._libc:
+            return None
+        fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = _IN_CREATE | _IN_CLOSE_WRITE | _IN_MOVED_TO
+        if self._libc.inotify_add_watch(fd, os.fsencode(self.watch_dir), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _close_inotify(self):
+        if self._inotify_fd is not None:
+            try:
+                os.close(self._inotify_fd)
+            except OSError:
+                pass
+            self._inotify_fd = None
+
+    def arm(self):
+        """Pillanatképet készít a mappa jelenlegi tartalmáról; az ezután megjelenő fájlok számítanak újnak."""
+        self._close_inotify()
+        if not os.path.isdir(self.watch_dir):
+            self._notify(f"A böngésző letöltési mappája nem létezik: {self.watch_dir}", is_error=True)
+            self._known_names = set()
+            return False
+        self._known_names = self._list_names()
+        self._inotify_fd = self._open_inotify()
+        return True
+
+    @property
+    def uses_inotify(self):
+        return self._inotify_fd is not None
+
+    def _wait_for_change(self, timeout_s):
+        """Blokkol, amíg a mappában esemény nem történik (inotify) vagy le nem telik a lekérdezési időköz."""
+        if self._inotify_fd is None:
+            time.sleep(min(timeout_s, self.poll_interval_s))
+            return
+        readable, _, _ = select.select([self._inotify_fd], [], [], timeout_s)
+        if readable:
+            try:
+                # Az eseményeket csak ébresztésre használjuk; a tényleges állapotot a könyvtárlistából vesszük.
+                while os.read(self._inotify_fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._close_inotify()
+
+    def _completed_candidates(self):
+        new_names = self._list_names() - self._known_names
+        candidates = []
+        for name in new_names:
+            if is_partial_download(name):
+                continue
+            path = os.path.join(self.watch_dir, name)
+            try:
+                candidates.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        candidates.sort()
+        return [path for _, path in candidates]
+
+    def _is_stable(self, path):
+        try:
+            size_before = os.path.getsize(path)
+            if size_before <= 0:
+                return False
+            time.sleep(self.settle_s)
+            return os.path.getsize(path) == size_before
+        except OSError:
+            return False
+
+    def wait_for_new_file(self, timeout_s=30, stop_check=None):
+        """
+        Vár egy új, befejezett fájlra az arm() óta. Visszaadja az elérési útját,
+        vagy None-t időtúllépés / leállítási kérés esetén.
+        """
+        deadline = time.monotonic() + timeout_s
+        try:
+            while True:
+                for path in self._completed_candidates():
+                    if self._is_stable(path):
+                        self._known_names.add(os.path.basename(path))
+                        return path
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if stop_check and stop_check():
+                    return None
+                self._wait_for_change(min(remaining, 1.0))
+        finally:
+            self._close_inotify()
+
+
+def file_download_into(source_path, target_dir, prompt_line_no=None):
+    """
+    Áthelyezi a letöltött fájlt a célmappába a prompt sorszámából képzett néven
+    (pl. prompt_00042.png). Ütközés esetén sorszámozott utótagot kap. Visszaadja az új elérési utat.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    _, ext = os.path.splitext(source_path)
+    base_name = f"prompt_{prompt_line_no:05d}" if prompt_line_no is not None else time.strftime("image_%Y%m%d_%H%M%S")
+    target_path = os.path.join(target_dir, f"{base_name}{ext}")
+    suffix = 2
+    while os.path.exists(target_path):
+        target_path = os.path.join(target_dir, f"{base_name}_{suffix}{ext}")
+        suffix += 1
+    shutil.move(source_path, target_path)
+    return target_path
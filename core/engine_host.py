@@ -0,0 +1,254 @@
+# core/engine_host.py
+"""
+Az AutomationEngine futtatása külön folyamatban (config/settings.json "engine_process").
+
+A GUI folyamatban csak egy vékony kliens (EngineHostClient) marad; a gyermek folyamat
+(engine_host_main) a fej nélküli HeadlessController-rel hozza létre a komponenseket
+(PyAutoGuiAutomator, VpnManager, BrowserManager, PostProcessor), és a futások között is
+életben marad, így az EasyOCR modell, a megtartott VPN kapcsolat és az előkészített oldal
+a következő futásnál is megvan.
+
+Üzenetek egyetlen kétirányú multiprocessing.Pipe-on, (név, mezők) párokként:
+  GUI -> motor: "run" {prompt_file_path, start_line, end_line}, "pause_resume", "stop", "shutdown"
+  motor -> GUI: az EngineEvents eseményei ("status", "progress", "image", "download", "prompt",
+                "finished", "show_overlay", "hide_overlay"), valamint "run_done" {outcome}
+                a futás utáni takarítás végén és "host_exit" a leálláskor.
+"""
+import multiprocessing
+import threading
+import traceback
+
+from utils.settings_loader import get_section
+from .batch_runner import HeadlessController, JsonLinesEvents
+
+CMD_RUN = "run"
+CMD_PAUSE_RESUME = "pause_resume"
+CMD_STOP = "stop"
+CMD_SHUTDOWN = "shutdown"
+EVENT_RUN_DONE = "run_done"
+EVENT_HOST_EXIT = "host_exit"
+
+
+class PipeWriter:
+    """A JsonLinesWriter megfelelője: az eseményeket a Pipe-on küldi (több szálról is hívható)."""
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        with self._lock:
+            try:
+                self.conn.send((event, fields))
+            except (OSError, EOFError, BrokenPipeError):
+                pass  # A GUI már kilépett; a motor a következő parancsolvasáskor áll le
+
+
+class PipeEvents(JsonLinesEvents):
+    def show_overlay(self):
+        self.writer.write("show_overlay")
+
+    def hide_overlay(self):
+        self.writer.write("hide_overlay")
+
+
+class _EngineHost:
+    """A gyermek folyamat állapota: a komponensek és az éppen futó motor."""
+    def __init__(self, conn, controller_factory=None):
+        self.conn = conn
+        self.writer = PipeWriter(conn)
+        self.controller = (controller_factory or HeadlessController)(self.writer)
+        self.engine = None
+        self._run_thread = None
+
+    def _is_running(self):
+        return self._run_thread is not None and self._run_thread.is_alive()
+
+    def start_run(self, prompt_file_path, start_line, end_line):
+        from .automation_engine import AutomationEngine
+        if self._is_running():
+            self.writer.write("status", message="Egy automatizálási folyamat már fut!", is_error=True)
+            return
+        self.controller._stop_requested_by_user = False
+        self.engine = AutomationEngine(self.controller, prompt_file_path, start_line, end_line,
+                                       events=PipeEvents(self.writer))
+        self._run_thread = threading.Thread(target=self._run, name="engine-run", daemon=True)
+        self._run_thread.start()
+
+    def _run(self):
+        outcome = None
+        try:
+            outcome = self.engine.run()
+        finally:
+            # Ugyanaz a takarítás, mint a ProcessController._handle_automation_finished-ben
+            controller = self.controller
+            try:
+                controller.gui_automator.close_browser()
+                if controller.vpn_manager.is_connected_to_target_server:
+                    controller.vpn_manager.release_session()
+            except Exception as e:
+                self.writer.write("status", message=f"Hiba a futás utáni takarításkor: {e}", is_error=True)
+            self.writer.write(EVENT_RUN_DONE, outcome=outcome)
+
+    def request_stop(self):
+        if not self._is_running():
+            return
+        self.controller._stop_requested_by_user = True
+        self.controller.gui_automator.request_stop()
+        self.engine.request_hard_stop()
+
+    def shutdown(self, timeout_s):
+        self.request_stop()
+        if self._run_thread:
+            self._run_thread.join(timeout_s)
+        self.controller.vpn_manager.shutdown()
+        if self.controller.post_processor:
+            self.controller.post_processor.drain()
+        if self.controller.metrics_server:
+            self.controller.metrics_server.stop()
+
+    def serve(self, shutdown_timeout_s):
+        while True:
+            try:
+                command, fields = self.conn.recv()
+            except (EOFError, OSError):
+                command, fields = CMD_SHUTDOWN, {}  # A GUI folyamat megszűnt
+            if command == CMD_RUN:
+                self.start_run(fields["prompt_file_path"], fields["start_line"], fields["end_line"])
+            elif command == CMD_PAUSE_RESUME:
+                if self._is_running():
+                    self.engine.toggle_pause_resume()
+            elif command == CMD_STOP:
+                self.request_stop()
+            elif command == CMD_SHUTDOWN:
+                self.shutdown(shutdown_timeout_s)
+                self.writer.write(EVENT_HOST_EXIT)
+                return
+
+
+def engine_host_main(conn, shutdown_timeout_s=10, controller_factory=None):
+    """A gyermek folyamat belépési pontja (controller_factory: a HeadlessController helyett, tesztekhez)."""
+    try:
+        host = _EngineHost(conn, controller_factory)
+    except Exception as e:
+        PipeWriter(conn).write("status", message=f"A motor folyamat nem indítható: {e}", is_error=True)
+        print(traceback.format_exc())
+        PipeWriter(conn).write(EVENT_HOST_EXIT)
+        return
+    host.serve(shutdown_timeout_s)
+
+
+class EngineHostClient:
+    """
+    A GUI oldali kapcsolat a motor folyamathoz. A folyamatot az első start_run() indítja (spawn,
+    így a gyermek nem örökli a Qt állapotot); a beérkező eseményeket egy olvasó szál adja át az
+    on_event(név, mezők) visszahívásnak.
+    """
+    def __init__(self, on_event, shutdown_timeout_s=10, controller_factory=None):
+        self.on_event = on_event
+        self.shutdown_timeout_s = shutdown_timeout_s
+        self.controller_factory = controller_factory  # Modul szintű (pickle-elhető) függvény lehet
+        self.is_run_active = False
+        self._process = None
+        self._conn = None
+        self._reader = None
+        self._send_lock = threading.Lock()
+        self._run_state_lock = threading.Lock()
+
+    @classmethod
+    def is_enabled_in_settings(cls):
+        return bool(get_section("engine_process").get("enabled", False))
+
+    @classmethod
+    def from_settings(cls, on_event):
+        return cls(on_event, shutdown_timeout_s=get_section("engine_process").get("shutdown_timeout_s", 10))
+
+    @property
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def _ensure_process(self):
+        if self.is_alive:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe(duplex=True)
+        # Nem daemon: a gyermek maga is indít folyamatokat (utófeldolgozó pool)
+        self._process = context.Process(target=engine_host_main, args=(child_conn, self.shutdown_timeout_s, self.controller_factory),
+                                        name="automation-engine")
+        self._process.start()
+        child_conn.close()
+        self._reader = threading.Thread(target=self._read_events, args=(self._conn,), name="engine-host-reader", daemon=True)
+        self._reader.start()
+
+    def _take_active_run(self):
+        """Az aktív futás jelzőjének törlése; True, ha volt aktív futás (csak egy hívó kapja meg)."""
+        with self._run_state_lock:
+            was_active, self.is_run_active = self.is_run_active, False
+            return was_active
+
+    def _abort_active_run(self, summary):
+        """A motor folyamat egy futás közben (vagy előtt) kilépett: a GUI ugyanúgy lezárhassa, mint egy rendes futást."""
+        if not self._take_active_run():
+            return
+        self.on_event("finished", {"summary": summary})
+        self.on_event(EVENT_RUN_DONE, {"outcome": None})
+
+    def _read_events(self, conn):
+        while True:
+            try:
+                event, fields = conn.recv()
+            except (EOFError, OSError):
+                if self.is_run_active:
+                    self.on_event("status", {"message": "A motor folyamat váratlanul leállt.", "is_error": True})
+                self._abort_active_run("A motor folyamat váratlanul leállt.")
+                return
+            if event == EVENT_RUN_DONE:
+                self._take_active_run()
+            if event == EVENT_HOST_EXIT:
+                # Pl. a komponensek létrehozása nem sikerült (nincs kijelző, hiányzó pyautogui): run_done nem jön
+                self._abort_active_run("A motor folyamat kilépett a futás befejezése előtt.")
+            self.on_event(event, fields)
+            if event == EVENT_HOST_EXIT:
+                return
+
+    def _send(self, command, **fields):
+        with self._send_lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send((command, fields))
+                return True
+            except (OSError, EOFError, BrokenPipeError):
+                return False
+
+    def start_run(self, prompt_file_path, start_line, end_line):
+        """
+        False, ha a parancs nem küldhető el, és a futást a hívónak kell lezárnia. Ha közben a motor
+        folyamat kilépett, az olvasó szál már lezárta a futást (finished + run_done), ilyenkor True.
+        """
+        self.is_run_active = True  # Még a folyamat indítása előtt: egy azonnali host_exit is lezárja a futást
+        self._ensure_process()
+        if self._send(CMD_RUN, prompt_file_path=prompt_file_path, start_line=start_line, end_line=end_line):
+            return True
+        return not self._take_active_run()
+
+    def toggle_pause_resume(self):
+        return self._send(CMD_PAUSE_RESUME)
+
+    def request_stop(self):
+        return self._send(CMD_STOP)
+
+    def shutdown(self):
+        """Leállítja a futást és a motor folyamatot; ha nem lép ki időben, terminate()."""
+        if self._process is None:
+            return
+        self._send(CMD_SHUTDOWN)
+        self._process.join(self.shutdown_timeout_s + 5)
+        if self._process.is_alive():
+            print("EngineHostClient Figyelmeztetés: A motor folyamat nem állt le időben, terminate.")
+            self._process.terminate()
+            self._process.join(2)
+        if self._reader:
+            self._reader.join(1)
+        self._conn.close()
+        self._process = self._conn = self._reader = None
+        self.is_run_active = False
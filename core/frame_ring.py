@@ -0,0 +1,186 @@
+# core/frame_ring.py
+import atexit
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Slot fejléc (int64): sorszám (-1: üres / írás alatt), magasság, szélesség, rögzítések (olvasók) száma,
+# írás alatt jelző (1, amíg egy író a képadatot másolja; ilyenkor más író sem választhatja)
+_SEQ, _HEIGHT, _WIDTH, _PINS, _WRITING = range(5)
+_HEADER_FIELDS = 5
+_ALIGN = 64
+
+
+def _aligned(size):
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class FrameView:
+    """
+    Egy rögzített (pinned) képkocka: a `array` csak olvasható numpy nézet a megosztott memóriára
+    (másolás nélkül). Amíg nincs release() / a with blokk vége, a slot nem íródik felül.
+    """
+    def __init__(self, ring, slot, seq, array):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.array = array
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.array = None
+            self.ring._unpin(self.slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class SharedFrameRing:
+    """
+    Előre lefoglalt képkocka slotok gyűrűje egy multiprocessing.shared_memory blokkban.
+
+    Az író (write) a legrégebbi, olvasó által nem rögzített és éppen nem írt slotot írja felül,
+    és növekvő sorszámot ad neki (több író folyamat is használhatja ugyanazt a gyűrűt); az olvasók (acquire_latest / acquire / wait_for) a slotra mutató numpy
+    nézetet kapnak, másolás nélkül. A slotok biztonságos újrahasznosítását a slotonkénti
+    rögzítésszámláló adja: amíg egy olvasó nem engedte el a képkockát, az író kihagyja a slotot
+    (ha minden slot foglalt, a képkocka eldobódik, dropped_count nő). A fejléc módosításai egy
+    multiprocessing.Lock alatt történnek, a képadat másolása a zár nélkül.
+
+    Más folyamatban: a handle() eredményét a Process argumentumaként átadva
+    SharedFrameRing.attach(*handle) ugyanarra a memóriára csatlakozik.
+    """
+    def __init__(self, slot_count=4, max_height=1080, max_width=1920, channels=3, name=None, lock=None, create=True):
+        self.slot_count = slot_count
+        self.slot_shape = (max_height, max_width, channels)
+        self.slot_bytes = _aligned(max_height * max_width * channels)
+        header_bytes = _aligned((slot_count * _HEADER_FIELDS + 1) * 8)
+        if create:
+            self._shm = shared_memory.SharedMemory(create=True, size=header_bytes + slot_count * self.slot_bytes)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = create
+        self._lock = lock or multiprocessing.Lock()
+        self._header = np.ndarray((slot_count, _HEADER_FIELDS), dtype=np.int64, buffer=self._shm.buf)
+        self._latest = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf, offset=slot_count * _HEADER_FIELDS * 8)
+        self._slots = [np.ndarray(self.slot_shape, dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes + i * self.slot_bytes)
+                       for i in range(slot_count)]
+        self.dropped_count = 0
+        if create:
+            self._header[:] = 0
+            self._header[:, _SEQ] = -1
+            self._latest[0] = -1
+            atexit.register(self.close)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def handle(self):
+        """A csatlakozáshoz szükséges adatok (egy gyermek folyamat indításakor adható át)."""
+        height, width, channels = self.slot_shape
+        return self.name, self.slot_count, height, width, channels, self._lock
+
+    @classmethod
+    def attach(cls, name, slot_count, max_height, max_width, channels, lock):
+        return cls(slot_count, max_height, max_width, channels, name=name, lock=lock, create=False)
+
+    # --- Író ---
+    def write(self, image):
+        """
+        Egy képkocka (PIL kép vagy HxWxC uint8 tömb) beírása. Visszaadja a sorszámát,
+        vagy None-t, ha nem fér el, vagy minden slotot olvasó vagy másik író tart.
+        """
+        array = np.asarray(image, dtype=np.uint8)
+        if array.ndim == 2:
+            array = array[:, :, None]
+        height, width, channels = array.shape
+        if height > self.slot_shape[0] or width > self.slot_shape[1] or channels != self.slot_shape[2]:
+            self.dropped_count += 1
+            return None
+        with self._lock:
+            free = [i for i in range(self.slot_count)
+                    if self._header[i, _PINS] == 0 and self._header[i, _WRITING] == 0]
+            if not free:
+                self.dropped_count += 1
+                return None
+            slot = min(free, key=lambda i: self._header[i, _SEQ])
+            self._header[slot, _SEQ] = -1  # Írás alatt: az olvasók nem rögzíthetik,
+            self._header[slot, _WRITING] = 1  # és más író sem választhatja
+        try:
+            self._slots[slot][:height, :width] = array
+        except BaseException:
+            with self._lock:
+                self._header[slot, _WRITING] = 0
+            raise
+        with self._lock:
+            seq = int(self._latest[0]) + 1
+            self._header[slot] = (seq, height, width, 0, 0)
+            self._latest[0] = seq
+        return seq
+
+    # --- Olvasók ---
+    @property
+    def latest_seq(self):
+        return int(self._latest[0])
+
+    def _pin(self, slot):
+        height, width = int(self._header[slot, _HEIGHT]), int(self._header[slot, _WIDTH])
+        self._header[slot, _PINS] += 1
+        view = self._slots[slot][:height, :width]
+        view.flags.writeable = False
+        return FrameView(self, slot, int(self._header[slot, _SEQ]), view)
+
+    def _unpin(self, slot):
+        with self._lock:
+            self._header[slot, _PINS] -= 1
+
+    def acquire(self, seq):
+        """A megadott sorszámú képkocka rögzítése, vagy None, ha már felülíródott."""
+        with self._lock:
+            for slot in range(self.slot_count):
+                if self._header[slot, _SEQ] == seq and seq >= 0:
+                    return self._pin(slot)
+        return None
+
+    def acquire_latest(self, newer_than=-1):
+        """A legfrissebb képkocka rögzítése, ha a sorszáma nagyobb, mint newer_than; különben None."""
+        with self._lock:
+            seq = int(self._latest[0])
+            if seq <= newer_than:
+                return None
+            for slot in range(self.slot_count):
+                if self._header[slot, _SEQ] == seq:
+                    return self._pin(slot)
+        return None
+
+    def wait_for(self, newer_than=-1, timeout_s=1.0, poll_interval_s=0.005):
+        """Vár egy newer_than-nál újabb képkockára (legfeljebb timeout_s-ig), és rögzíti."""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            frame = self.acquire_latest(newer_than)
+            if frame is not None or time.monotonic() >= deadline:
+                return frame
+            time.sleep(poll_interval_s)
+
+    def close(self):
+        """Lecsatlakozás; a létrehozó folyamat a memóriát is felszabadítja."""
+        if self._shm is None:
+            return
+        self._header = self._latest = None
+        self._slots = []
+        shm, self._shm = self._shm, None
+        try:
+            shm.close()
+            if self._owner:
+                shm.unlink()
+        except (BufferError, FileNotFoundError):
+            pass  # Egy még élő nézet miatt a memória a folyamat végén szabadul fel
+
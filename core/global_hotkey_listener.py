@@ -1,31 +1,43 @@
 # core/global_hotkey_listener.py
+import platform
 import threading
 from pynput import keyboard
 from PySide6.QtCore import QObject, Signal
 
-# Konfiguráció a te diagnosztikai kimeneted alapján:
-# Numpad 0: VK 96 -> <96>
-# Numpad +: VK 107 (és char '+') -> '+'
-# Numpad 6: VK 102 -> <102>
-# Numpad 4: VK 100 -> <100>
-# Numpad 8: VK 104 -> <104>
-# Numpad 2: VK 98 -> <98>
-
-CONFIG = {
-    # Numpad 0 -> Pause/Resume Automation
-    "PAUSE_RESUME_KEY": keyboard.KeyCode.from_vk(96),
-    # Numpad + -> Play/Pause Music
-    "PLAY_PAUSE_KEY": keyboard.KeyCode(char='+'), 
-    # Numpad 6 -> Next Track
-    "NEXT_TRACK_KEY_NUMPAD": keyboard.KeyCode.from_vk(102),
-    # Numpad 4 -> Previous Track
-    "PREV_TRACK_KEY_NUMPAD": keyboard.KeyCode.from_vk(100),
-    # Numpad 8 -> Volume Up
-    "VOLUME_UP_KEY_NUMPAD": keyboard.KeyCode.from_vk(104),
-    # Numpad 2 -> Volume Down
-    "VOLUME_DOWN_KEY_NUMPAD": keyboard.KeyCode.from_vk(98),
+from utils.settings_loader import get_section
+
+# Alapértelmezett kiosztás a diagnosztikai kimenet alapján (felülírható: settings.json "hotkeys.bindings").
+# A kulcs a HotkeyEmitter signáljának neve, az érték a billentyű VK kódja és karaktere, pontosan úgy,
+# ahogy a pynput jelenti (a numerikus billentyűzet számjegyei karakter nélkül, VK-val érkeznek):
+#   Numpad 0: VK 96 | Numpad +: VK 107 és char '+' | Numpad 6: VK 102
+#   Numpad 4: VK 100 | Numpad 8: VK 104 | Numpad 2: VK 98
+DEFAULT_BINDINGS = {
+    "pause_resume_requested": {"vk": 96, "char": None},        # Num0 -> Automatizálás szünet/folytatás
+    "music_play_pause_requested": {"vk": 107, "char": "+"},    # Num+ -> Zene lejátszás/szünet
+    "music_next_track_requested": {"vk": 102, "char": None},   # Num6 -> Következő szám
+    "music_prev_track_requested": {"vk": 100, "char": None},   # Num4 -> Előző szám
+    "music_volume_up_requested": {"vk": 104, "char": None},    # Num8 -> Hangerő fel
+    "music_volume_down_requested": {"vk": 98, "char": None},   # Num2 -> Hangerő le
 }
 
+# Windows alacsony szintű billentyűzet horog: a szoftveresen injektált események jelzője (KBDLLHOOKSTRUCT.flags).
+_LLKHF_INJECTED = 0x10
+
+
+def load_bindings():
+    """A settings.json "hotkeys.bindings" szakasza az alapértelmezésekre fésülve."""
+    bindings = {action: dict(spec) for action, spec in DEFAULT_BINDINGS.items()}
+    for action, spec in (get_section("hotkeys").get("bindings") or {}).items():
+        if action not in DEFAULT_BINDINGS:
+            print(f"GlobalHotkeyListener FIGYELEM: Ismeretlen billentyű-művelet a beállításokban: '{action}'")
+            continue
+        if spec is None:
+            bindings.pop(action, None)  # null -> a művelet kikapcsolása
+            continue
+        bindings[action] = {"vk": spec.get("vk"), "char": spec.get("char")}
+    return bindings
+
+
 class HotkeyEmitter(QObject):
     pause_resume_requested = Signal()
     music_play_pause_requested = Signal()
@@ -35,70 +47,49 @@ class HotkeyEmitter(QObject):
     music_volume_down_requested = Signal()
 
 class GlobalHotkeyListener:
-    def __init__(self):
+    def __init__(self, bindings=None, debug=None, ignore_injected=None):
         self.emitter = HotkeyEmitter()
         self._listener_thread = None
         self._listener_control = None
         self.running = False
-        print("GlobalHotkeyListener inicializálva.")
-
-    def _on_press(self, key):
-        try:
-            pressed_key_char = key.char if hasattr(key, 'char') else None
-            pressed_key_vk = key.vk if hasattr(key, 'vk') else None
-            pressed_key_name = key.name if hasattr(key, 'name') else None
-            print(f"RAW KEY PRESS (main app): Char: {pressed_key_char}, VK: {pressed_key_vk}, Name: {pressed_key_name}, Full Key: {key}")
-        except Exception as e:
-            print(f"RAW KEY PRESS (main app, error in logging): {key}, Error: {e}")
-            return 
-
-        if not self.running:
+        cfg = get_section("hotkeys")
+        self.debug = cfg.get("debug", False) if debug is None else debug
+        self.ignore_injected = cfg.get("ignore_injected", True) if ignore_injected is None else ignore_injected
+        self.bindings = bindings if bindings is not None else load_bindings()
+        self._dispatch = self._build_dispatch_table(self.bindings)
+        print(f"GlobalHotkeyListener inicializálva ({len(self._dispatch)} billentyű-hozzárendelés).")
+
+    def _build_dispatch_table(self, bindings):
+        # (vk, char) -> a signál előre lekötött emit metódusa; a billentyűleütésenkénti munka egyetlen dict keresés.
+        table = {}
+        for action, spec in bindings.items():
+            key = (spec.get("vk"), spec.get("char"))
+            if key in table:
+                print(f"GlobalHotkeyListener FIGYELEM: A(z) {key} billentyű többször van hozzárendelve; '{action}' felülírja.")
+            table[key] = getattr(self.emitter, action).emit
+        return table
+
+    def _on_press(self, key, injected=False):
+        # Forró út: minden rendszerszintű leütésnél fut (a pyautogui.typewrite leütéseinél is),
+        # ezért itt nincs string-építés, kiírás vagy if/elif lánc.
+        if not self.running or (injected and self.ignore_injected):
             return
+        emit = self._dispatch.get((getattr(key, 'vk', None), getattr(key, 'char', None)))
+        if self.debug:
+            print(f"Hotkey DBG: Char: {getattr(key, 'char', None)}, VK: {getattr(key, 'vk', None)}, Injected: {injected}, Találat: {emit is not None}")
+        if emit is not None:
+            emit()
 
-        action_to_emit = None
-        action_name_for_log = None
-
-        # Iterálunk a CONFIG-on és a pontosabb összehasonlítási logikát használjuk
-        if hasattr(key, 'vk') and key.vk is not None:
-            if key.vk == CONFIG["PAUSE_RESUME_KEY"].vk and CONFIG["PAUSE_RESUME_KEY"].char is None and pressed_key_char is None :
-                action_to_emit = "pause_resume_requested"
-                action_name_for_log = "PAUSE/RESUME AUTOMATION (Num0)"
-            elif key.vk == CONFIG["NEXT_TRACK_KEY_NUMPAD"].vk and CONFIG["NEXT_TRACK_KEY_NUMPAD"].char is None and pressed_key_char is None:
-                action_to_emit = "music_next_track_requested"
-                action_name_for_log = "NEXT TRACK (Num6)"
-            elif key.vk == CONFIG["PREV_TRACK_KEY_NUMPAD"].vk and CONFIG["PREV_TRACK_KEY_NUMPAD"].char is None and pressed_key_char is None:
-                action_to_emit = "music_prev_track_requested"
-                action_name_for_log = "PREVIOUS TRACK (Num4)"
-            elif key.vk == CONFIG["VOLUME_UP_KEY_NUMPAD"].vk and CONFIG["VOLUME_UP_KEY_NUMPAD"].char is None and pressed_key_char is None:
-                action_to_emit = "music_volume_up_requested"
-                action_name_for_log = "VOLUME UP (Num8)"
-            elif key.vk == CONFIG["VOLUME_DOWN_KEY_NUMPAD"].vk and CONFIG["VOLUME_DOWN_KEY_NUMPAD"].char is None and pressed_key_char is None:
-                action_to_emit = "music_volume_down_requested"
-                action_name_for_log = "VOLUME DOWN (Num2)"
-        
-        # Numpad + (PLAY_PAUSE_KEY) külön kezelése, mivel char alapon van definiálva a CONFIG-ban
-        # és a pynput is char-ként (+ vk-ként) adja vissza.
-        if not action_to_emit and hasattr(key, 'char') and key.char is not None and \
-           key.char == CONFIG["PLAY_PAUSE_KEY"].char:
-            # Biztonság kedvéért ellenőrizhetjük a vk kódot is, ha a char önmagában nem elég egyedi
-            # Jelenleg a '+' karakter elég specifikusnak tűnik erre a célra a Numpad kontextusban.
-            # A te logod alapján a Numpad+ esetén key.vk == 107.
-            # A CONFIG["PLAY_PAUSE_KEY"] (KeyCode(char='+')) vk attribútuma lehet None vagy automatikusan beállított.
-            # Egy pontosabb ellenőrzés:
-            if hasattr(key, 'vk') and key.vk == 107: # Ellenőrizzük, hogy tényleg a 107-es VK-jú '+' billentyű-e
-                action_to_emit = "music_play_pause_requested"
-                action_name_for_log = "PLAY/PAUSE MUSIC (Num+)"
-
-
-        if action_to_emit:
-            print(f"Hotkey (main app): Matched {action_name_for_log} for key {key}")
-            getattr(self.emitter, action_to_emit).emit()
-        # else:
-            # print(f"No configured action for key: {key} (Raw VK: {getattr(key, 'vk', None)}, Raw Char: {getattr(key, 'char', None)})")
-
+    def _win32_event_filter(self, msg, data):
+        # Az injektált (pl. pyautogui által küldött) eseményeket már a horogban eldobjuk, így a
+        # pynput nem is alakítja át és nem hívja meg rájuk az _on_press-t. (Nem nyeli el őket a rendszer elől.)
+        return not (data.flags & _LLKHF_INJECTED)
 
     def _listener_loop(self):
-        with keyboard.Listener(on_press=self._on_press, suppress=False) as l:
+        listener_kwargs = {"on_press": self._on_press, "suppress": False}
+        if self.ignore_injected and platform.system() == "Windows":
+            listener_kwargs["win32_event_filter"] = self._win32_event_filter
+        with keyboard.Listener(**listener_kwargs) as l:
             self._listener_control = l
             print("pynput billentyűfigyelő elindult a háttérszálon (fő alkalmazás).")
             l.join()
@@ -124,12 +115,12 @@ class GlobalHotkeyListener:
 
 if __name__ == '__main__':
     import time 
-    print("Globális billentyűfigyelő tesztelése (közvetlen futtatás).")
-    config_str = ", ".join([f"{k}={v}" for k, v in CONFIG.items()])
+    print("Globális billentyűfigyelő tesztelése (közvetlen futtatás, debug kiírással).")
+
+    listener = GlobalHotkeyListener(debug=True)
+    config_str = ", ".join([f"{k}={v}" for k, v in listener.bindings.items()])
     print(f"Figyelt billentyűk: {config_str}")
     print("Nyomd meg a konfigurált billentyűket. Kilépés: Ctrl+C a konzolon.")
-
-    listener = GlobalHotkeyListener()
     
     listener.emitter.pause_resume_requested.connect(
         lambda: print("TESZT ESEMÉNY: Pause/Resume kérés!")
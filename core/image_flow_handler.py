@@ -1,7 +1,10 @@
 # core/image_flow_handler.py
 import pyautogui
 import time
-import os # Szükséges lehet, ha a jövőben fájlnevekkel is dolgozna
+import os
+from .download_watcher import file_download_into
+from .phase_timer import PHASE_RENDER_WAIT, PHASE_DOWNLOAD_CONFIRM
+from .metrics import CAPTURE_CALLS_TOTAL
 
 class ImageFlowHandler:
     def __init__(self, automator_ref):
@@ -12,30 +15,40 @@ class ImageFlowHandler:
         """
         self.automator = automator_ref
 
-    def _notify_status(self, message, is_error=False):
-        self.automator._notify_status(message, is_error)
+    def _notify_status(self, message, is_error=False, level=None):
+        self.automator._notify_status(message, is_error, level=level)
 
     def _check_for_stop_request(self):
         return self.automator._check_for_stop_request()
 
-    def monitor_generation_and_download(self):
+    def monitor_generation_and_download(self, prompt_line_no=None):
         """
         Figyeli a kép generálásának befejezését pixel alapján,
-        majd rákattint a letöltés gombra.
+        majd rákattint a letöltés gombra, és megvárja, hogy a letöltött fájl
+        ténylegesen megjelenjen (lásd _confirm_download).
         """
         if self._check_for_stop_request(): return False
         self._notify_status("KÉP FELDOLGOZÁS: Generálás figyelése és letöltés indítása...")
         
         # 1. Pixel figyelés logika
+        phase_timer = self.automator.phase_timer
+        phase_timer.start_phase(PHASE_RENDER_WAIT)
         self._notify_status("Kép generálásának figyelése pixel alapján...")
         initial_wait_after_generate_click_s = 2
         self._notify_status(f"Várakozás {initial_wait_after_generate_click_s}s a generálás tényleges megkezdésére...")
         time.sleep(initial_wait_after_generate_click_s)
         if self._check_for_stop_request(): return False
 
-        pixel_x_to_watch = 890
-        pixel_y_to_watch = 487
-        expected_color_during_generation = (217, 217, 217) 
+        render_watch = self.automator.coordinates.get("render_watch")
+        if isinstance(render_watch, dict):
+            # A kalibráció (python -m core.calibration) által felmért pixel és generálás közbeni szín
+            pixel_x_to_watch = render_watch["x"]
+            pixel_y_to_watch = render_watch["y"]
+            expected_color_during_generation = tuple(render_watch["busy_color"])
+        else:
+            pixel_x_to_watch = 890
+            pixel_y_to_watch = 487
+            expected_color_during_generation = (217, 217, 217) 
         max_wait_s_for_pixel_change = 45 
         check_interval_s = 0.5 
 
@@ -49,6 +62,7 @@ class ImageFlowHandler:
                 return False
             try:
                 current_pixel_color = pyautogui.pixel(pixel_x_to_watch, pixel_y_to_watch)
+                CAPTURE_CALLS_TOTAL.inc(kind="pixel")
                 if current_pixel_color[0] != expected_color_during_generation[0] or \
                    current_pixel_color[1] != expected_color_during_generation[1] or \
                    current_pixel_color[2] != expected_color_during_generation[2]:
@@ -58,7 +72,7 @@ class ImageFlowHandler:
                 else:
                     remaining_time = int(max_wait_s_for_pixel_change - (time.time() - start_pixel_watch_time))
                     if remaining_time % 5 == 0 or remaining_time < 5 : 
-                        self._notify_status(f"Generálás még folyamatban (pixel színe: {current_pixel_color})... ({remaining_time}s hátra a timeout-ig)")
+                        self._notify_status(f"Generálás még folyamatban (pixel színe: {current_pixel_color})... ({remaining_time}s hátra a timeout-ig)", level="debug")
             except Exception as e_pixel:
                 self._notify_status(f"Hiba a pixel ({pixel_x_to_watch},{pixel_y_to_watch}) színének olvasása közben: {e_pixel}", is_error=True)
                 time.sleep(check_interval_s * 2) 
@@ -76,13 +90,14 @@ class ImageFlowHandler:
         self._notify_status("Kép elkészült (pixel figyelés alapján). Letöltés következik...")
 
         # 2. Letöltés gomb kezelése (mentett vagy fix koordinátákkal)
+        phase_timer.start_phase(PHASE_DOWNLOAD_CONFIRM)
         download_button_x = None
         download_button_y = None
         if "download_button_click_x" in self.automator.coordinates and \
            "download_button_click_y" in self.automator.coordinates:
             download_button_x = self.automator.coordinates["download_button_click_x"]
             download_button_y = self.automator.coordinates["download_button_click_y"]
-            self._notify_status(f"Mentett letöltés gomb pozíció használata: X={download_button_x}, Y={download_button_y}")
+            self._notify_status(f"Mentett letöltés gomb pozíció használata: X={download_button_x}, Y={download_button_y}", level="debug")
         else: # Ha nincs mentett, használjuk a korábbi fixet és mentsük el
             download_button_x = 925 # Alapértelmezett fix koordináta
             download_button_y = 704
@@ -91,20 +106,47 @@ class ImageFlowHandler:
             self.automator.coordinates["download_button_click_y"] = download_button_y
             self.automator._save_coordinates() # Mentés a fő automator példányon keresztül
 
+        watcher = self.automator.download_watcher
+        watcher_armed = watcher.arm() if watcher else False
+
         self._notify_status(f"Kattintás a letöltés gombra: X={download_button_x}, Y={download_button_y}")
         try:
             pyautogui.moveTo(download_button_x, download_button_y, duration=0.2)
+            # A kalibrált aláírás a gomb fölé vitt egérrel készült; eltérésnél csak figyelmeztetünk (nincs kereső)
+            if "download_button" in self.automator.coordinate_store.signatures:
+                time.sleep(0.15)  # A hover állapot kirajzolódása
+                if self.automator.coordinate_store.verify("download_button") is False:
+                    self._notify_status("A letöltés gomb nem a kalibrált helyén látszik; futtasd újra: python -m core.calibration", level="warning")
             pyautogui.click()
             self._notify_status("Letöltés gombra kattintva.")
         except Exception as e_click_download:
             self._notify_status(f"Hiba történt a letöltés gombra való kattintás közben (X:{download_button_x}, Y:{download_button_y}): {e_click_download}", is_error=True)
             return False
 
-        download_confirmation_wait_s = 0.5 
-        if download_confirmation_wait_s > 0:                                        
-            self._notify_status(f"Rövid várakozás ({download_confirmation_wait_s}s) a letöltés elindulására...")
-            time.sleep(download_confirmation_wait_s) 
-        
-        self._notify_status("Kép letöltése elindítva (feltételezett).")
+        if not watcher_armed:
+            self._notify_status("A letöltési mappa nem figyelhető, a letöltés nem erősíthető meg.", is_error=True)
+            return False
+        if not self._confirm_download(watcher, prompt_line_no):
+            return False
+
         self._notify_status("KÉP FELDOLGOZÁS: Sikeres.")
         return True
+
+    def _confirm_download(self, watcher, prompt_line_no):
+        """Megvárja a befejezett letöltést, és áthelyezi a downloads_dir mappába. True, ha sikerült."""
+        timeout_s = self.automator.download_confirm_timeout_s
+        mode = "inotify" if watcher.uses_inotify else "polling"
+        self._notify_status(f"Várakozás a letöltött fájlra ({watcher.watch_dir}, {mode}, max {timeout_s}s)...")
+        downloaded_path = watcher.wait_for_new_file(timeout_s=timeout_s, stop_check=self._check_for_stop_request)
+        if not downloaded_path:
+            if not self._check_for_stop_request():
+                self._notify_status(f"HIBA: A letöltött kép nem jelent meg {timeout_s}s alatt a(z) '{watcher.watch_dir}' mappában.", is_error=True)
+            return False
+        try:
+            final_path = file_download_into(downloaded_path, self.automator.downloads_dir, prompt_line_no)
+        except Exception as e_move:
+            self._notify_status(f"Hiba a letöltött kép ('{downloaded_path}') áthelyezése közben: {e_move}", is_error=True)
+            return False
+        self.automator.last_downloaded_file = final_path
+        self._notify_status(f"Kép letöltése megerősítve és elmentve: {final_path}")
+        return True
@@ -0,0 +1,188 @@
+# core/iteration_profiler.py
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+from utils.settings_loader import get_section
+
+MODE_SAMPLER = "sampler"
+MODE_CPROFILE = "cprofile"
+MODE_BOTH = "both"
+
+
+def _project_root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Könnyűsúlyú mintavételező profilozó: egy háttérszál adott időközönként kiolvassa a
+    célszál aktuális hívási vermét (sys._current_frames), és összeszámolja az egyforma vermeket.
+    A kimenet "collapsed stack" formátum (flamegraph.pl / speedscope bemenete).
+    """
+    def __init__(self, target_thread_id, interval_s=0.005):
+        self.target_thread_id = target_thread_id
+        self.interval_s = interval_s
+        self.stacks = collections.Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="iteration-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class IterationProfiler:
+    """
+    Opt-in profilozás a prompt ciklus egyes iterációira (config/settings.json "iteration_profiler").
+
+    - every_n: minden N-edik iterációt profilozza (0 = kikapcsolva),
+    - slow_threshold_s: minden iterációt mér, de csak a küszöbnél lassabbakat menti (0 = kikapcsolva),
+    - mode: "sampler" (collapsed stack), "cprofile" (.prof + szöveges összesítő) vagy "both".
+
+    A kimenet a logs/profiles/<futás azonosító>/ mappába kerül. Kikapcsolt állapotban
+    from_settings() None-t ad, így az AutomationEngine ciklusában semmilyen többletköltség nincs.
+    Megjegyzés: slow_threshold_s + cprofile esetén a cProfile minden iterációban fut (számottevő lassulás);
+    a lassú iterációk kereséséhez a sampler mód ajánlott.
+    """
+    def __init__(self, output_dir=None, mode=MODE_SAMPLER, every_n=10, slow_threshold_s=0.0,
+                 sample_interval_s=0.005, notify_callback=None):
+        self.base_output_dir = output_dir or os.path.join(_project_root(), "logs", "profiles")
+        self.mode = mode if mode in (MODE_SAMPLER, MODE_CPROFILE, MODE_BOTH) else MODE_SAMPLER
+        self.every_n = max(0, int(every_n or 0))
+        self.slow_threshold_s = float(slow_threshold_s or 0.0)
+        self.sample_interval_s = sample_interval_s
+        self.notify_callback = notify_callback
+        self.run_dir = None
+        self.saved_count = 0
+        self._iteration = None
+        self._started = None
+        self._scheduled = False
+        self._profile = None
+        self._sampler = None
+
+    @classmethod
+    def from_settings(cls, notify_callback=None):
+        cfg = get_section("iteration_profiler")
+        if not cfg.get("enabled", False):
+            return None
+        output_dir = cfg.get("output_dir") or None
+        if output_dir and not os.path.isabs(output_dir):
+            output_dir = os.path.join(_project_root(), output_dir)
+        profiler = cls(output_dir=output_dir, mode=cfg.get("mode", MODE_SAMPLER),
+                       every_n=cfg.get("every_n", 10), slow_threshold_s=cfg.get("slow_threshold_s", 0.0),
+                       sample_interval_s=cfg.get("sample_interval_ms", 5) / 1000.0,
+                       notify_callback=notify_callback)
+        if not profiler.every_n and not profiler.slow_threshold_s:
+            return None
+        return profiler
+
+    def _notify(self, message):
+        if self.notify_callback:
+            self.notify_callback(message)
+        else:
+            print(f"[IterationProfiler]: {message}")
+
+    def new_run(self, run_id=None):
+        self.run_dir = os.path.join(self.base_output_dir, run_id or time.strftime("%Y%m%d_%H%M%S"))
+        self.saved_count = 0
+
+    def _should_profile(self, iteration_index):
+        if self.slow_threshold_s > 0:
+            return True
+        return self.every_n > 0 and iteration_index % self.every_n == 0
+
+    def begin(self, iteration_index, prompt_line_no):
+        """Az iteráció elején hívandó (a worker szálon)."""
+        self.end(discard=True)
+        self._iteration = (iteration_index, prompt_line_no)
+        self._scheduled = self.every_n > 0 and iteration_index % self.every_n == 0
+        if not self._should_profile(iteration_index):
+            self._iteration = None
+            return
+        if self.mode in (MODE_SAMPLER, MODE_BOTH):
+            self._sampler = StackSampler(threading.get_ident(), self.sample_interval_s)
+            self._sampler.start()
+        if self.mode in (MODE_CPROFILE, MODE_BOTH):
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = time.monotonic()
+
+    def end(self, discard=False):
+        """Az iteráció végén hívandó. Menti az eredményt, ha ütemezett vagy lassú volt. Visszaadja a mentett fájlokat."""
+        if self._iteration is None:
+            return []
+        duration_s = time.monotonic() - self._started
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+        iteration_index, prompt_line_no = self._iteration
+        profile, sampler = self._profile, self._sampler
+        self._iteration, self._profile, self._sampler = None, None, None
+
+        is_slow = self.slow_threshold_s > 0 and duration_s >= self.slow_threshold_s
+        if discard or not (self._scheduled or is_slow):
+            return []
+        return self._save(iteration_index, prompt_line_no, duration_s, is_slow, profile, sampler)
+
+    def _save(self, iteration_index, prompt_line_no, duration_s, is_slow, profile, sampler):
+        if self.run_dir is None:
+            self.new_run()
+        os.makedirs(self.run_dir, exist_ok=True)
+        base = os.path.join(self.run_dir, f"iter{iteration_index:04d}_prompt{prompt_line_no:05d}_{duration_s:.1f}s{'_slow' if is_slow else ''}")
+        written = []
+        try:
+            if profile:
+                profile.dump_stats(base + ".prof")
+                summary = io.StringIO()
+                pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(40)
+                with open(base + ".txt", "w", encoding="utf-8") as f:
+                    f.write(summary.getvalue())
+                written += [base + ".prof", base + ".txt"]
+            if sampler:
+                with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                    f.write(sampler.collapsed())
+                written.append(base + ".collapsed")
+        except OSError as e:
+            self._notify(f"Hiba a profil mentésekor ({base}): {e}")
+            return written
+        self.saved_count += 1
+        self._notify(f"Iteráció profil mentve (#{prompt_line_no}, {duration_s:.1f}s): {os.path.basename(base)}.*")
+        return written
+
+    def close(self):
+        self.end(discard=True)
@@ -0,0 +1,238 @@
+# core/metrics.py
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.settings_loader import get_section
+
+# Alapértelmezett hisztogram határok (mp): a gyors UI lépésektől a hosszú renderelési várakozásig.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key)) + (list(extra) if extra else [])
+    if not pairs:
+        return ""
+    def escape(value):
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # címke kulcs -> [vödrönkénti darabszám..., összeg, darabszám]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels):
+        """Context manager: a blokk futásidejét rögzíti."""
+        return _HistogramTimer(self, labels)
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            return series[-1] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class _HistogramTimer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Névvel azonosított számlálók és hisztogramok; a render() Prometheus szöveges formátumot ad."""
+    def __init__(self, namespace="autoimagegen"):
+        self.namespace = namespace
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"A(z) '{full_name}' metrika már más típussal létezik.")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# A folyamat egészére közös registry: a komponensek innen kérik el a metrikáikat,
+# függetlenül attól, hogy fut-e HTTP végpont.
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    return _registry
+
+
+# --- Az alkalmazás metrikái (egy helyen, hogy a nevek és címkék egységesek maradjanak) ---
+PROMPTS_TOTAL = _registry.counter("prompts_total", "Feldolgozott promptok kimenetel szerint.", ("outcome",))
+PROMPT_RETRIES_TOTAL = _registry.counter("prompt_retries_total", "Visszautasított kimenet miatti újrapróbálások.")
+PROMPT_DURATION = _registry.histogram("prompt_duration_seconds", "Egy prompt teljes feldolgozási ideje.",
+                                      buckets=(5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0))
+PHASE_DURATION = _registry.histogram("phase_duration_seconds", "A prompt feldolgozási szakaszainak ideje.", ("phase",))
+OCR_CALLS_TOTAL = _registry.counter("ocr_calls_total", "EasyOCR readtext hívások.")
+OCR_DURATION = _registry.histogram("ocr_duration_seconds", "EasyOCR readtext hívások ideje.")
+CAPTURE_CALLS_TOTAL = _registry.counter("capture_calls_total", "Képernyő-lekérdezések típus szerint.", ("kind",))
+VPN_CONNECTS_TOTAL = _registry.counter("vpn_connects_total", "VPN csatlakozási kísérletek eredmény szerint.", ("result",))
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # A lekérdezések ne szemeteljék a konzolt
+
+
+class MetricsServer:
+    """
+    Prometheus szöveges formátumú HTTP végpont (GET /metrics) egy háttérszálon, csak a
+    standard könyvtárral. Alapértelmezésben csak a localhost-on figyel.
+    """
+    def __init__(self, registry=None, host="127.0.0.1", port=9464):
+        self.registry = registry or _registry
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        handler = type("_BoundMetricsRequestHandler", (_MetricsRequestHandler,), {"registry": self.registry})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]  # port=0 esetén a kiosztott port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
+
+
+def start_metrics_server_from_settings(notify_callback=None):
+    """A config/settings.json 'metrics' szakasza alapján elindítja a végpontot; None, ha ki van kapcsolva."""
+    cfg = get_section("metrics")
+    if not cfg.get("enabled", False):
+        return None
+    try:
+        server = MetricsServer(host=cfg.get("host", "127.0.0.1"), port=cfg.get("port", 9464)).start()
+    except OSError as e:
+        if notify_callback:
+            notify_callback(f"Metrika végpont nem indítható ({cfg.get('host', '127.0.0.1')}:{cfg.get('port', 9464)}): {e}", is_error=True)
+        return None
+    if notify_callback:
+        notify_callback(f"Metrika végpont: {server.url}")
+    return server
@@ -0,0 +1,115 @@
+# core/network_health_monitor.py
+import threading
+import time
+
+from utils.settings_loader import get_section
+from .metrics import VPN_CONNECTS_TOTAL
+
+
+class NetworkHealthMonitor:
+    """
+    Háttérszál, amely futás közben időközönként olcsón ellenőrzi a VPN kapcsolatot
+    (VpnManager.verify_session: CLI állapot, vagy Windowson friss IP lekérdezés).
+
+    Ha a kapcsolat megszakadt: az AutomationEngine-t a suspend_for_network() hívással
+    megállítja (a következő check_pause_and_stop()-nál vár), újracsatlakozik az eredeti,
+    majd sorban a tartalék szervercsoportokhoz, és siker esetén automatikusan folytatja.
+    Ha max_reconnect_rounds körben sem sikerül, kemény stopot kér.
+    """
+    def __init__(self, engine, vpn_manager, check_interval_s=30, fallback_server_groups=None,
+                 max_reconnect_rounds=3, retry_delay_s=10, stop_timeout_s=60, notify_callback=None):
+        self.engine = engine
+        self.vpn_manager = vpn_manager
+        self.check_interval_s = check_interval_s
+        self.fallback_server_groups = list(fallback_server_groups or [])
+        self.max_reconnect_rounds = max_reconnect_rounds
+        self.retry_delay_s = retry_delay_s
+        # A stop() ennyit vár egy folyamatban lévő újracsatlakozásra (a CLI connect parancs nem szakítható meg)
+        self.stop_timeout_s = stop_timeout_s
+        self.notify_callback = notify_callback
+        self.incident_count = 0
+        self.last_incident_downtime_s = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, engine, vpn_manager, notify_callback=None):
+        """None, ha a settings.json "network_health" szakasza kikapcsolja."""
+        cfg = get_section("network_health")
+        if not cfg.get("enabled", True):
+            return None
+        return cls(engine, vpn_manager,
+                   check_interval_s=cfg.get("check_interval_s", 30),
+                   fallback_server_groups=cfg.get("fallback_server_groups", []),
+                   max_reconnect_rounds=cfg.get("max_reconnect_rounds", 3),
+                   retry_delay_s=cfg.get("retry_delay_s", 10),
+                   stop_timeout_s=cfg.get("stop_timeout_s", 60),
+                   notify_callback=notify_callback)
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(message, is_error)
+        else:
+            print(f"[NetworkHealthMonitor]: {message}")
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="network-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Leállítja a szálat. Egy folyamatban lévő újracsatlakozás állapotfigyelése azonnal megszakad;
+        a stop() megvárja, amíg a szál kilép, így utána már nem nyúl a motorhoz és a VPN-hez.
+        """
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.stop_timeout_s)
+            if self._thread.is_alive():
+                self._notify(f"A hálózatfigyelő szál {self.stop_timeout_s}s alatt sem állt le.", True)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval_s):
+            if self.engine.is_paused or not self.vpn_manager.is_connected_to_target_server:
+                continue  # Felhasználói szünet alatt, vagy ha nincs megjegyzett kapcsolat, nem ellenőrzünk
+            if self.vpn_manager.verify_session():
+                continue
+            self._recover()
+
+    def _server_groups_to_try(self, original_group):
+        groups = [original_group] + [g for g in self.fallback_server_groups if g != original_group]
+        return [g for g in groups if g]
+
+    def _recover(self):
+        group = self.engine.target_vpn_server_group
+        country_code = self.engine.target_vpn_country_code
+        started = time.monotonic()
+        self.incident_count += 1
+        self.engine.suspend_for_network("VPN kapcsolat megszakadt")
+        try:
+            for round_no in range(1, self.max_reconnect_rounds + 1):
+                for candidate in self._server_groups_to_try(group):
+                    if self._stop_event.is_set():
+                        return
+                    self._notify(f"Újracsatlakozás: '{candidate}' ({country_code}), {round_no}/{self.max_reconnect_rounds}. kör...")
+                    connected = self.vpn_manager.connect_to_server(candidate, country_code, stop_check=self._stop_event.is_set)
+                    if self._stop_event.is_set():
+                        return  # A futás közben véget ért: a kapcsolatot a motor takarítása kezeli
+                    if connected:
+                        VPN_CONNECTS_TOTAL.inc(result="reconnect_ok")
+                        self.last_incident_downtime_s = time.monotonic() - started
+                        self._notify(f"Hálózat helyreállt ('{candidate}', {self.last_incident_downtime_s:.1f}s kiesés). Folytatás.")
+                        return
+                    VPN_CONNECTS_TOTAL.inc(result="reconnect_failed")
+                if self._stop_event.wait(self.retry_delay_s):
+                    return
+            if self._stop_event.is_set():
+                return
+            self._notify(f"Az újracsatlakozás {self.max_reconnect_rounds} kör után sem sikerült. Folyamat leállítása.", True)
+            self.engine.request_hard_stop()
+        finally:
+            if not self._stop_event.is_set():  # Leállításkor a motor maga oldja fel a várakozást
+                self.engine.resume_after_network()
@@ -0,0 +1,91 @@
+# core/output_quality_checker.py
+import json
+import os
+import shutil
+
+from utils.image_hash import (load_grayscale, average_hash, difference_hash,
+                              hamming_distance, hex_to_hash, is_blank)
+
+
+class OutputQualityChecker:
+    """
+    A letöltött képeket gyors perceptuális hash-sel (aHash + dHash) ellenőrzi:
+      - üres/egyszínű kép (hibás render),
+      - az előző elfogadott kép másolata (a generálás valójában nem futott le),
+      - ismert hiba-/üres kártya (config/bad_output_signatures.json).
+    A check() (True, None) vagy (False, indok) párost ad vissza.
+    """
+    def __init__(self, signatures_file=None, notify_callback=None,
+                 duplicate_max_distance=4, signature_max_distance=6, blank_std_threshold=4.0):
+        self.signatures_file = signatures_file
+        self.notify_callback = notify_callback
+        self.duplicate_max_distance = duplicate_max_distance
+        self.signature_max_distance = signature_max_distance
+        self.blank_std_threshold = blank_std_threshold
+        self.previous_hashes = None
+        self.bad_signatures = self._load_signatures()
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(message, is_error=is_error)
+        else:
+            print(f"[OutputQualityChecker]: {message}")
+
+    def _load_signatures(self):
+        if not self.signatures_file or not os.path.exists(self.signatures_file):
+            return []
+        try:
+            with open(self.signatures_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            signatures = []
+            for entry in data.get("signatures", []):
+                signatures.append((entry.get("name", "ismeretlen"), hex_to_hash(entry["ahash"]), hex_to_hash(entry["dhash"])))
+            return signatures
+        except Exception as e:
+            self._notify(f"Hiba a hibás-kimenet szignatúrák betöltésekor ({self.signatures_file}): {e}", is_error=True)
+            return []
+
+    def _matches(self, hashes, reference, max_distance):
+        return (hamming_distance(hashes[0], reference[0]) <= max_distance and
+                hamming_distance(hashes[1], reference[1]) <= max_distance)
+
+    def reset(self):
+        """Új futás elején: az előző kép felejtése."""
+        self.previous_hashes = None
+
+    def check(self, image_path):
+        try:
+            gray = load_grayscale(image_path)
+        except Exception as e:
+            return False, f"a kép nem olvasható ({e})"
+
+        if is_blank(gray, self.blank_std_threshold):
+            return False, "üres/egyszínű kép"
+
+        try:
+            hashes = (average_hash(gray), difference_hash(gray))
+        except Exception as e:  # Pl. a hash rácsnál kisebb (9 px-nél keskenyebb) kép
+            return False, f"a kép nem ellenőrizhető ({e})"
+        for name, ahash, dhash in self.bad_signatures:
+            if self._matches(hashes, (ahash, dhash), self.signature_max_distance):
+                return False, f"ismert hibás kimenet ('{name}')"
+
+        if self.previous_hashes and self._matches(hashes, self.previous_hashes, self.duplicate_max_distance):
+            return False, "az előző kép másolata"
+
+        self.previous_hashes = hashes
+        return True, None
+
+
+def quarantine_output(image_path, reason_dir_name="rejected"):
+    """A visszautasított képet a mellette lévő rejected/ almappába helyezi. Visszaadja az új utat."""
+    target_dir = os.path.join(os.path.dirname(image_path), reason_dir_name)
+    os.makedirs(target_dir, exist_ok=True)
+    target_path = os.path.join(target_dir, os.path.basename(image_path))
+    base, ext = os.path.splitext(target_path)
+    suffix = 2
+    while os.path.exists(target_path):
+        target_path = f"{base}_{suffix}{ext}"
+        suffix += 1
+    shutil.move(image_path, target_path)
+    return target_path
@@ -3,6 +3,7 @@ import pyautogui
 import time
 import os
 import numpy as np # Az _find_text_with_easyocr_and_click metódushoz kell
+from .metrics import CAPTURE_CALLS_TOTAL, OCR_CALLS_TOTAL, OCR_DURATION
 
 # EasyOCR importálása (a PyAutoGuiAutomator adja át az ocr_reader-t)
 
@@ -15,10 +16,14 @@ class PageInitializer:
                            hogy elérje annak segédfüggvényeit és tagváltozóit.
         """
         self.automator = automator_ref
-        self.ocr_reader = self.automator.ocr_reader 
 
-    def _notify_status(self, message, is_error=False):
-        self.automator._notify_status(message, is_error)
+    @property
+    def ocr_reader(self):
+        # Az olvasót a PyAutoGuiAutomator.warm_up_ocr() hozza létre később, ezért mindig onnan kérjük le.
+        return self.automator.ocr_reader
+
+    def _notify_status(self, message, is_error=False, level=None):
+        self.automator._notify_status(message, is_error, level=level)
 
     def _check_for_stop_request(self):
         return self.automator._check_for_stop_request()
@@ -31,6 +36,8 @@ class PageInitializer:
                                           click_element=True,
                                           search_region=None):
         if self._check_for_stop_request(): return None 
+        if not self.ocr_reader:
+            self.automator.warm_up_ocr()
         if not self.ocr_reader:
             self._notify_status("HIBA: EasyOCR olvasó nincs inicializálva a szövegkereséshez (PageInitializer).", is_error=True)
             return None
@@ -50,14 +57,17 @@ class PageInitializer:
                 self._notify_status(f"Teljes időkorlát ({timeout_s}s) lejárt '{target_text}' keresése közben (utolsó konf.: {attempt_confidence:.2f}).", is_error=True)
                 break 
             
-            self._notify_status(f"Keresés '{target_text}' ({description}) konfidenciával: {attempt_confidence:.2f}. Fennmaradó idő: {max(0, timeout_s - elapsed_time):.1f}s")
+            self._notify_status(f"Keresés '{target_text}' ({description}) konfidenciával: {attempt_confidence:.2f}. Fennmaradó idő: {max(0, timeout_s - elapsed_time):.1f}s", level="debug")
             
             try:
                 last_screenshot_pil = pyautogui.screenshot(region=search_region) 
+                CAPTURE_CALLS_TOTAL.inc(kind="screenshot")
                 if self._check_for_stop_request(): return None
                 
                 screenshot_np = np.array(last_screenshot_pil) 
-                ocr_results = self.ocr_reader.readtext(screenshot_np, detail=1, paragraph=False) 
+                OCR_CALLS_TOTAL.inc()
+                with OCR_DURATION.time():
+                    ocr_results = self.ocr_reader.readtext(screenshot_np, detail=1, paragraph=False) 
                 
                 best_match_for_current_confidence = None
 
@@ -100,20 +110,48 @@ class PageInitializer:
                 attempt_confidence = min_confidence_threshold
 
         self._notify_status(f"'{target_text}' szöveg nem található EasyOCR-rel {timeout_s} másodperc alatt, még {min_confidence_threshold:.2f} minimális konfidenciával sem a(z) {'Teljes képernyő' if not search_region else str(search_region)} régióban.", is_error=True)
-        # Hibakereső kép mentése (opcionális, de hasznos lehet)
-        try:
-            if last_screenshot_pil and self.automator.assets_dir and os.path.exists(self.automator.assets_dir):
-                region_str_file = f"region_{search_region[0]}_{search_region[1]}_{search_region[2]}_{search_region[3]}" if search_region else "fullscreen"
-                ts = time.strftime("%Y%m%d_%H%M%S")
-                safe_target_text = "".join(c if c.isalnum() else "_" for c in target_text[:20])
-                debug_img_name = f"debug_ocr_fail_PI_{safe_target_text}_{region_str_file}_{ts}.png" # PI = PageInitializer
-                debug_screenshot_path = os.path.join(self.automator.assets_dir, debug_img_name)
-                last_screenshot_pil.save(debug_screenshot_path)
-                self._notify_status(f"Hibakeresési képernyőkép mentve (PageInitializer OCR sikertelen): {debug_screenshot_path}", is_error=True)
-        except Exception as e_screenshot:
-            self._notify_status(f"Hiba a hibakeresési képernyőkép mentése közben (PageInitializer): {e_screenshot}", is_error=True)
+        # Hibakereső kép: a mentés háttérszálon történik (DebugCaptureStore), a worker nem vár rá
+        if last_screenshot_pil:
+            self.automator.save_debug_capture(last_screenshot_pil, f"ocr_fail_{target_text[:20]}",
+                                              source="PageInitializer", target_text=target_text,
+                                              region=list(search_region) if search_region else None)
         return None
 
+    def open_tool_button_region(self):
+        """Az "ESZKÖZ MEGNYITÁSA" gomb várható régiója (left, top, width, height)."""
+        return (int(self.automator.screen_width * 0.28), int(self.automator.screen_height * 0.33),
+                int(self.automator.screen_width * 0.44), int(self.automator.screen_height * 0.15))
+
+    def is_open_tool_button_visible(self, min_confidence=0.5):
+        """
+        Egyetlen képernyőkép + OCR a gomb régiójában, kattintás és újrapróbálás nélkül (betöltődés jelzésére).
+        Ha az OCR olvasó még nincs bemelegítve, nem várunk rá: False.
+        """
+        if not self.ocr_reader:
+            return False
+        try:
+            screenshot = pyautogui.screenshot(region=self.open_tool_button_region())
+            CAPTURE_CALLS_TOTAL.inc(kind="screenshot")
+            OCR_CALLS_TOTAL.inc()
+            with OCR_DURATION.time():
+                ocr_results = self.ocr_reader.readtext(np.array(screenshot), detail=1, paragraph=False)
+        except Exception as e_ocr:
+            self._notify_status(f"Hiba a betöltődés OCR ellenőrzésekor: {e_ocr}", level="debug")
+            return False
+        return any(prob >= min_confidence and "eszköz megnyitása" in text.strip().lower()
+                   for (_bbox, text, prob) in ocr_results)
+
+    def is_ready_template_visible(self):
+        """Ha van automation_assets/page_ready.png sablon, látható-e a képernyőn (OCR nélküli, gyorsabb jel)."""
+        template_path = os.path.join(self.automator.assets_dir, "page_ready.png")
+        if not os.path.exists(template_path):
+            return False
+        try:
+            CAPTURE_CALLS_TOTAL.inc(kind="screenshot")
+            return pyautogui.locateOnScreen(template_path, grayscale=True) is not None
+        except Exception:  # Újabb pyautogui verziók ImageNotFoundException-t dobnak találat helyett
+            return False
+
     def run_initial_tool_opening_sequence(self):
         """
         Elvégzi az oldal kezdeti előkészítését: "ESZKÖZ MEGNYITÁSA" gombra kattint,
@@ -131,11 +169,7 @@ class PageInitializer:
 
         self._notify_status("'ESZKÖZ MEGNYITÁSA' gomb keresése...")
         
-        open_tool_region_top = int(self.automator.screen_height * 0.33) 
-        open_tool_region_left = int(self.automator.screen_width * 0.28)
-        open_tool_region_width = int(self.automator.screen_width * 0.44)
-        open_tool_region_height = int(self.automator.screen_height * 0.15) 
-        precise_open_tool_region = (open_tool_region_left, open_tool_region_top, open_tool_region_width, open_tool_region_height)
+        precise_open_tool_region = self.open_tool_button_region()
         target_text_for_button = "ESZKÖZ MEGNYITÁSA"
         
         button_pos = self._find_text_with_easyocr_and_click(
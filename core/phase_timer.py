@@ -0,0 +1,148 @@
+# core/phase_timer.py
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from utils.settings_loader import get_section
+from .metrics import PHASE_DURATION, PROMPT_DURATION
+
+# A prompt feldolgozás mért szakaszai, a végrehajtás sorrendjében.
+PHASE_FIELD_ACTIVATION = "field_activation"
+PHASE_TYPING = "typing"
+PHASE_GENERATE_CLICK = "generate_click"
+PHASE_RENDER_WAIT = "render_wait"
+PHASE_DOWNLOAD_CONFIRM = "download_confirm"
+PHASE_INTER_PROMPT_PAUSE = "inter_prompt_pause"
+PHASES = (PHASE_FIELD_ACTIVATION, PHASE_TYPING, PHASE_GENERATE_CLICK,
+          PHASE_RENDER_WAIT, PHASE_DOWNLOAD_CONFIRM, PHASE_INTER_PROMPT_PAUSE)
+
+_loggers_lock = threading.Lock()
+_loggers = {}
+
+
+def _project_root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _get_jsonl_logger(file_path, max_bytes, backup_count):
+    """Fájlonként egyetlen, nem továbbító logger RotatingFileHandler-rel (egy sor = egy JSON rekord)."""
+    with _loggers_lock:
+        logger = _loggers.get(file_path)
+        if logger is None:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            logger = logging.getLogger(f"phase_timing.{len(_loggers)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(file_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            _loggers[file_path] = logger
+        return logger
+
+
+class PromptPhaseTimer:
+    """
+    Promptonként méri a feldolgozási szakaszok idejét (time.monotonic alapján), és a prompt
+    végén egyetlen JSON rekordot ír a forgó naplófájlba (alapértelmezés: logs/prompt_phases.jsonl).
+
+    Használat (a worker szálon):
+        timer.begin_prompt(42)
+        timer.start_phase(PHASE_TYPING)      # lezárja az előző szakaszt és elindítja az újat
+        ...
+        timer.end_phase()                    # opcionális; az end_prompt() is lezárja
+        timer.end_prompt("ok")
+
+    Aktív prompt nélkül a hívások no-op-ok, így a handlerek feltétel nélkül hívhatják őket.
+    Az elemzéshez lásd: python -m utils.phase_report
+    """
+    def __init__(self, file_path=None, max_bytes=5 * 1024 * 1024, backup_count=5, enabled=True):
+        self.enabled = enabled
+        self.file_path = file_path or os.path.join(_project_root(), "logs", "prompt_phases.jsonl")
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+        self._logger = None
+        self._record = None
+        self._prompt_started = None
+        self._current_phase = None
+        self._current_phase_started = None
+        self.last_record = None
+
+    @classmethod
+    def from_settings(cls):
+        cfg = get_section("phase_log")
+        file_path = cfg.get("file") or None
+        if file_path and not os.path.isabs(file_path):
+            file_path = os.path.join(_project_root(), file_path)
+        return cls(file_path=file_path,
+                   max_bytes=cfg.get("max_bytes", 5 * 1024 * 1024),
+                   backup_count=cfg.get("backup_count", 5),
+                   enabled=cfg.get("enabled", True))
+
+    def new_run(self):
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+
+    @property
+    def active(self):
+        return self._record is not None
+
+    @property
+    def current_prompt_line(self):
+        return self._record["prompt_line"] if self._record is not None else None
+
+    def begin_prompt(self, prompt_line_no, attempt=1):
+        if self._record is not None:
+            self.end_prompt("abandoned")
+        self._prompt_started = time.monotonic()
+        self._record = {"run_id": self.run_id, "prompt_line": prompt_line_no, "attempt": attempt,
+                        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "phases": {}}
+
+    def start_phase(self, name):
+        if self._record is None:
+            return
+        self.end_phase()
+        self._current_phase = name
+        self._current_phase_started = time.monotonic()
+
+    def end_phase(self):
+        if self._record is None or self._current_phase is None:
+            return
+        now = time.monotonic()
+        phases = self._record["phases"]
+        entry = phases.setdefault(self._current_phase, {"start_s": round(self._current_phase_started - self._prompt_started, 4),
+                                                        "duration_s": 0.0})
+        # Ha egy szakasz többször fut (pl. újra-aktiválás), az időtartamok összeadódnak.
+        entry["duration_s"] = round(entry["duration_s"] + (now - self._current_phase_started), 4)
+        self._current_phase = None
+        self._current_phase_started = None
+
+    def end_prompt(self, outcome, **extra):
+        """Lezárja a promptot és kiírja a rekordot. Visszaadja a rekordot (vagy None-t, ha nem volt aktív)."""
+        if self._record is None:
+            return None
+        self.end_phase()
+        record = self._record
+        record["outcome"] = outcome
+        record["total_s"] = round(time.monotonic() - self._prompt_started, 4)
+        record.update(extra)
+        self._record = None
+        self._prompt_started = None
+        self.last_record = record
+        for phase, entry in record["phases"].items():
+            PHASE_DURATION.observe(entry["duration_s"], phase=phase)
+        PROMPT_DURATION.observe(record["total_s"])
+        if self.enabled:
+            self._write(record)
+        return record
+
+    def _write(self, record):
+        try:
+            if self._logger is None:
+                self._logger = _get_jsonl_logger(self.file_path, self.max_bytes, self.backup_count)
+            self._logger.info(json.dumps(record, ensure_ascii=False))
+        except Exception as e:
+            print(f"[PromptPhaseTimer]: Hiba a szakaszidő-napló írásakor ({self.file_path}): {e}")
+            self.enabled = False
@@ -0,0 +1,203 @@
+# core/post_processor.py
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.settings_loader import get_section
+
+_STOP_SENTINEL = None
+
+
+def post_process_image(job):
+    """
+    Egy letöltött kép utófeldolgozása (külön folyamatban fut, ezért modulszintű és csak
+    egyszerű, picklelhető adatot kap/ad vissza):
+      - a prompt szövegét és sorszámát PNG szöveges chunkokba írja (más formátumnál oldalkocsi JSON-ba),
+      - bélyegképet készít a thumbnails/ almappába,
+      - opcionálisan WebP másolatot készít.
+    """
+    from PIL import Image, PngImagePlugin  # A Pillow-t csak a munkafolyamatok töltik be
+
+    image_path = job["image_path"]
+    result = {"image_path": image_path, "metadata": None, "thumbnail": None, "webp": None}
+    directory, file_name = os.path.split(image_path)
+    stem, ext = os.path.splitext(file_name)
+    metadata = {"prompt": job["prompt_text"], "prompt_line": str(job["prompt_line_no"])}
+
+    with Image.open(image_path) as img:
+        img.load()
+        if ext.lower() == ".png" and job.get("metadata_mode", "auto") != "sidecar":
+            png_info = PngImagePlugin.PngInfo()
+            existing_text = getattr(img, "text", None) or {}
+            for key, value in existing_text.items():
+                if key not in metadata:
+                    png_info.add_text(key, value)
+            for key, value in metadata.items():
+                png_info.add_itxt(key, value)  # iTXt: UTF-8, az ékezetes promptokhoz is jó
+            tmp_path = os.path.join(directory, f".{stem}.tmp{ext}")
+            img.save(tmp_path, format="PNG", pnginfo=png_info)
+            os.replace(tmp_path, image_path)
+            result["metadata"] = "png-text"
+        else:
+            sidecar_path = os.path.join(directory, f"{stem}.json")
+            with open(sidecar_path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            result["metadata"] = sidecar_path
+
+        thumbnail_size = job.get("thumbnail_size")
+        if thumbnail_size:
+            thumbnails_dir = os.path.join(directory, "thumbnails")
+            os.makedirs(thumbnails_dir, exist_ok=True)
+            thumb = img.convert("RGB")
+            thumb.thumbnail((thumbnail_size, thumbnail_size))
+            thumb_path = os.path.join(thumbnails_dir, f"{stem}.jpg")
+            thumb.save(thumb_path, format="JPEG", quality=85)
+            result["thumbnail"] = thumb_path
+
+        if job.get("convert_to_webp"):
+            webp_path = os.path.join(directory, f"{stem}.webp")
+            img.save(webp_path, format="WEBP", quality=job.get("webp_quality", 85))
+            result["webp"] = webp_path
+
+    return result
+
+
+class PostProcessor:
+    """
+    A letöltött képek utófeldolgozását ProcessPoolExecutor-on futtatja, az automatizálási
+    száltól függetlenül.
+
+    A submit() soha nem blokkol: a feladat egy korlátos sorba kerül, amiből egy adagoló szál
+    legfeljebb `workers` feladatot tart egyszerre a poolban. Ha a sor megtelt (a feldolgozás
+    lassabb a generálásnál), a feladat a halasztott listára kerül, ahonnan az adagoló szál
+    visszateszi a sorba, amint abban hely szabadul - így a generálási ciklust sosem lassítja,
+    és a lemaradás sem a futás végére gyűlik fel.
+    """
+    def __init__(self, workers=2, max_pending=16, thumbnail_size=256, convert_to_webp=False,
+                 webp_quality=85, metadata_mode="auto", notify_callback=None):
+        self.workers = max(1, workers)
+        self.thumbnail_size = thumbnail_size
+        self.convert_to_webp = convert_to_webp
+        self.webp_quality = webp_quality
+        self.metadata_mode = metadata_mode
+        self.notify_callback = notify_callback
+
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._deferred = []
+        self._deferred_lock = threading.Lock()
+        self._stopping = False
+        self._in_flight = threading.BoundedSemaphore(self.workers)
+        self._executor = None
+        self._feeder_thread = None
+        self._start_lock = threading.Lock()
+        self.completed_count = 0
+        self.failed_count = 0
+
+    @classmethod
+    def from_settings(cls, notify_callback=None):
+        """A config/settings.json 'post_processing' szakasza alapján; None, ha ki van kapcsolva."""
+        cfg = get_section("post_processing")
+        if not cfg.get("enabled", False):
+            return None
+        return cls(workers=cfg.get("workers", 2),
+                   max_pending=cfg.get("max_pending", 16),
+                   thumbnail_size=cfg.get("thumbnail_size", 256),
+                   convert_to_webp=cfg.get("convert_to_webp", False),
+                   webp_quality=cfg.get("webp_quality", 85),
+                   metadata_mode=cfg.get("metadata_mode", "auto"),
+                   notify_callback=notify_callback)
+
+    def _notify(self, message, is_error=False):
+        if self.notify_callback:
+            self.notify_callback(f"Utófeldolgozás: {message}", is_error)
+        else:
+            print(f"[PostProcessor]: {message}")
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._stopping = False
+                self._feeder_thread = threading.Thread(target=self._feeder_loop, name="post-processor-feeder", daemon=True)
+                self._feeder_thread.start()
+
+    def _make_job(self, image_path, prompt_text, prompt_line_no):
+        return {"image_path": image_path, "prompt_text": prompt_text, "prompt_line_no": prompt_line_no,
+                "thumbnail_size": self.thumbnail_size, "convert_to_webp": self.convert_to_webp,
+                "webp_quality": self.webp_quality, "metadata_mode": self.metadata_mode}
+
+    def submit(self, image_path, prompt_text, prompt_line_no):
+        """Beütemezi a kép utófeldolgozását. Nem blokkol; False, ha a feladat a halasztott listára került."""
+        self._ensure_started()
+        job = self._make_job(image_path, prompt_text, prompt_line_no)
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            with self._deferred_lock:
+                self._deferred.append(job)
+            self._notify(f"a sor megtelt, '{os.path.basename(image_path)}' halasztva.")
+            self._refill_from_deferred()  # Ha az adagoló közben kiürítette a sort, ne várjon a következő képig
+            return False
+
+    @property
+    def deferred_count(self):
+        with self._deferred_lock:
+            return len(self._deferred)
+
+    def _refill_from_deferred(self):
+        """A halasztott feladatok visszatétele a sorba, amíg abban van hely (a leállítás jelzése után már nem)."""
+        with self._deferred_lock:
+            while self._deferred and not self._stopping:
+                try:
+                    self._queue.put_nowait(self._deferred[0])
+                except queue.Full:
+                    break
+                self._deferred.pop(0)
+
+    def _feeder_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP_SENTINEL:
+                break
+            self._refill_from_deferred()
+            self._dispatch(job)
+
+    def _dispatch(self, job):
+        self._in_flight.acquire()
+        try:
+            future = self._executor.submit(post_process_image, job)
+        except Exception as e:
+            self._in_flight.release()
+            self.failed_count += 1
+            self._notify(f"nem sikerült beütemezni '{job['image_path']}': {e}", is_error=True)
+            return
+        future.add_done_callback(lambda f, j=job: self._on_done(f, j))
+
+    def _on_done(self, future, job):
+        self._in_flight.release()
+        try:
+            future.result()
+            self.completed_count += 1
+        except Exception as e:
+            self.failed_count += 1
+            self._notify(f"hiba '{os.path.basename(job['image_path'])}' feldolgozásakor: {e}", is_error=True)
+
+    def drain(self):
+        """Feldolgozza a sorban és a halasztott listán lévő összes feladatot, majd leállítja a poolt."""
+        if self._executor is None:
+            return
+        with self._deferred_lock:
+            self._stopping = True  # A jelzés után az adagoló már nem tesz a sorba, így az a sor utolsó eleme
+        self._queue.put(_STOP_SENTINEL)
+        self._feeder_thread.join()
+        with self._deferred_lock:
+            deferred, self._deferred = self._deferred, []
+        for job in deferred:
+            self._dispatch(job)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._feeder_thread = None
+        self._notify(f"pool leürítve ({self.completed_count} kész, {self.failed_count} hibás).")
@@ -4,12 +4,15 @@ import traceback
 import os
 import threading 
 from .prompt_handler import PromptHandler
-from .pyautogui_automator import PyAutoGuiAutomator 
-from .vpn_manager import VpnManager
-from .browser_manager import BrowserManager
-from .global_hotkey_listener import GlobalHotkeyListener 
-from utils.ip_geolocation import get_public_ip_info 
-from PySide6.QtCore import QMetaObject, Qt, Q_ARG, Slot, QObject, QThread, Signal, QEventLoop
+from .post_processor import PostProcessor
+from .automation_engine import AutomationEngine, EngineEvents, InterruptedByUserError
+from .engine_host import EngineHostClient, EVENT_RUN_DONE, EVENT_HOST_EXIT
+from .status_bus import StatusBus, ERROR
+from .metrics import start_metrics_server_from_settings
+from .run_stats import RunStatsAccumulator
+from utils.settings_loader import get_section
+from PySide6.QtCore import QMetaObject, Qt, Q_ARG, Slot, QObject, QThread, Signal, QEventLoop, QTimer
+from utils.startup_profiler import profile_section
 from PySide6.QtWidgets import QApplication
 
 try:
@@ -19,15 +22,44 @@ except ImportError:
     print("FIGYELEM: Az OverlayWindow osztály nem tölthető be.")
 
 
-class InterruptedByUserError(Exception):
-    """Egyedi kivétel a felhasználói megszakítás jelzésére."""
-    pass
+class _WorkerSignalEvents(EngineEvents):
+    """Az AutomationEngine eseményeit a worker Qt signáljaira továbbítja."""
+    def __init__(self, worker):
+        self.worker = worker
+
+    def status(self, message, is_error=False):
+        # Közvetlenül a StatusBus-ra: a publish() szálbiztos, a Qt signál csak egy felesleges ugrás lenne.
+        self.worker.pc_ref.update_gui_status(message, is_error)
+
+    def progress(self, current_step, total_steps):
+        self.worker.progress_updated.emit(current_step, total_steps)
+
+    def image_count(self, current_image, total_images):
+        self.worker.image_count_updated.emit(current_image, total_images)
+
+    def image_downloaded(self, prompt_line_no, file_path):
+        self.worker.image_downloaded.emit(prompt_line_no, file_path)
+
+    def prompt_finished(self, prompt_line_no, outcome, duration_s, render_wait_s, remaining):
+        self.worker.prompt_finished.emit(prompt_line_no, outcome, duration_s, render_wait_s, remaining)
+
+    def finished(self, summary_message):
+        self.worker.automation_finished.emit(summary_message)
+
+    def show_overlay(self):
+        self.worker.show_overlay_requested.emit()
+
+    def hide_overlay(self):
+        self.worker.hide_overlay_requested.emit()
+
 
 class AutomationWorker(QObject):
     status_updated = Signal(str, bool) 
     progress_updated = Signal(int, int) 
     image_count_updated = Signal(int, int) 
     automation_finished = Signal(str) 
+    image_downloaded = Signal(int, str)
+    prompt_finished = Signal(int, str, float, float, int)   # sorszám, kimenet, idő, render várakozás, hátralévő
     
     show_overlay_requested = Signal()
     hide_overlay_requested = Signal()
@@ -35,244 +67,96 @@ class AutomationWorker(QObject):
     def __init__(self, process_controller_ref, prompt_file_path, start_line, end_line):
         super().__init__()
         self.pc_ref = process_controller_ref 
-        self.prompt_file_path = prompt_file_path
-        self.start_line = start_line
-        self.end_line = end_line
-        
-        self._is_task_running_in_worker = False 
-        self._stop_requested_by_main = False    # Kemény stop kérés
-        
-        self._is_paused = False 
-        self._pause_event = threading.Event()
-        self._pause_event.set() 
-
-        if hasattr(self.pc_ref.gui_automator, 'stop_requested'):
-            self.pc_ref.gui_automator.stop_requested = False
-        if hasattr(self.pc_ref.gui_automator, 'page_is_prepared'): 
-            self.pc_ref.gui_automator.page_is_prepared = False
-        # print("AutomationWorker inicializálva.")
-
-
-    def _check_pause_and_stop(self):
-        current_qthread = QThread.currentThread()
-        if current_qthread:
-            current_qthread.msleep(1) # Rövid alvás, hogy a Qt események feldolgozódjanak a worker szálon
-
-        if self._stop_requested_by_main: 
-            self.status_updated.emit("Worker: Kemény stop kérés feldolgozva a _check_pause_and_stop-ban.", False)
-            # print("Worker DBG: Kemény stop kérés miatt InterruptedByUserError dobása.")
-            raise InterruptedByUserError("Kemény stop kérés.")
-
-        if self._is_paused:
-            current_thread_id = threading.get_ident()
-            self.status_updated.emit(f"Automatizálás szünetel (Worker szál: {current_thread_id}). Várakozás... Numpad 0 a folytatáshoz.", False)
-            print(f"Worker DBG (szál: {current_thread_id}): Állapot SZÜNETEL. _is_paused={self._is_paused}. _pause_event.wait() hívás...")
-            self._pause_event.wait() 
-            print(f"Worker DBG (szál: {current_thread_id}): Szüneteltetés feloldva, _pause_event.wait() visszatért. _is_paused={self._is_paused}")
-        
-        if self._stop_requested_by_main: 
-            self.status_updated.emit("Worker: Kemény stop kérés feldolgozva szünet után.", False)
-            # print("Worker DBG: Kemény stop kérés miatt InterruptedByUserError dobása (szünet után).")
-            raise InterruptedByUserError("Megszakítva szüneteltetés feloldása után (kemény stop).")
+        # A tényleges folyamatot a Qt-tól független AutomationEngine futtatja; a worker csak
+        # a QThread-hez köti és az eseményeit signálokká alakítja.
+        self.engine = AutomationEngine(process_controller_ref, prompt_file_path, start_line, end_line,
+                                       events=_WorkerSignalEvents(self))
+
+    @property
+    def _is_task_running_in_worker(self):
+        return self.engine.is_running
 
     @Slot()
     def request_hard_stop_from_main(self):
-        self.status_updated.emit("Worker: Kemény leállítási kérelem fogadva.", False)
-        print("Worker DBG: request_hard_stop_from_main hívva.")
-        self._stop_requested_by_main = True
-        if hasattr(self.pc_ref.gui_automator, 'request_stop'): 
-            self.pc_ref.gui_automator.request_stop()
-
-        if self._is_paused: 
-            self._is_paused = False 
-            self._pause_event.set()
-            print("Worker DBG: Szüneteltetés feloldva kemény stop miatt.")
+        self.engine.request_hard_stop()
 
     @Slot()
     def toggle_pause_resume_state(self):
-        current_thread_id = threading.get_ident()
-        print(f"Worker DBG (szál: {current_thread_id}): toggle_pause_resume_state HÍVVA. Jelenlegi _is_paused: {self._is_paused}, _is_task_running_in_worker: {self._is_task_running_in_worker}")
-        
-        if not self._is_task_running_in_worker: 
-            self.status_updated.emit("Worker: Nincs futó feladat, amit szüneteltetni/folytatni lehetne.", True)
-            print("Worker DBG: toggle_pause_resume_state - nincs futó feladat.")
-            return
-
-        if self._is_paused: 
-            self._is_paused = False
-            self._pause_event.set() 
-            self.status_updated.emit("Automatizálás folytatva.", False)
-            print(f"Worker DBG (szál: {current_thread_id}): Állapot: FOLYTATVA. _is_paused={self._is_paused}, _pause_event set.")
-        else: 
-            self._is_paused = True
-            self._pause_event.clear() 
-            self.status_updated.emit("Automatizálás szüneteltetve. Numpad 0 a folytatáshoz.", False)
-            print(f"Worker DBG (szál: {current_thread_id}): Állapot: SZÜNETELTETVE. _is_paused={self._is_paused}, _pause_event clear.")
+        self.engine.toggle_pause_resume()
             
     @Slot()
     def run_automation_task(self):
-        if self._is_task_running_in_worker:
-            self.status_updated.emit("Worker: run_automation_task már fut, új hívás figyelmen kívül hagyva.", True)
-            return
-        
-        # Javított sor:
-        current_thread_id = threading.get_ident()
-        print(f"AutomationWorker DBG: run_automation_task elindult a worker szálon (ID: {current_thread_id}).")
-        
-        self._is_task_running_in_worker = True
-        self._stop_requested_by_main = False 
-        self._is_paused = False 
-        self._pause_event.set()  
-
-        prompt_handler = self.pc_ref.prompt_handler
-        gui_automator = self.pc_ref.gui_automator
-        vpn_manager = self.pc_ref.vpn_manager
-        browser_manager = self.pc_ref.browser_manager
-        current_qthread = QThread.currentThread() # Mentsük el a QThread referenciát
-        
-        if hasattr(gui_automator, 'stop_requested'): gui_automator.stop_requested = False
-        if hasattr(gui_automator, 'page_is_prepared'): gui_automator.page_is_prepared = False
-        
-        self.status_updated.emit("Worker: Folyamat indítása...", False)
-        skip_vpn_steps = False
-        prompts_processed_count = 0
-        total_prompts_to_process = 0
+        self.engine.run()
+
+class AutomationProcessWorker(QObject):
+    """
+    Az AutomationWorker megfelelője, amikor a motor külön folyamatban fut (settings.json
+    "engine_process"): ugyanazokat a signálokat adja, de az eseményeket a motor folyamattól
+    kapja (EngineHostClient), a szüneteltetés és a leállítás pedig üzenetként megy át.
+    A példány a futások között megmarad (a motor folyamattal együtt).
+    """
+    status_updated = Signal(str, bool)
+    progress_updated = Signal(int, int)
+    image_count_updated = Signal(int, int)
+    automation_finished = Signal(str)
+    image_downloaded = Signal(int, str)
+    prompt_finished = Signal(int, str, float, float, int)
 
-        try:
-            self._check_pause_and_stop() 
-            self.status_updated.emit(f"Worker: Promptok betöltése: '{os.path.basename(self.prompt_file_path)}'", False)
-            prompts = prompt_handler.load_prompts(self.prompt_file_path, self.start_line, self.end_line)
-            if not prompts:
-                self.status_updated.emit("Worker Hiba: Nem sikerült promptokat betölteni.", True)
-                self.automation_finished.emit("Sikertelen prompt betöltés")
-                self._is_task_running_in_worker = False
-                return
-            
-            total_prompts_to_process = len(prompts)
-            self.status_updated.emit(f"Worker: {total_prompts_to_process} prompt betöltve.", False)
-            self.progress_updated.emit(0, total_prompts_to_process)
-            self.image_count_updated.emit(0, total_prompts_to_process)
+    show_overlay_requested = Signal()
+    hide_overlay_requested = Signal()
 
-            self._check_pause_and_stop() 
+    def __init__(self, process_controller_ref):
+        super().__init__()
+        self.pc_ref = process_controller_ref
+        self._last_summary = ""
+        self.client = EngineHostClient.from_settings(self._on_engine_event)
 
-            target_vpn_server_group = "Singapore" 
-            target_vpn_country_code = "SG"
-            
-            self.status_updated.emit("Worker: IP ellenőrzés VPN előtt...", False)
-            current_ip_info_before_vpn = get_public_ip_info() 
-            if current_ip_info_before_vpn:
-                if current_ip_info_before_vpn.get('country_code') == target_vpn_country_code.upper():
-                    skip_vpn_steps = True
-                    self.status_updated.emit(f"Worker: Már a célországban ({target_vpn_country_code}). VPN kihagyva.", False)
-            
-            self._check_pause_and_stop() 
-
-            if not skip_vpn_steps:
-                if vpn_manager and vpn_manager.nordvpn_executable_path:
-                    self.status_updated.emit(f"Worker: VPN kapcsolat ({target_vpn_server_group})...", False)
-                    if not vpn_manager.connect_to_server(target_vpn_server_group, target_vpn_country_code):
-                        if not self.pc_ref._stop_requested_by_user: 
-                             self.status_updated.emit("Worker Figyelmeztetés: VPN csatlakozás sikertelennek tűnik.", True)
-                    else: 
-                        if not self.pc_ref._stop_requested_by_user:
-                            self.status_updated.emit("Worker: VPN csatlakozás sikeresnek tűnik.", False)
-                elif not vpn_manager:
-                     self.status_updated.emit("Worker Hiba: VPN Manager nincs inicializálva.", True)
-                elif vpn_manager and not vpn_manager.nordvpn_executable_path: # type: ignore
-                     self.status_updated.emit("Worker Hiba: NordVPN végrehajtható nem található, VPN kihagyva.", True)
-            
-            self._check_pause_and_stop() 
-
-            browser_opened_successfully = False
-            if browser_manager:
-                self.status_updated.emit("Worker: Böngésző indítása...", False)
-                if browser_manager.open_target_url():
-                    browser_opened_successfully = True
-                    self.show_overlay_requested.emit() 
-                    
-                    wait_s = 15 
-                    self.status_updated.emit(f"Worker: Várakozás a böngészőre ({wait_s}s)...", False)
-                    for i in range(wait_s):
-                        self._check_pause_and_stop() 
-                        if current_qthread: current_qthread.msleep(1000) 
-                        else: time.sleep(1)
-
-                        if (i + 1) % 3 == 0 or i == wait_s -1 :
-                             self.status_updated.emit(f"Worker: Böngésző töltődik... ({wait_s - 1 - i}s)", False)
-                else:
-                    if not self._stop_requested_by_main: 
-                        self.status_updated.emit("Worker Hiba: Böngésző megnyitása sikertelen.", True)
-            
-            self._check_pause_and_stop()
-            if not browser_opened_successfully and not self._stop_requested_by_main:
-                self.automation_finished.emit("Böngészőhiba")
-                self._is_task_running_in_worker = False
-                return
-
-            initial_gui_setup_success = False
-            if gui_automator and browser_opened_successfully:
-                self._check_pause_and_stop()
-                self.status_updated.emit("Worker: Oldal előkészítése (PyAutoGUI)...", False)
-                if gui_automator.initial_page_setup():
-                    initial_gui_setup_success = True
-                    self.status_updated.emit("Worker: Oldal előkészítve.", False)
-                else: 
-                    if not self.pc_ref._stop_requested_by_user and not gui_automator.stop_requested:
-                        self.status_updated.emit("Worker Hiba: Oldal előkészítése sikertelen.", True)
-            
-            self._check_pause_and_stop()
-            if not initial_gui_setup_success and not self._stop_requested_by_main and browser_opened_successfully:
-                self.automation_finished.emit("PyAutoGUI előkészítési hiba")
-                self._is_task_running_in_worker = False
-                return
-            
-            if browser_opened_successfully and initial_gui_setup_success:
-                self.status_updated.emit("Worker: Promptok feldolgozásának indítása...", False)
-                for i, prompt_text in enumerate(prompts):
-                    self._check_pause_and_stop() 
-                    
-                    current_prompt_no = self.start_line + i
-                    self.status_updated.emit(f"Worker: Feldolgozás: Prompt #{current_prompt_no} ({i+1}/{total_prompts_to_process})", False)
-                    self.image_count_updated.emit(i + 1, total_prompts_to_process)
-
-                    if gui_automator.process_single_prompt(prompt_text): 
-                        prompts_processed_count += 1
-                        self.progress_updated.emit(prompts_processed_count, total_prompts_to_process)
-                    else: 
-                        if not self.pc_ref._stop_requested_by_user and not gui_automator.stop_requested:
-                            self.status_updated.emit(f"Worker Hiba: #{current_prompt_no} prompt feldolgozásakor.", True)
-                    
-                    self._check_pause_and_stop() 
-
-                    if i < total_prompts_to_process - 1: 
-                        self._check_pause_and_stop()
-                        pause_s = 2
-                        self.status_updated.emit(f"Worker: Szünet ({pause_s}s)...", False)
-                        for _sec_idx in range(pause_s):
-                            self._check_pause_and_stop() 
-                            if current_qthread: current_qthread.msleep(1000)
-                            else: time.sleep(1) 
-            
-            self._check_pause_and_stop() 
-            summary_msg = f"Feldolgozva: {prompts_processed_count}/{total_prompts_to_process}."
-            if self._stop_requested_by_main : 
-                summary_msg = f"Végleg leállítva. {summary_msg}"
-            self.automation_finished.emit(summary_msg)
-
-        except InterruptedByUserError as e:
-            self.status_updated.emit(f"Worker: Folyamat megszakítva - {e}", False) 
-            self.automation_finished.emit(f"Felhasználó által megszakítva/leállítva. Feldolgozva: {prompts_processed_count}/{total_prompts_to_process}.")
-        except Exception as e:
-            error_msg = f"Worker Kritikus Hiba: {e}"
-            self.status_updated.emit(error_msg, True)
-            print(f"WORKER KRITIKUS HIBA: {e}\n{traceback.format_exc()}")
-            self.automation_finished.emit("Kritikus hiba történt a workerben.")
-        finally:
-            print(f"AutomationWorker DBG: run_automation_task finally blokk. _is_task_running_in_worker -> False")
-            self._is_task_running_in_worker = False
-            self._is_paused = False 
-            self._pause_event.set() 
+    @property
+    def _is_task_running_in_worker(self):
+        return self.client.is_run_active
+
+    def start_run(self, prompt_file_path, start_line, end_line):
+        self._last_summary = ""
+        if not self.client.start_run(prompt_file_path, start_line, end_line):
+            self.status_updated.emit("A motor folyamat nem érhető el.", True)
+            self.automation_finished.emit("A motor folyamat nem érhető el.")
+
+    def request_hard_stop_from_main(self):
+        self.client.request_stop()
+
+    def toggle_pause_resume_state(self):
+        self.client.toggle_pause_resume()
+
+    def shutdown(self):
+        self.client.shutdown()
+
+    def _on_engine_event(self, event, fields):
+        # Az olvasó szálon fut; a signálok sorban állítva jutnak el a GUI szálra.
+        if event == "status":
+            # A "level" csak a komponensek (automator, VPN, böngésző) közvetlen üzeneteiben szerepel
+            self.pc_ref.update_gui_status(fields["message"], fields.get("is_error", False), level=fields.get("level"))
+        elif event == "progress":
+            self.progress_updated.emit(fields["current"], fields["total"])
+        elif event == "image":
+            self.image_count_updated.emit(fields["current"], fields["total"])
+        elif event == "download":
+            self.image_downloaded.emit(fields["prompt_line"], fields["path"])
+        elif event == "prompt":
+            self.prompt_finished.emit(fields["prompt_line"], fields["outcome"], float(fields["duration_s"]),
+                                      float(fields["render_wait_s"]), fields["remaining"])
+        elif event == "finished":
+            self._last_summary = fields.get("summary", "")
+        elif event == EVENT_RUN_DONE:
+            # A motor folyamat a böngésző lezárását és a VPN elengedését már elvégezte.
+            self.automation_finished.emit(self._last_summary)
+        elif event == "show_overlay":
+            self.show_overlay_requested.emit()
+        elif event == "hide_overlay":
             self.hide_overlay_requested.emit()
+        elif event == EVENT_HOST_EXIT:
+            # Egy aktív futást a kliens már lezárt (finished + run_done); a következő indítás új folyamatot indít.
+            self.pc_ref.update_gui_status("A motor folyamat kilépett.", False, level="debug")
+
 
 # === ProcessController Osztály Kezdete (A többi része változatlan az előző teljes válaszhoz képest) ===
 class ProcessController(QObject): 
@@ -285,6 +169,9 @@ class ProcessController(QObject):
 
         self.automation_thread = None
         self.worker = None
+        # Külön folyamatban futó motor (settings.json "engine_process"); az első indításkor jön létre.
+        self.use_engine_process = EngineHostClient.is_enabled_in_settings()
+        self._process_worker = None
         
         try:
             current_file_path = os.path.abspath(__file__)
@@ -295,17 +182,67 @@ class ProcessController(QObject):
         self.downloads_dir = os.path.join(self.project_root_path, "downloads")
         os.makedirs(self.downloads_dir, exist_ok=True)
         
-        self.prompt_handler = PromptHandler(self)
-        self.gui_automator = PyAutoGuiAutomator(self) 
-        self.vpn_manager = VpnManager(self)           
-        self.browser_manager = BrowserManager(self)   
+        # Állapotüzenetek: a worker csak a buszra ír, a címkéket a GUI szál időzítője frissíti
+        # összevontan (~10 Hz); a hibák azonnal megjelennek.
+        self._setup_status_bus()
+        # Opcionális Prometheus végpont (settings.json "metrics" szakasz; alapértelmezésben kikapcsolva).
+        # Külön folyamatú motornál a számlálók ott nőnek, ezért a végpontot is a motor folyamat nyitja.
+        self.metrics_server = None if self.use_engine_process else start_metrics_server_from_settings(notify_callback=self.update_gui_status)
 
-        self.hotkey_listener = GlobalHotkeyListener()
-        self._connect_hotkey_signals()
-        self.hotkey_listener.start()
+        self.prompt_handler = PromptHandler(self)
+        # Élő átviteli/ETA statisztika az overlay számára (a worker prompt_finished signáljából).
+        self.run_stats = RunStatsAccumulator()
+        # A letöltött képek utófeldolgozása (metaadat, bélyegkép, WebP) külön folyamatokban;
+        # a pool csak az első képnél indul el.
+        self.post_processor = PostProcessor.from_settings(notify_callback=self.update_gui_status)
+        # A nehéz komponenseket (pyautogui, numpy, easyocr/torch, requests) csak az első
+        # használatkor hozzuk létre, hogy a főablak ne várjon rájuk (lásd a property-ket lent).
+        self._gui_automator = None
+        self._vpn_manager = None
+        self._browser_manager = None
+        self._components_lock = threading.Lock()
+
+        # A pynput alapú globális billentyűfigyelőt az első eseményciklus-körben indítjuk,
+        # miután a főablak már megjelent.
+        self.hotkey_listener = None
+        QTimer.singleShot(0, self._start_hotkey_listener)
         
         print(f"ProcessController inicializálva. Letöltési mappa: {self.downloads_dir}")
 
+    @property
+    def gui_automator(self):
+        with self._components_lock:
+            if self._gui_automator is None:
+                with profile_section("PyAutoGuiAutomator (import + init)"):
+                    from .pyautogui_automator import PyAutoGuiAutomator
+                    self._gui_automator = PyAutoGuiAutomator(self)
+            return self._gui_automator
+
+    @property
+    def vpn_manager(self):
+        with self._components_lock:
+            if self._vpn_manager is None:
+                with profile_section("VpnManager (import + init)"):
+                    from .vpn_manager import VpnManager
+                    self._vpn_manager = VpnManager(self)
+            return self._vpn_manager
+
+    @property
+    def browser_manager(self):
+        with self._components_lock:
+            if self._browser_manager is None:
+                with profile_section("BrowserManager (import + init)"):
+                    from .browser_manager import BrowserManager
+                    self._browser_manager = BrowserManager(self)
+            return self._browser_manager
+
+    def _start_hotkey_listener(self):
+        with profile_section("GlobalHotkeyListener (import + init + start)"):
+            from .global_hotkey_listener import GlobalHotkeyListener
+            self.hotkey_listener = GlobalHotkeyListener()
+            self._connect_hotkey_signals()
+            self.hotkey_listener.start()
+
     def _connect_hotkey_signals(self):
         if self.hotkey_listener:
             self.hotkey_listener.emitter.pause_resume_requested.connect(self.handle_pause_resume_request)
@@ -320,7 +257,10 @@ class ProcessController(QObject):
     def handle_pause_resume_request(self):
         current_thread_id = threading.get_ident() 
         print(f"ProcessController DBG (szál: {current_thread_id}): Pause/Resume kérés fogadva a hotkey listenertől.")
-        if self.worker and self.automation_thread and self.automation_thread.isRunning() and hasattr(self.worker, '_is_task_running_in_worker') and self.worker._is_task_running_in_worker:
+        if self.worker is not None and self.worker is self._process_worker and self.worker._is_task_running_in_worker:
+            print("ProcessController DBG: Kérés továbbítása a motor folyamatnak.")
+            self.worker.toggle_pause_resume_state()
+        elif self.worker and self.automation_thread and self.automation_thread.isRunning() and hasattr(self.worker, '_is_task_running_in_worker') and self.worker._is_task_running_in_worker:
             print("ProcessController DBG: Kérés továbbítása a worker.toggle_pause_resume_state felé.")
             QMetaObject.invokeMethod(self.worker, "toggle_pause_resume_state", Qt.QueuedConnection)
         else:
@@ -373,6 +313,18 @@ class ProcessController(QObject):
         if self.overlay_window: 
             self._update_overlay_image_count(current_image, total_images)
 
+    @Slot(int, str)
+    def _handle_worker_image_downloaded(self, prompt_line_no, file_path):
+        print(f"ProcessController DBG: #{prompt_line_no} prompt képe elmentve: {file_path}")
+        self.update_gui_status(f"#{prompt_line_no} prompt képe elmentve: {os.path.basename(file_path)}", False)
+
+    @Slot(int, str, float, float, int)
+    def _handle_worker_prompt_finished(self, prompt_line_no, outcome, duration_s, render_wait_s, remaining):
+        self.run_stats.record_prompt(outcome, duration_s, render_wait_s, remaining)
+        if self.overlay_window and hasattr(self.overlay_window, 'update_run_stats_label'):
+            QMetaObject.invokeMethod(self.overlay_window, "update_run_stats_label", Qt.QueuedConnection,
+                                     Q_ARG(str, self.run_stats.format_overlay_text()))
+
     @Slot(str)
     def _handle_automation_finished(self, summary_message):
         print(f"ProcessController DBG: _handle_automation_finished, üzenet: {summary_message}")
@@ -380,13 +332,13 @@ class ProcessController(QObject):
         self._is_automation_active = False
         self._stop_requested_by_user = False 
 
-        if hasattr(self.gui_automator, 'close_browser'):
+        if self._gui_automator and hasattr(self._gui_automator, 'close_browser'):
             print("ProcessController: Böngésző bezárási kísérlet a worker után.")
-            self.gui_automator.close_browser()
+            self._gui_automator.close_browser()
 
-        if self.vpn_manager and hasattr(self.vpn_manager, 'is_connected_to_target_server') and self.vpn_manager.is_connected_to_target_server:
-            self.update_gui_status("VPN kapcsolat bontása a folyamat végén (ha aktív)...", False)
-            self.vpn_manager.disconnect_vpn()
+        if self._vpn_manager and self._vpn_manager.is_connected_to_target_server:
+            # keep_connected esetén a kapcsolat megmarad a következő futáshoz (tétlenségi időzítővel bontva).
+            self._vpn_manager.release_session()
 
         if self.automation_thread:
             print("ProcessController DBG: automation_thread.quit() hívása (_handle_automation_finished).")
@@ -397,7 +349,9 @@ class ProcessController(QObject):
                     self.automation_thread.terminate() 
                     self.automation_thread.wait()      
             self.automation_thread = None 
-        if self.worker: 
+        if self.worker is self._process_worker:
+            self.worker = None  # A motor folyamat és a kliense a következő futásra megmarad
+        elif self.worker: 
             self.worker.deleteLater()
             self.worker = None 
         print("ProcessController DBG: Autom. szál és worker erőforrásai felszabadítva.")
@@ -420,6 +374,25 @@ class ProcessController(QObject):
             self.overlay_window.close()
             self.overlay_window = None 
 
+    def _connect_worker_signals(self, worker):
+        worker.status_updated.connect(self._handle_worker_status_update)
+        worker.progress_updated.connect(self._handle_worker_progress_update)
+        worker.image_count_updated.connect(self._handle_worker_image_count_update)
+        worker.automation_finished.connect(self._handle_automation_finished)
+        worker.image_downloaded.connect(self._handle_worker_image_downloaded)
+        worker.prompt_finished.connect(self._handle_worker_prompt_finished)
+        worker.show_overlay_requested.connect(self._handle_show_overlay_request)
+        worker.hide_overlay_requested.connect(self._handle_hide_overlay_request)
+
+    def _start_engine_process_run(self, prompt_file_path, start_line, end_line):
+        if self._process_worker is None:
+            self._process_worker = AutomationProcessWorker(self)
+            self._connect_worker_signals(self._process_worker)
+        self.worker = self._process_worker
+        self.update_gui_status("Automatizálás indítása a motor folyamatban...", False)
+        self.worker.start_run(prompt_file_path, start_line, end_line)
+        print("ProcessController DBG: Futás elküldve a motor folyamatnak.")
+
     def start_full_automation_process(self, prompt_file_path, start_line, end_line):
         if self._is_automation_active or (self.automation_thread and self.automation_thread.isRunning()):
             self.update_gui_status("Egy automatizálási folyamat már fut!", True)
@@ -428,17 +401,17 @@ class ProcessController(QObject):
         print("ProcessController DBG: start_full_automation_process hívva, új worker indítása.")
         self._is_automation_active = True
         self._stop_requested_by_user = False 
+        self.run_stats.reset()
+        if self._vpn_manager:
+            self._vpn_manager.cancel_idle_disconnect()
+        if self.use_engine_process:
+            self._start_engine_process_run(prompt_file_path, start_line, end_line)
+            return
 
         self.automation_thread = QThread(self) 
         self.worker = AutomationWorker(self, prompt_file_path, start_line, end_line)
         self.worker.moveToThread(self.automation_thread)
-
-        self.worker.status_updated.connect(self._handle_worker_status_update)
-        self.worker.progress_updated.connect(self._handle_worker_progress_update)
-        self.worker.image_count_updated.connect(self._handle_worker_image_count_update)
-        self.worker.automation_finished.connect(self._handle_automation_finished)
-        self.worker.show_overlay_requested.connect(self._handle_show_overlay_request)
-        self.worker.hide_overlay_requested.connect(self._handle_hide_overlay_request)
+        self._connect_worker_signals(self.worker)
         
         self.automation_thread.started.connect(self.worker.run_automation_task)
         self.automation_thread.finished.connect(self.worker.deleteLater) 
@@ -451,25 +424,46 @@ class ProcessController(QObject):
     def stop_automation_process(self): 
         print("ProcessController DBG: KEMÉNY stop_automation_process hívva.")
         self._stop_requested_by_user = True 
-        if hasattr(self.gui_automator, 'request_stop'):
-             self.gui_automator.request_stop()
+        if self._gui_automator and hasattr(self._gui_automator, 'request_stop'):
+             self._gui_automator.request_stop()
 
-        if self.worker and self.automation_thread and self.automation_thread.isRunning():
+        if self.worker is not None and self.worker is self._process_worker:
+            self.update_gui_status("Automatizálás KEMÉNY leállítási kérelme elküldve a motor folyamatnak...", False)
+            self.worker.request_hard_stop_from_main()
+        elif self.worker and self.automation_thread and self.automation_thread.isRunning():
             self.update_gui_status("Automatizálás KEMÉNY leállítási kérelme elküldve a workernek...", False)
             print("ProcessController DBG: Kérés worker.request_hard_stop_from_main felé.")
             QMetaObject.invokeMethod(self.worker, "request_hard_stop_from_main", Qt.QueuedConnection)
         elif not self._is_automation_active:
              self.update_gui_status("Nincs aktívan futó automatizálási folyamat a kemény leállításhoz.", False)
 
-    def update_gui_status(self, message, is_error=False):
+    def _setup_status_bus(self):
+        cfg = get_section("status_bus")
+        min_interval_s = cfg.get("label_min_interval_ms", 100) / 1000.0
+        min_level = cfg.get("label_min_level", "info")
+        self.status_bus = StatusBus(history_size=cfg.get("history_size", 500))
+        self.status_bus.add_sink("main_window", self._deliver_status_to_main_window, min_level, min_interval_s)
+        self.status_bus.add_sink("overlay", self._deliver_status_to_overlay, min_level, min_interval_s)
+        self._status_flush_timer = QTimer(self)
+        self._status_flush_timer.setInterval(cfg.get("flush_interval_ms", 100))
+        self._status_flush_timer.timeout.connect(self.status_bus.flush)
+        self._status_flush_timer.start()
+
+    def update_gui_status(self, message, is_error=False, level=None):
+        # Bármely szálról hívható; a kézbesítést a StatusBus végzi (lásd _setup_status_bus).
+        self.status_bus.publish(message, is_error=is_error, level=level)
+
+    def _deliver_status_to_main_window(self, entry):
         if self.main_window and hasattr(self.main_window, 'update_status'):
-            display_message = message
-            if is_error and not any(message.lower().startswith(p) for p in ["hiba:", "vpn hiba:", "web hiba:", "böngésző hiba:", "automatizálási hiba:"]):
-                display_message = f"Hiba: {message}"
-            QMetaObject.invokeMethod(self.main_window, "update_status", Qt.QueuedConnection, Q_ARG(str, display_message))
+            message = entry.message
+            if entry.level == ERROR and not any(message.lower().startswith(p) for p in ["hiba:", "vpn hiba:", "web hiba:", "böngésző hiba:", "automatizálási hiba:"]):
+                message = f"Hiba: {message}"
+            QMetaObject.invokeMethod(self.main_window, "update_status", Qt.QueuedConnection, Q_ARG(str, message))
 
-        if self.overlay_window and hasattr(self.overlay_window, 'update_action_label'):
-            QMetaObject.invokeMethod(self.overlay_window, "update_action_label", Qt.QueuedConnection, Q_ARG(str, message))
+    def _deliver_status_to_overlay(self, entry):
+        overlay_window = self.overlay_window
+        if overlay_window and hasattr(overlay_window, 'update_action_label'):
+            QMetaObject.invokeMethod(overlay_window, "update_action_label", Qt.QueuedConnection, Q_ARG(str, entry.message))
 
     def _update_overlay_progress(self, current_step, total_steps):
         if self.overlay_window and hasattr(self.overlay_window, 'update_progress_bar'):
@@ -490,7 +484,7 @@ class ProcessController(QObject):
         if self._is_automation_active and self.worker and self.automation_thread and self.automation_thread.isRunning():
             print("ProcessController DBG cleanup: Aktív worker szál kemény leállítása...")
             self._stop_requested_by_user = True 
-            if hasattr(self.gui_automator, 'request_stop'): self.gui_automator.request_stop()
+            if self._gui_automator and hasattr(self._gui_automator, 'request_stop'): self._gui_automator.request_stop()
             QMetaObject.invokeMethod(self.worker, "request_hard_stop_from_main", Qt.QueuedConnection)
             if self.automation_thread:
                 print("ProcessController DBG cleanup: Várakozás a worker szál leállására...")
@@ -511,6 +505,21 @@ class ProcessController(QObject):
         
         self.automation_thread = None 
         self.worker = None
+        if self._process_worker:
+            print("ProcessController DBG cleanup: A motor folyamat leállítása...")
+            self._process_worker.shutdown()
+            self._process_worker = None
+        self._status_flush_timer.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+
+        if self._vpn_manager:
+            print("ProcessController DBG cleanup: Megtartott VPN kapcsolat bontása (ha van)...")
+            self._vpn_manager.shutdown()
+
+        if self.post_processor:
+            print("ProcessController DBG cleanup: Utófeldolgozó pool leürítése...")
+            self.post_processor.drain()
         print("ProcessController DBG cleanup befejezve.")
 
     def is_running(self): 
@@ -5,12 +5,18 @@ import os # Bár itt lehet, hogy nem lesz rá közvetlenül szükség, de az ui_
 
 try:
     from utils.ui_scanner import (find_generate_button_dynamic, 
+                                  find_generate_button_near,
                                   GENERATE_BUTTON_COLOR_TARGET) # Csak ami itt kell
 except ImportError:
     print("FIGYELEM: Az 'utils.ui_scanner' modul nem található (PromptExecutor).")
     find_generate_button_dynamic = None
+    find_generate_button_near = None
     GENERATE_BUTTON_COLOR_TARGET = None 
 
+from .phase_timer import PHASE_FIELD_ACTIVATION, PHASE_TYPING, PHASE_GENERATE_CLICK
+
+GENERATE_BUTTON_KEYS = ("generate_button_click_x", "generate_button_click_y")
+
 class PromptExecutor:
     def __init__(self, automator_ref):
         """
@@ -20,8 +26,8 @@ class PromptExecutor:
         """
         self.automator = automator_ref
 
-    def _notify_status(self, message, is_error=False):
-        self.automator._notify_status(message, is_error)
+    def _notify_status(self, message, is_error=False, level=None):
+        self.automator._notify_status(message, is_error, level=level)
 
     def _check_for_stop_request(self):
         return self.automator._check_for_stop_request()
@@ -32,6 +38,8 @@ class PromptExecutor:
         """
         if self._check_for_stop_request(): return False
         self._notify_status(f"PROMPT VÉGREHAJTÁS: Kezdés ('{prompt_text[:20]}...')")
+        phase_timer = self.automator.phase_timer
+        phase_timer.start_phase(PHASE_FIELD_ACTIVATION)
 
         # 1. Prompt mező újra-aktiválása
         # A _find_and_activate_prompt_field metódus a PyAutoGuiAutomator-ban van,
@@ -41,6 +49,7 @@ class PromptExecutor:
             return False
 
         # 2. Prompt beírása
+        phase_timer.start_phase(PHASE_TYPING)
         self._notify_status(f"Prompt beírása: '{prompt_text[:30]}...'")
         try:
             pyautogui.hotkey('ctrl', 'a'); time.sleep(0.05) 
@@ -51,44 +60,65 @@ class PromptExecutor:
             return False
 
         # 3. Generálás Gomb kezelése
+        phase_timer.start_phase(PHASE_GENERATE_CLICK)
         gen_x, gen_y = None, None
         action_taken_for_generate_button = False
 
-        # Először a mentett koordinátákat próbáljuk
+        coordinate_store = self.automator.coordinate_store
+        previous_point = self.automator.last_known_generate_point
+
+        # Először a mentett koordinátákat próbáljuk (ha a pixel aláírásuk még egyezik)
         if "generate_button_click_x" in self.automator.coordinates and \
            "generate_button_click_y" in self.automator.coordinates:
-            gen_x = self.automator.coordinates["generate_button_click_x"]
-            gen_y = self.automator.coordinates["generate_button_click_y"]
-            self._notify_status(f"Mentett generálás gomb pozíció használata: X={gen_x}, Y={gen_y}")
-            action_taken_for_generate_button = True
-        # Ha nincs mentett, és a dinamikus kereső elérhető és van prompt téglalapunk
-        elif find_generate_button_dynamic and self.automator.last_known_prompt_rect and GENERATE_BUTTON_COLOR_TARGET:
-            self._notify_status(f"Generálás gomb dinamikus keresése szín ({GENERATE_BUTTON_COLOR_TARGET}) alapján...")
-            pos = find_generate_button_dynamic(
-                self.automator.last_known_prompt_rect, 
-                self.automator.screen_width, 
-                self.automator.screen_height, 
-                notify_callback=self._notify_status
-            )
-            if pos:
-                gen_x, gen_y = pos
-                self.automator.coordinates["generate_button_click_x"] = gen_x
-                self.automator.coordinates["generate_button_click_y"] = gen_y
-                self.automator._save_coordinates() 
-                self._notify_status(f"Dinamikusan talált generálás gomb. Kattintás ide: X={gen_x}, Y={gen_y}")
+            if coordinate_store.verify("generate_button") is False:
+                self._notify_status("A mentett generálás gomb pozíció nem egyezik a képernyővel, újrakeresés...", is_error=True)
+                coordinate_store.forget("generate_button", GENERATE_BUTTON_KEYS)
+            else:
+                gen_x = self.automator.coordinates["generate_button_click_x"]
+                gen_y = self.automator.coordinates["generate_button_click_y"]
+                previous_point = (gen_x, gen_y)
+                self._notify_status(f"Mentett generálás gomb pozíció használata: X={gen_x}, Y={gen_y}", level="debug")
+                if "generate_button" not in coordinate_store.signatures:
+                    coordinate_store.capture_signature("generate_button", gen_x, gen_y)
                 action_taken_for_generate_button = True
-            else: 
+
+        # Ha nincs (érvényes) mentett: előbb az utolsó ismert kattintási pont környékén keresünk bővülő
+        # ablakban (ms nagyságrend), és csak végső esetben a prompt terület alapján, pixelenként.
+        if not action_taken_for_generate_button:
+            can_search_near = bool(previous_point and find_generate_button_near)
+            can_search_dynamic = bool(find_generate_button_dynamic and self.automator.last_known_prompt_rect and GENERATE_BUTTON_COLOR_TARGET)
+            if not (can_search_near or can_search_dynamic):
+                self._notify_status("HIBA: Generálás gomb pozíciója nem ismert (dinamikus kereső nem elérhető/konfigurálva, vagy a prompt terület ismeretlen, és nincs mentett).", is_error=True)
+                return False
+            pos = None
+            if can_search_near:
+                pos = find_generate_button_near(previous_point, self.automator.screen_width, self.automator.screen_height,
+                                                notify_callback=self._notify_status)
+            if not pos and can_search_dynamic:
+                self._notify_status(f"Generálás gomb dinamikus keresése szín ({GENERATE_BUTTON_COLOR_TARGET}) alapján...")
+                pos = find_generate_button_dynamic(
+                    self.automator.last_known_prompt_rect, 
+                    self.automator.screen_width, 
+                    self.automator.screen_height, 
+                    notify_callback=self._notify_status
+                )
+            if not pos:
                 self._notify_status("HIBA: Generálás gombot nem sikerült dinamikusan megtalálni.", is_error=True)
                 return False # Ha a dinamikus keresés elindult, de nem talált semmit
-        else:
-            self._notify_status("HIBA: Generálás gomb pozíciója nem ismert (dinamikus kereső nem elérhető/konfigurálva, vagy a prompt terület ismeretlen, és nincs mentett).", is_error=True)
-            return False
+            gen_x, gen_y = pos
+            self.automator.coordinates["generate_button_click_x"] = gen_x
+            self.automator.coordinates["generate_button_click_y"] = gen_y
+            self.automator._save_coordinates() 
+            coordinate_store.capture_signature("generate_button", gen_x, gen_y)
+            self._notify_status(f"Dinamikusan talált generálás gomb. Kattintás ide: X={gen_x}, Y={gen_y}")
+            action_taken_for_generate_button = True
 
         if not action_taken_for_generate_button or gen_x is None:
             self._notify_status("HIBA: Nem sikerült meghatározni a generálás gomb pozícióját a kattintáshoz.", is_error=True)
             return False
 
         try:
+            self.automator.last_known_generate_point = (gen_x, gen_y)
             pyautogui.moveTo(gen_x, gen_y, duration=0.2)
             pyautogui.click()
             self._notify_status("Generálás elindítva.")
@@ -97,7 +127,5 @@ class PromptExecutor:
         except Exception as e_click_generate:
             self._notify_status(f"Hiba történt a generálás gombra való kattintás közben (X:{gen_x}, Y:{gen_y}): {e_click_generate}", is_error=True)
             # Hiba esetén töröljük a (potenciálisan rossz) mentett koordinátát
-            if "generate_button_click_x" in self.automator.coordinates: del self.automator.coordinates["generate_button_click_x"]
-            if "generate_button_click_y" in self.automator.coordinates: del self.automator.coordinates["generate_button_click_y"]
-            self.automator._save_coordinates()
+            coordinate_store.forget("generate_button", GENERATE_BUTTON_KEYS)
             return False
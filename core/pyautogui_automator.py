@@ -2,26 +2,37 @@
 import pyautogui
 import time
 import os
-import json 
+import threading
 import numpy as np # Megtartjuk, ha a PageInitializer-ben az OCR mégis itt lenne definiálva
 
 try:
     from utils.ui_scanner import (find_prompt_area_dynamically, 
+                                  find_prompt_area_near,
                                   find_generate_button_dynamic, 
                                   get_screen_size_util, 
+                                  get_pixel_color_safe_util,
+                                  is_color_prompt_area_like,
                                   GENERATE_BUTTON_COLOR_TARGET)
 except ImportError:
     print("FIGYELEM: Az 'utils.ui_scanner' modul nem található vagy hibás. A dinamikus UI elemkeresés nem lesz teljesen elérhető.")
     find_prompt_area_dynamically = None
+    find_prompt_area_near = None
     find_generate_button_dynamic = None
     get_screen_size_util = lambda: pyautogui.size() 
+    get_pixel_color_safe_util = None
+    is_color_prompt_area_like = None
     GENERATE_BUTTON_COLOR_TARGET = None 
 
-try:
-    import easyocr
-except ImportError:
-    print("FIGYELEM: Az 'easyocr' könyvtár nincs telepítve vagy nem érhető el.")
-    easyocr = None
+# Az 'easyocr' (és vele a torch) importálása több másodperc, ezért csak a warm_up_ocr() tölti be.
+easyocr = None
+
+from utils.settings_loader import get_setting
+from utils.system_helper import get_display_scale
+from .download_watcher import DownloadWatcher, default_browser_download_dir
+from .output_quality_checker import OutputQualityChecker, quarantine_output
+from .coordinate_store import CoordinateStore, build_profile_key
+from .phase_timer import PromptPhaseTimer
+from .debug_capture_store import DebugCaptureStore
 
 # Új importok a szétbontott modulokhoz
 from .page_initializer import PageInitializer
@@ -46,14 +57,10 @@ class PyAutoGuiAutomator:
                 self._notify_status(f"Hiba a config mappa létrehozásakor: {e_mkdir}", is_error=True)
         self.ui_coords_file = os.path.join(self.config_dir, "ui_coordinates.json")
 
+        # Az EasyOCR olvasót nem itt hozzuk létre (több másodperc), hanem a warm_up_ocr()
+        # hívásakor, amit a worker az indítási fázisokkal párhuzamosan futtat.
         self.ocr_reader = None 
-        if easyocr: 
-            try:
-                self._notify_status("EasyOCR olvasó inicializálása ('en', 'hu')...")
-                self.ocr_reader = easyocr.Reader(['en', 'hu'], gpu=False)
-                self._notify_status("EasyOCR olvasó sikeresen inicializálva.")
-            except Exception as e_ocr_init:
-                self._notify_status(f"Hiba az EasyOCR olvasó inicializálásakor: {e_ocr_init}", is_error=True)
+        self._ocr_lock = threading.Lock()
         
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.1 
@@ -64,8 +71,30 @@ class PyAutoGuiAutomator:
              self._notify_status("Figyelmeztetés: get_screen_size_util nem volt hívható vagy hibát adott, pyautogui.size() használata.", is_error=True)
              self.screen_width, self.screen_height = pyautogui.size()
             
+        # Letöltés-megerősítés: a böngésző letöltési mappáját figyeljük, a kész képet a
+        # ProcessController.downloads_dir mappába helyezzük át.
+        self.download_watcher = DownloadWatcher(get_setting("browser_download_dir") or default_browser_download_dir(),
+                                                notify_callback=self._notify_status)
+        self.download_confirm_timeout_s = get_setting("download_confirm_timeout_s", 30)
+        # Promptonkénti szakaszidők (logs/prompt_phases.jsonl); a promptot az AutomationEngine nyitja/zárja.
+        self.phase_timer = PromptPhaseTimer.from_settings()
+        # Hibakereső képernyőképek háttérszálon, korlátos, forgó tárolóba (logs/debug_captures/).
+        self.debug_captures = DebugCaptureStore.from_settings(
+            notify_callback=lambda msg, is_error=False: self._notify_status(msg, is_error, level=None if is_error else "debug"))
+        self.last_downloaded_file = None
+        # A letöltött kép perceptuális hash alapú ellenőrzése (üres, duplikált, ismert hibakártya).
+        self.output_checker = OutputQualityChecker(os.path.join(self.config_dir, "bad_output_signatures.json"),
+                                                   notify_callback=self._notify_status)
+        self.last_output_rejection = None
+
+        # A koordináták kijelzőprofilonként (képernyőméret, DPI, URL) tárolódnak, pixel aláírással.
+        profile_key = build_profile_key(self.screen_width, self.screen_height, get_display_scale(),
+                                        get_setting("target_url", "https://labs.google/fx/tools/whisk"))
+        self.coordinate_store = CoordinateStore(self.ui_coords_file, profile_key,
+                                                notify_callback=lambda msg, is_error=False: self._notify_status(msg, is_error))
         self.coordinates = self._load_coordinates() 
         self.last_known_prompt_rect = self.coordinates.get("prompt_rect") if isinstance(self.coordinates.get("prompt_rect"), dict) else None
+        self.last_known_generate_point = None  # Az utolsó kattintás helye; a lokális újrakeresés innen indul
 
         # Handler osztályok példányosítása
         self.page_initializer = PageInitializer(self)
@@ -74,35 +103,59 @@ class PyAutoGuiAutomator:
 
         print("PyAutoGuiAutomator inicializálva (moduláris felépítéssel).")
 
+    def warm_up_ocr(self):
+        """
+        Létrehozza az EasyOCR olvasót (ha még nincs), és egy kis üres képen lefuttat
+        egy felismerést, hogy a modellek betöltése ne az első valódi keresésnél történjen.
+        Többször is hívható; szálbiztos.
+        """
+        with self._ocr_lock:
+            if self.ocr_reader is not None:
+                return True
+            global easyocr
+            if easyocr is None:
+                try:
+                    import easyocr
+                except ImportError:
+                    print("FIGYELEM: Az 'easyocr' könyvtár nincs telepítve vagy nem érhető el.")
+                    easyocr = False
+            if not easyocr:
+                self._notify_status("EasyOCR nem érhető el, OCR bemelegítés kihagyva.", is_error=True)
+                return False
+            try:
+                self._notify_status("EasyOCR olvasó inicializálása ('en', 'hu')...")
+                reader = easyocr.Reader(['en', 'hu'], gpu=False)
+                reader.readtext(np.full((32, 128, 3), 255, dtype=np.uint8), detail=0)
+                self.ocr_reader = reader
+                self._notify_status("EasyOCR olvasó sikeresen inicializálva és bemelegítve.")
+                return True
+            except Exception as e_ocr_init:
+                self._notify_status(f"Hiba az EasyOCR olvasó inicializálásakor: {e_ocr_init}", is_error=True)
+                return False
+
     def _load_coordinates(self):
-        try:
-            if os.path.exists(self.ui_coords_file):
-                with open(self.ui_coords_file, 'r') as f:
-                    coords = json.load(f)
-                    if coords and isinstance(coords, dict) :
-                        self._notify_status(f"UI koordináták betöltve: {self.ui_coords_file}")
-                        return coords
-            self._notify_status(f"Koordináta fájl ({self.ui_coords_file}) nem található vagy üres. Dinamikus keresés szükséges.")
-        except Exception as e:
-            self._notify_status(f"Hiba a koordináták betöltése közben: {e}", is_error=True)
-        return {} 
+        # A visszaadott dict a CoordinateStore állapota; módosítás után _save_coordinates() menti.
+        return self.coordinate_store.load()
 
     def _save_coordinates(self):
-        try:
-            if not self.coordinates: 
-                self._notify_status("Nincsenek érvényes koordináták a mentéshez (self.coordinates üres).", is_error=True)
-                return
-            if not os.path.exists(self.config_dir):
-                os.makedirs(self.config_dir)
-            with open(self.ui_coords_file, 'w') as f:
-                json.dump(self.coordinates, f, indent=4)
-            self._notify_status(f"UI koordináták elmentve: {self.ui_coords_file}")
-        except Exception as e:
-            self._notify_status(f"Hiba a koordináták mentése közben: {e}", is_error=True)
+        # Késleltetett, atomi mentés (a gyors egymásutáni felfedezések egy írásba olvadnak).
+        self.coordinate_store.save()
+
+    def save_debug_capture(self, image, reason, **extra):
+        """Hibakereső kép mentésének kérése (nem blokkol); a futás és az aktuális prompt azonosítójával indexelve."""
+        if not self.debug_captures or image is None:
+            return False
+        return self.debug_captures.submit(image, reason, run_id=self.phase_timer.run_id,
+                                          prompt_line_no=self.phase_timer.current_prompt_line, **extra)
 
-    def _notify_status(self, message, is_error=False):
+    @staticmethod
+    def prompt_signature_anchor(rect):
+        """A prompt mező aláírásának horgonypontja: alul középen, ahová a beírt szöveg nem ér el."""
+        return rect['x'] + rect['width'] // 2, rect['y'] + int(rect['height'] * 0.85)
+
+    def _notify_status(self, message, is_error=False, level=None):
         if self.process_controller and hasattr(self.process_controller, 'update_gui_status'):
-            self.process_controller.update_gui_status(message, is_error=is_error)
+            self.process_controller.update_gui_status(message, is_error=is_error, level=level)
         else:
             print(f"[{'HIBA' if is_error else 'INFO'} PyAutoGuiAutomator]: {message}")
 
@@ -123,6 +176,12 @@ class PyAutoGuiAutomator:
         click_x, click_y = None, None
         prompt_field_activated_successfully = False
 
+        previous_rect = self.last_known_prompt_rect or self.coordinates.get("prompt_rect")
+        if "prompt_click_x" in self.coordinates and self.coordinate_store.verify("prompt_area") is False:
+            self._notify_status("A mentett prompt mező pozíció nem egyezik a képernyővel (elrendezés változott?), újrakeresés...", is_error=True)
+            self.coordinate_store.forget("prompt_area", ("prompt_click_x", "prompt_click_y", "prompt_rect"))
+            self.last_known_prompt_rect = None
+
         if "prompt_click_x" in self.coordinates and "prompt_click_y" in self.coordinates:
             click_x = self.coordinates["prompt_click_x"]
             click_y = self.coordinates["prompt_click_y"]
@@ -130,12 +189,19 @@ class PyAutoGuiAutomator:
                 self.last_known_prompt_rect = self.coordinates["prompt_rect"]
             else: 
                 self.last_known_prompt_rect = None
-            self._notify_status(f"Mentett prompt mező pozíció használata: X={click_x}, Y={click_y}")
+            self._notify_status(f"Mentett prompt mező pozíció használata: X={click_x}, Y={click_y}", level="debug")
+            if self.last_known_prompt_rect and "prompt_area" not in self.coordinate_store.signatures:
+                self.coordinate_store.capture_signature("prompt_area", *self.prompt_signature_anchor(self.last_known_prompt_rect))
             prompt_field_activated_successfully = True
         
         if not prompt_field_activated_successfully and find_prompt_area_dynamically:
-            self._notify_status("Prompt mező dinamikus keresése...")
-            rect = find_prompt_area_dynamically(self.screen_width, self.screen_height, notify_callback=self._notify_status)
+            rect = None
+            # Előbb az utolsó ismert pozíció környékén (ms), és csak végső esetben a teljes képernyőn.
+            if previous_rect and find_prompt_area_near:
+                rect = find_prompt_area_near(previous_rect, self.screen_width, self.screen_height, notify_callback=self._notify_status)
+            if not rect:
+                self._notify_status("Prompt mező dinamikus keresése...")
+                rect = find_prompt_area_dynamically(self.screen_width, self.screen_height, notify_callback=self._notify_status)
             if rect:
                 self.last_known_prompt_rect = rect 
                 click_x = rect['x'] + rect['width'] // 2
@@ -147,6 +213,7 @@ class PyAutoGuiAutomator:
                 self.coordinates["prompt_click_y"] = click_y
                 self.coordinates["prompt_rect"] = rect 
                 self._save_coordinates()
+                self.coordinate_store.capture_signature("prompt_area", *self.prompt_signature_anchor(rect))
                 self._notify_status(f"Dinamikusan talált prompt terület. Kattintás ide: X={click_x}, Y={click_y}")
                 prompt_field_activated_successfully = True
             else:
@@ -171,10 +238,42 @@ class PyAutoGuiAutomator:
             self._notify_status(f"Hiba a prompt mezőre való kattintás közben (X:{click_x}, Y:{click_y}): {e}", is_error=True)
             return False
 
+    def is_tool_still_open(self):
+        """
+        Olcsó vizuális ellenőrzés (néhány pixel, OCR nélkül): a mentett prompt téglalap belseje
+        még a prompt mező színét mutatja-e, vagyis a Whisk eszköz nyitva van-e az előtérben.
+        """
+        rect = self.last_known_prompt_rect
+        signature_match = self.coordinate_store.verify("prompt_area")
+        if signature_match is not None:
+            return signature_match
+        if not rect or not get_pixel_color_safe_util or not is_color_prompt_area_like:
+            return False
+        sample_points = [(rect['x'] + int(rect['width'] * fx), rect['y'] + int(rect['height'] * fy))
+                         for fx, fy in ((0.5, 0.3), (0.25, 0.5), (0.75, 0.5))]
+        for x, y in sample_points:
+            color = get_pixel_color_safe_util(x, y, self.screen_width, self.screen_height)
+            if not color or not is_color_prompt_area_like(color):
+                return False
+        return True
+
+    def is_page_loaded(self):
+        """A böngésző készenléti jele: az eszköz már nyitva van, vagy a kezdőoldal (sablon / "ESZKÖZ MEGNYITÁSA") látható."""
+        return (self.is_tool_still_open()
+                or self.page_initializer.is_ready_template_visible()
+                or self.page_initializer.is_open_tool_button_visible())
+
     # --- PUBLIKUS METÓDUSOK A PROCESSCONTROLLER SZÁMÁRA ---
     def initial_page_setup(self):
-        """Elvégzi az oldal kezdeti beállítását a PageInitializer segítségével."""
+        """
+        Elvégzi az oldal kezdeti beállítását a PageInitializer segítségével.
+        Ha egy korábbi futás már előkészítette az oldalt és az eszköz még láthatóan nyitva van
+        (is_tool_still_open), az OCR alapú előkészítés kimarad.
+        """
         if self._check_for_stop_request(): return False
+        if self.page_is_prepared and not self.is_tool_still_open():
+            self._notify_status("Az előző futásból megmaradt oldal már nem az eszközt mutatja, újra-előkészítés...")
+            self.page_is_prepared = False
         if not self.page_is_prepared:
             if self.page_initializer.run_initial_tool_opening_sequence(): # Hívjuk az új osztály metódusát
                 self.page_is_prepared = True
@@ -185,9 +284,21 @@ class PyAutoGuiAutomator:
         self._notify_status("Az oldal kezdeti beállítása már megtörtént.")
         return True
 
-    def process_single_prompt(self, prompt_text):
-        """Feldolgoz egyetlen promptot a megfelelő handler osztályok segítségével."""
+    @property
+    def downloads_dir(self):
+        """A végleges képek mappája (a ProcessController-é, ha van)."""
+        if self.process_controller and getattr(self.process_controller, 'downloads_dir', None):
+            return self.process_controller.downloads_dir
+        return os.path.join(self.project_root, "downloads")
+
+    def process_single_prompt(self, prompt_text, prompt_line_no=None):
+        """
+        Feldolgoz egyetlen promptot a megfelelő handler osztályok segítségével.
+        Siker esetén a letöltött kép végleges helye a self.last_downloaded_file attribútumban van.
+        """
         self.stop_requested = False # Minden promptnál alaphelyzetbe állítjuk
+        self.last_downloaded_file = None
+        self.last_output_rejection = None
         if self._check_for_stop_request(): return False
 
         if not self.page_is_prepared:
@@ -200,12 +311,32 @@ class PyAutoGuiAutomator:
         if self._check_for_stop_request(): return False
         
         # 3. Fázis: Kép generálásának figyelése és letöltés
-        if not self.image_flow_handler.monitor_generation_and_download():
+        if not self.image_flow_handler.monitor_generation_and_download(prompt_line_no):
+            return False
+
+        # 4. Fázis: A letöltött kép ellenőrzése (a "sikeres" kattintás még nem jelent jó képet)
+        if self.last_downloaded_file and not self._verify_downloaded_output():
             return False
             
         self._notify_status(f"Prompt ('{prompt_text[:30]}...') sikeresen feldolgozva PyAutoGUI-val.")
         return True
     
+    def _verify_downloaded_output(self):
+        ok, reason = self.output_checker.check(self.last_downloaded_file)
+        if ok:
+            return True
+        self.last_output_rejection = reason
+        try:
+            rejected_path = quarantine_output(self.last_downloaded_file)
+        except Exception as e_move:
+            rejected_path = self.last_downloaded_file
+            self._notify_status(f"Hiba a visszautasított kép áthelyezésekor: {e_move}", is_error=True)
+        self._notify_status(f"HIBA: A letöltött kép visszautasítva ({reason}): {rejected_path}. Újrapróbálás a futás végén.", is_error=True)
+        self.last_downloaded_file = None
+        return False
+
     def close_browser(self):
         self._notify_status("PyAutoGUI böngészőműveletek befejezve.")
-        pass
+        self.coordinate_store.flush()
+        if self.debug_captures:
+            self.debug_captures.flush()
@@ -0,0 +1,83 @@
+# core/run_stats.py
+import time
+
+OUTCOME_OK = "ok"
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+class RunStatsAccumulator:
+    """
+    Egy futás élő statisztikái a promptonkénti eredményekből:
+      - a promptidők exponenciálisan súlyozott mozgóátlaga (EWMA) -> prompt/perc és ETA,
+      - a renderelésre várással töltött idő aránya (a többi a saját overhead: gépelés, kattintás, szünet...),
+      - a hibaarány (sikertelen vagy visszautasított kimenet / összes lezárt prompt).
+    Nem szálbiztos; a GUI szálon, a worker signáljaiból táplálva használjuk.
+    """
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.ewma_prompt_s = None
+        self.finished_count = 0
+        self.failed_count = 0
+        self.total_time_s = 0.0
+        self.render_wait_s = 0.0
+        self.remaining = None
+
+    def record_prompt(self, outcome, duration_s, render_wait_s=0.0, remaining=None):
+        if duration_s > 0:
+            if self.ewma_prompt_s is None:
+                self.ewma_prompt_s = duration_s
+            else:
+                self.ewma_prompt_s = self.alpha * duration_s + (1 - self.alpha) * self.ewma_prompt_s
+        self.finished_count += 1
+        if outcome != OUTCOME_OK:
+            self.failed_count += 1
+        self.total_time_s += max(0.0, duration_s)
+        self.render_wait_s += max(0.0, render_wait_s)
+        if remaining is not None:
+            self.remaining = max(0, remaining)
+
+    @property
+    def prompts_per_minute(self):
+        return 60.0 / self.ewma_prompt_s if self.ewma_prompt_s else None
+
+    @property
+    def eta_s(self):
+        if self.remaining is None or self.ewma_prompt_s is None:
+            return None
+        return self.remaining * self.ewma_prompt_s
+
+    @property
+    def render_share(self):
+        return self.render_wait_s / self.total_time_s if self.total_time_s > 0 else None
+
+    @property
+    def failure_rate(self):
+        return self.failed_count / self.finished_count if self.finished_count else None
+
+    def snapshot(self):
+        return {"prompts_per_minute": self.prompts_per_minute, "eta_s": self.eta_s,
+                "render_share": self.render_share, "failure_rate": self.failure_rate,
+                "finished": self.finished_count, "failed": self.failed_count,
+                "remaining": self.remaining, "elapsed_s": time.monotonic() - self.started_at}
+
+    def format_overlay_text(self):
+        """Kétsoros összefoglaló az overlay számára."""
+        rate = self.prompts_per_minute
+        share = self.render_share
+        failure = self.failure_rate
+        line1 = f"{rate:.1f} prompt/perc | ETA: {format_duration(self.eta_s)}" if rate else "-- prompt/perc | ETA: --:--"
+        line2 = (f"Render várakozás: {share * 100:.0f}% | Hibaarány: {failure * 100:.0f}%"
+                 if share is not None else "Render várakozás: --% | Hibaarány: --%")
+        return f"{line1}\n{line2}"
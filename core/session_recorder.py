@@ -0,0 +1,235 @@
+# core/session_recorder.py
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+
+from utils.settings_loader import get_section
+
+ARCHIVE_VERSION = 1
+META_MEMBER = "meta.json"
+EVENTS_MEMBER = "events.jsonl"
+FRAMES_DIR = "frames/"
+
+# A pyautogui függvényei, amelyeken keresztül a kód a képernyőt olvassa, illetve beavatkozik.
+CAPTURE_FUNCTIONS = ("screenshot", "pixel", "locateOnScreen")
+ACTION_FUNCTIONS = ("moveTo", "click", "hotkey", "press", "typewrite")
+
+
+def _import_pyautogui():
+    # Lusta import: az automation_engine a GUI indulásakor betöltődik, a pyautogui csak felvételkor kell.
+    try:
+        import pyautogui
+        return pyautogui
+    except ImportError:
+        return None
+
+
+def _project_root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _json_safe(value):
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "item"):  # numpy skalár
+        return value.item()
+    return str(value)
+
+
+def frame_key(image):
+    """A kép tartalmának rövid hash-e (a módot és a méretet is beleértve); ez a deduplikálás kulcsa."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class SessionRecorder:
+    """
+    Egy futás képernyő-olvasásainak és beavatkozásainak rögzítése egyetlen archívumba
+    (config/settings.json "session_recorder", alapértelmezés: logs/recordings/<futás azonosító>.zip).
+
+    Az install() a pyautogui modul függvényeit (CAPTURE_FUNCTIONS, ACTION_FUNCTIONS) burkolókra
+    cseréli, így minden modul (ui_scanner, PageInitializer, PromptExecutor, ImageFlowHandler,
+    CoordinateStore) hívásai módosítás nélkül rögzülnek. Az archívum tartalma:
+      - frames/<hash>.png: a képernyőképek PNG-ként, tartalom szerint deduplikálva,
+      - events.jsonl: időrendben minden olvasás (a képkocka hash-ével / a pixel színével),
+        beavatkozás és mark() jelölés, a rögzítés kezdete óta eltelt idővel (t, másodperc),
+      - meta.json: verzió, képernyőméret, a futás kezdeti koordinátái és egyéb metaadatok.
+    Visszajátszás: python -m core.session_replay <archívum>
+
+    A PNG kódolás a hívó szálán történik (csak új tartalmú képkockánál); a figyelő ciklusok
+    pixel olvasásai csak egy-egy eseménysort jelentenek.
+    """
+    def __init__(self, archive_path, png_compress_level=6, record_pixels=True, notify_callback=None):
+        self.archive_path = archive_path
+        self.png_compress_level = png_compress_level
+        self.record_pixels = record_pixels
+        self.notify_callback = notify_callback
+        self.event_count = 0
+        self.frame_count = 0
+        self._frames = set()
+        self._originals = {}
+        self._lock = threading.Lock()
+        self._zip = None
+        self._events_file = None
+        self._events_path = archive_path + ".events.part"
+        self._started = None
+        self._metadata = {}
+        self._pyautogui = None
+
+    @classmethod
+    def from_settings(cls, run_id=None, notify_callback=None):
+        """None, ha a settings.json "session_recorder" szakasza nem kapcsolja be."""
+        cfg = get_section("session_recorder")
+        if not cfg.get("enabled", False) or _import_pyautogui() is None:
+            return None
+        output_dir = cfg.get("output_dir") or os.path.join("logs", "recordings")
+        if not os.path.isabs(output_dir):
+            output_dir = os.path.join(_project_root(), output_dir)
+        archive_path = os.path.join(output_dir, f"{run_id or time.strftime('%Y%m%d_%H%M%S')}.zip")
+        return cls(archive_path, png_compress_level=cfg.get("png_compress_level", 6),
+                   record_pixels=cfg.get("record_pixels", True), notify_callback=notify_callback)
+
+    def _notify(self, message):
+        if self.notify_callback:
+            self.notify_callback(message)
+        else:
+            print(f"[SessionRecorder]: {message}")
+
+    @property
+    def is_recording(self):
+        return self._zip is not None
+
+    def install(self, metadata=None):
+        """Megnyitja az archívumot és a pyautogui függvényeit a rögzítő burkolókra cseréli."""
+        if self.is_recording:
+            return True
+        self._pyautogui = pyautogui = _import_pyautogui()
+        if pyautogui is None:
+            self._notify("A felvétel nem indítható: a pyautogui nem érhető el.")
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.archive_path) or ".", exist_ok=True)
+            self._zip = zipfile.ZipFile(self.archive_path, "w")
+            self._events_file = open(self._events_path, "w", encoding="utf-8")
+        except OSError as e:
+            self._notify(f"A felvétel nem indítható ({self.archive_path}): {e}")
+            self._zip = None
+            return False
+        self._metadata = dict(metadata or {})
+        try:
+            self._metadata["screen_size"] = list(pyautogui.size())
+        except Exception:
+            pass
+        self._started = time.monotonic()
+        self._metadata["started_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        for name in CAPTURE_FUNCTIONS + ACTION_FUNCTIONS:
+            original = getattr(pyautogui, name, None)
+            if original is None:
+                continue
+            self._originals[name] = original
+            wrapper = getattr(self, f"_recorded_{name}", None) or self._make_action_wrapper(name, original)
+            setattr(pyautogui, name, wrapper)
+        self._notify(f"Felvétel indult: {self.archive_path}")
+        return True
+
+    def mark(self, label, **fields):
+        """Jelölés az eseménysorban (pl. prompt eleje/vége); a visszajátszás ezekre tud ugrani."""
+        if self.is_recording:
+            self._event("mark", label=label, **fields)
+
+    def close(self):
+        """Visszaállítja a pyautogui függvényeit és lezárja az archívumot. Visszaadja az archívum útvonalát."""
+        if not self.is_recording:
+            return None
+        for name, original in self._originals.items():
+            setattr(self._pyautogui, name, original)
+        self._originals = {}
+        with self._lock:
+            zip_file, self._zip = self._zip, None
+            self._events_file.close()
+            self._metadata.update(version=ARCHIVE_VERSION, event_count=self.event_count, frame_count=self.frame_count,
+                                  duration_s=round(time.monotonic() - self._started, 3))
+            try:
+                zip_file.write(self._events_path, EVENTS_MEMBER, compress_type=zipfile.ZIP_DEFLATED)
+                zip_file.writestr(META_MEMBER, json.dumps(_json_safe(self._metadata), indent=2), compress_type=zipfile.ZIP_DEFLATED)
+            finally:
+                zip_file.close()
+                try:
+                    os.remove(self._events_path)
+                except OSError:
+                    pass
+        size_kb = os.path.getsize(self.archive_path) / 1024
+        self._notify(f"Felvétel lezárva: {self.archive_path} ({self.event_count} esemény, {self.frame_count} egyedi képkocka, {size_kb:.0f} kB)")
+        return self.archive_path
+
+    # --- Belső rögzítés ---
+    def _event(self, kind, **fields):
+        with self._lock:
+            if self._zip is None:
+                return
+            record = {"seq": self.event_count, "t": round(time.monotonic() - self._started, 4), "kind": kind}
+            record.update(_json_safe(fields))
+            self._events_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.event_count += 1
+
+    def _store_frame(self, image):
+        key = frame_key(image)
+        with self._lock:
+            if key in self._frames or self._zip is None:
+                return key
+            self._frames.add(key)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=self.png_compress_level)
+        with self._lock:
+            if self._zip is not None:
+                # A PNG már tömörített, a zip csak tárolja
+                self._zip.writestr(f"{FRAMES_DIR}{key}.png", buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+                self.frame_count += 1
+        return key
+
+    def _recorded_screenshot(self, *args, **kwargs):
+        region = kwargs.get("region", args[1] if len(args) > 1 else None)
+        try:
+            image = self._originals["screenshot"](*args, **kwargs)
+        except Exception as e:
+            self._event("screenshot", region=region, error=str(e))
+            raise
+        self._event("screenshot", region=region, frame=self._store_frame(image))
+        return image
+
+    def _recorded_pixel(self, x, y):
+        try:
+            color = self._originals["pixel"](x, y)
+        except Exception as e:
+            self._event("pixel", x=x, y=y, error=str(e))
+            raise
+        if self.record_pixels:
+            self._event("pixel", x=x, y=y, rgb=tuple(color)[:3])
+        return color
+
+    def _recorded_locateOnScreen(self, image, **kwargs):
+        # A pyscreeze is így dolgozik (teljes képernyőkép + keresés), csak a képkocka itt rögzül.
+        screen = self._recorded_screenshot()
+        result = None
+        try:
+            result = self._pyautogui.locate(image, screen, **kwargs)
+        finally:  # Újabb pyscreeze találat hiányában kivételt dob
+            self._event("locate", template=os.path.basename(str(image)), result=tuple(result) if result else None)
+        return result
+
+    def _make_action_wrapper(self, name, original):
+        def recorded_action(*args, **kwargs):
+            self._event("action", name=name, args=args, kwargs=kwargs)
+            return original(*args, **kwargs)
+        recorded_action.__name__ = name
+        return recorded_action
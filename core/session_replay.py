@@ -0,0 +1,411 @@
+# core/session_replay.py
+"""
+Egy SessionRecorder archívum visszajátszása böngésző nélkül: a pyautogui képernyő-olvasásait
+(screenshot, pixel, locateOnScreen) a felvett képkockákból szolgálja ki, a beavatkozásokat
+(moveTo, click, hotkey, press, typewrite) csak naplózza, az időt (time.sleep/time/monotonic)
+pedig virtuális órával futtatja. Így a lokátorok (ui_scanner, PageInitializer) és a figyelők
+(ImageFlowHandler) változásai determinisztikusan mérhetők és összevethetők a felvétellel.
+
+Használat:
+    python -m core.session_replay logs/recordings/20250101_120000.zip            # promptok visszajátszása
+    python -m core.session_replay <archívum> --summary                           # csak összesítő
+    python -m core.session_replay <archívum> --prompt 12 --prompt 13             # kiválasztott promptok
+    python -m core.session_replay <archívum> --page-setup                        # az oldal-előkészítés (OCR)
+A kilépési kód 1, ha valamelyik prompt kimenetele eltér a felvételétől.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+import zipfile
+
+import numpy as np
+import pyautogui
+from PIL import Image
+
+from .session_recorder import META_MEMBER, EVENTS_MEMBER, FRAMES_DIR, _json_safe
+
+CAPTURE_KINDS = ("screenshot", "pixel")
+FRAME_CACHE_SIZE = 64
+
+
+class RecordedSession:
+    """Egy felvétel archívum beolvasva: meta, eseménysor, és a képkockák igény szerinti dekódolása."""
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self._zip = zipfile.ZipFile(archive_path, "r")
+        self.meta = json.loads(self._zip.read(META_MEMBER).decode("utf-8"))
+        self.events = [json.loads(line) for line in self._zip.read(EVENTS_MEMBER).decode("utf-8").splitlines() if line.strip()]
+        self._frame_cache = {}
+
+    @property
+    def screen_size(self):
+        width, height = self.meta.get("screen_size") or (1920, 1080)
+        return int(width), int(height)
+
+    def frame(self, key):
+        """A képkocka RGB numpy tömbként (magasság x szélesség x 3)."""
+        array = self._frame_cache.get(key)
+        if array is None:
+            with Image.open(io.BytesIO(self._zip.read(f"{FRAMES_DIR}{key}.png"))) as image:
+                array = np.asarray(image.convert("RGB"))
+            if len(self._frame_cache) >= FRAME_CACHE_SIZE:
+                self._frame_cache.pop(next(iter(self._frame_cache)))
+            self._frame_cache[key] = array
+        return array
+
+    def prompts(self):
+        """A felvett promptok (a prompt_start / prompt_end jelölések párjai), időrendben."""
+        prompts, current = [], None
+        for event in self.events:
+            if event["kind"] != "mark":
+                continue
+            if event["label"] == "prompt_start":
+                current = dict(event, t_start=event["t"], t_end=None, ok=None, downloaded=False)
+                prompts.append(current)
+            elif event["label"] == "prompt_end" and current is not None:
+                current.update(t_end=event["t"], ok=event.get("ok"), downloaded=event.get("downloaded", False))
+                current = None
+        return prompts
+
+    def actions_between(self, t_start, t_end=None):
+        return [e for e in self.events if e["kind"] == "action" and e["t"] >= t_start and (t_end is None or e["t"] <= t_end)]
+
+    def summary(self):
+        counts = {}
+        for event in self.events:
+            counts[event["kind"]] = counts.get(event["kind"], 0) + 1
+        return {"events": len(self.events), "by_kind": counts, "frames": self.meta.get("frame_count"),
+                "duration_s": self.meta.get("duration_s"), "screen_size": self.screen_size,
+                "prompts": len(self.prompts())}
+
+    def close(self):
+        self._zip.close()
+
+
+class VirtualClock:
+    """A felvétel kezdetétől mért virtuális idő; csak sleep()-re és a beavatkozások időtartamára lép."""
+    def __init__(self):
+        self.now = 0.0
+        self._epoch = time.time()
+        self._monotonic = time.monotonic()
+
+    def sleep(self, seconds):
+        self.now += max(0.0, float(seconds or 0.0))
+
+    def time(self):
+        return self._epoch + self.now
+
+    def monotonic(self):
+        return self._monotonic + self.now
+
+
+class _ReplayDownloadWatcher:
+    """A DownloadWatcher helyettesítője: ha a felvett promptnál volt letöltés, egy helyőrző fájlt "tölt le"."""
+    uses_inotify = False
+
+    def __init__(self, driver, watch_dir):
+        self.driver = driver
+        self.watch_dir = watch_dir
+
+    def arm(self):
+        return True
+
+    def wait_for_new_file(self, timeout_s=30, stop_check=None):
+        prompt = self.driver.active_prompt
+        if prompt and prompt.get("downloaded"):
+            path = os.path.join(self.watch_dir, f"replay_{prompt.get('prompt_line_no')}.png")
+            Image.new("RGB", (8, 8)).save(path)
+            return path
+        self.driver.clock.sleep(timeout_s)
+        return None
+
+
+class ReplayDriver:
+    """
+    Környezetkezelő, amely a pyautogui és a time modul érintett függvényeit a felvételből
+    kiszolgáló változatokra cseréli (a kilépéskor visszaállítja).
+
+    A képernyő egy vászon, amelyre a felvett olvasások (képkockák, pixelek) a felvételi
+    idejüknél kerülnek fel, amint a virtuális óra odaér. Ha a visszajátszott kód olyan pixelt olvas,
+    amely addig még nem szerepelt egyetlen felvett olvasásban sem, a legkorábbi későbbi olvasás
+    értékét kapja (előretekintés), így a felvétellel egyező hívássorrend ugyanazt látja, mint élesben.
+    Ha egy beavatkozás egyezik a felvétel következő beavatkozásával, az óra annak idejére igazodik.
+
+    Figyelem: az __enter__ a time.sleep/time.time/time.monotonic függvényeket az egész folyamatra
+    cseréli, tehát minden szál (Qt időzítők, StatusBus, háttérszálak) a virtuális órát látja.
+    Csak külön folyamatban (CLI, teszt) használható, a GUI-t vagy a motort futtató folyamaton belül nem.
+
+    Példa (a lokátor/figyelő közvetlen hívása):
+        session = RecordedSession("logs/recordings/run.zip")
+        with ReplayDriver(session) as driver:
+            automator = driver.build_automator()
+            driver.seek_to_prompt(session.prompts()[0], automator)
+            automator.image_flow_handler.monitor_generation_and_download(prompt_line_no=1)
+    """
+    def __init__(self, session):
+        self.session = session
+        width, height = session.screen_size
+        self.clock = VirtualClock()
+        self.canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        self.known = np.zeros((height, width), dtype=bool)
+        self.mouse_position = (width // 2, height // 2)
+        self.active_prompt = None
+        self.actions = []            # (virtuális idő, név, args, kwargs)
+        self.matched_actions = 0
+        self.capture_calls = 0
+        self.missed_pixels = 0       # Olyan olvasott pixelek száma, amelyek a felvételben sehol nem szerepelnek
+        self._captures = [e for e in session.events if e["kind"] in CAPTURE_KINDS and "error" not in e]
+        self._recorded_actions = [e for e in session.events if e["kind"] == "action"]
+        self._apply_index = 0
+        self._prefetch_index = 0
+        self._action_index = 0
+        self._saved = {}
+        self._automators = []
+        self.work_dir = None
+
+    # --- Környezet ---
+    def __enter__(self):
+        self.work_dir = tempfile.mkdtemp(prefix="whisk_replay_")
+        replacements = {
+            (pyautogui, "screenshot"): self.screenshot, (pyautogui, "pixel"): self.pixel,
+            (pyautogui, "size"): self.size, (pyautogui, "position"): self.position,
+            (pyautogui, "locateOnScreen"): self.locate_on_screen,
+            (pyautogui, "moveTo"): self.move_to, (pyautogui, "click"): self.click,
+            (pyautogui, "hotkey"): self.hotkey, (pyautogui, "press"): self.press,
+            (pyautogui, "typewrite"): self.typewrite,
+            (time, "sleep"): self.clock.sleep, (time, "time"): self.clock.time, (time, "monotonic"): self.clock.monotonic,
+        }
+        for (module, name), replacement in replacements.items():
+            self._saved[(module, name)] = getattr(module, name)
+            setattr(module, name, replacement)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for automator in self._automators:
+            automator.coordinate_store.flush()  # A függő késleltetett mentés még az ideiglenes mappába írjon
+        for (module, name), original in self._saved.items():
+            setattr(module, name, original)
+        self._saved = {}
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        return False
+
+    def build_automator(self):
+        """
+        Valódi PyAutoGuiAutomator a visszajátszáshoz: a koordináták a felvételből jönnek, mentésük
+        ideiglenes fájlba megy, a letöltést a felvett kimenetel alapján egy helyőrző fájl szimulálja.
+        """
+        from .pyautogui_automator import PyAutoGuiAutomator
+        from .phase_timer import PromptPhaseTimer
+        downloads_dir = os.path.join(self.work_dir, "downloads")
+        watch_dir = os.path.join(self.work_dir, "browser_downloads")
+        os.makedirs(watch_dir, exist_ok=True)
+        automator = PyAutoGuiAutomator(types.SimpleNamespace(downloads_dir=downloads_dir))
+        store = automator.coordinate_store
+        store.file_path = os.path.join(self.work_dir, "ui_coordinates.json")
+        store.lock_path = store.file_path + ".lock"
+        automator.download_watcher = _ReplayDownloadWatcher(self, watch_dir)
+        automator.phase_timer = PromptPhaseTimer(enabled=False)
+        automator.debug_captures = None
+        self.load_coordinates(automator, self.session.meta)
+        self._automators.append(automator)
+        return automator
+
+    @staticmethod
+    def load_coordinates(automator, source):
+        """A felvett koordináták és aláírások betöltése (meta, vagy egy prompt_start jelölés)."""
+        store = automator.coordinate_store
+        store.values.clear()
+        store.values.update(source.get("coordinates") or {})
+        store.signatures = dict(source.get("signatures") or {})
+        rect = store.values.get("prompt_rect")
+        automator.last_known_prompt_rect = rect if isinstance(rect, dict) else None
+        automator.last_known_generate_point = None
+        automator.page_is_prepared = True
+
+    # --- Idő és vászon ---
+    def seek(self, t):
+        """A virtuális óra beállítása; visszafelé ugráskor a vászon a felvétel elejétől épül újra."""
+        if t < self.clock.now:
+            self.canvas[:] = 0
+            self.known[:] = False
+            self._apply_index = self._prefetch_index = 0
+        self.clock.now = t
+        self._action_index = next((i for i, e in enumerate(self._recorded_actions) if e["t"] >= t), len(self._recorded_actions))
+        self._advance()
+
+    def seek_to_prompt(self, prompt, automator=None):
+        self.active_prompt = prompt
+        self.seek(prompt["t_start"])
+        if automator is not None and "coordinates" in prompt:
+            self.load_coordinates(automator, prompt)
+
+    def _bounds(self, region):
+        height, width = self.known.shape
+        if not region:
+            return 0, 0, width, height
+        left, top, region_width, region_height = (int(v) for v in region)
+        return (max(0, left), max(0, top), min(width, left + region_width), min(height, top + region_height))
+
+    def _apply(self, event, only_unknown=False):
+        if event["kind"] == "pixel":
+            x, y = event["x"], event["y"]
+            if 0 <= y < self.known.shape[0] and 0 <= x < self.known.shape[1] and not (only_unknown and self.known[y, x]):
+                self.canvas[y, x] = event["rgb"]
+                self.known[y, x] = True
+            return
+        frame = self.session.frame(event["frame"])
+        if event.get("region"):
+            left, top = int(event["region"][0]), int(event["region"][1])
+        else:
+            left, top = 0, 0
+        x0, y0 = max(0, left), max(0, top)
+        x1 = min(self.known.shape[1], left + frame.shape[1])
+        y1 = min(self.known.shape[0], top + frame.shape[0])
+        if x1 <= x0 or y1 <= y0:
+            return
+        source = frame[y0 - top:y1 - top, x0 - left:x1 - left]
+        if only_unknown:
+            mask = ~self.known[y0:y1, x0:x1]
+            self.canvas[y0:y1, x0:x1][mask] = source[mask]
+            self.known[y0:y1, x0:x1] = True
+        else:
+            self.canvas[y0:y1, x0:x1] = source
+            self.known[y0:y1, x0:x1] = True
+
+    def _advance(self):
+        while self._apply_index < len(self._captures) and self._captures[self._apply_index]["t"] <= self.clock.now:
+            self._apply(self._captures[self._apply_index])
+            self._apply_index += 1
+        self._prefetch_index = max(self._prefetch_index, self._apply_index)
+
+    def _prepare_read(self, x0, y0, x1, y1):
+        """Az olvasott terület még ismeretlen pixeleinek feltöltése a későbbi felvett olvasásokból."""
+        self.capture_calls += 1
+        self._advance()
+        while not self.known[y0:y1, x0:x1].all() and self._prefetch_index < len(self._captures):
+            self._apply(self._captures[self._prefetch_index], only_unknown=True)
+            self._prefetch_index += 1
+        self.missed_pixels += int((~self.known[y0:y1, x0:x1]).sum())
+
+    # --- pyautogui helyettesítők: olvasás ---
+    def screenshot(self, imageFilename=None, region=None, **kwargs):
+        x0, y0, x1, y1 = self._bounds(region)
+        self._prepare_read(x0, y0, x1, y1)
+        image = Image.fromarray(self.canvas[y0:y1, x0:x1].copy())
+        if imageFilename:
+            image.save(imageFilename)
+        return image
+
+    def pixel(self, x, y):
+        x, y = int(x), int(y)
+        self._prepare_read(x, y, x + 1, y + 1)
+        return tuple(int(c) for c in self.canvas[y, x])
+
+    def size(self):
+        height, width = self.known.shape
+        return pyautogui.Size(width, height) if hasattr(pyautogui, "Size") else (width, height)
+
+    def position(self):
+        return pyautogui.Point(*self.mouse_position) if hasattr(pyautogui, "Point") else self.mouse_position
+
+    def locate_on_screen(self, image, **kwargs):
+        return pyautogui.locate(image, self.screenshot(), **kwargs)
+
+    # --- pyautogui helyettesítők: beavatkozás ---
+    def _action(self, name, args, kwargs, duration_s=0.0):
+        expected = self._recorded_actions[self._action_index] if self._action_index < len(self._recorded_actions) else None
+        if expected and expected["name"] == name and expected["args"] == _json_safe(args) and expected["kwargs"] == _json_safe(kwargs):
+            self.clock.now = max(self.clock.now, expected["t"])
+            self._action_index += 1
+            self.matched_actions += 1
+        self.actions.append((round(self.clock.now, 4), name, args, kwargs))
+        self.clock.sleep(duration_s + (getattr(pyautogui, "PAUSE", 0.0) or 0.0))
+
+    def move_to(self, *args, **kwargs):
+        x = kwargs.get("x", args[0] if args else None)
+        y = kwargs.get("y", args[1] if len(args) > 1 else None)
+        if x is not None and y is not None:
+            self.mouse_position = (int(x), int(y))
+        duration = kwargs.get("duration", args[2] if len(args) > 2 else 0.0)
+        self._action("moveTo", args, kwargs, duration or 0.0)
+
+    def click(self, *args, **kwargs):
+        if len(args) >= 2:
+            self.mouse_position = (int(args[0]), int(args[1]))
+        self._action("click", args, kwargs)
+
+    def hotkey(self, *args, **kwargs):
+        self._action("hotkey", args, kwargs)
+
+    def press(self, *args, **kwargs):
+        self._action("press", args, kwargs)
+
+    def typewrite(self, *args, **kwargs):
+        message = kwargs.get("message", args[0] if args else "")
+        interval = kwargs.get("interval", args[1] if len(args) > 1 else 0.0)
+        self._action("typewrite", args, kwargs, len(message) * (interval or 0.0))
+
+
+def replay_prompt(driver, automator, prompt):
+    """
+    Egy felvett prompt visszajátszása (beírás + generálás + figyelés + letöltés, a kimenet
+    ellenőrzése nélkül). Visszaadja az eredményt és a mérőszámokat tartalmazó dict-et.
+    """
+    driver.seek_to_prompt(prompt, automator)
+    actions_before, captures_before, missed_before = len(driver.actions), driver.capture_calls, driver.missed_pixels
+    started_cpu = time.perf_counter()
+    automator.stop_requested = False
+    ok = (automator.prompt_executor.enter_prompt_and_initiate_generation(prompt.get("prompt") or "")
+          and automator.image_flow_handler.monitor_generation_and_download(prompt.get("prompt_line_no")))
+    cpu_s = time.perf_counter() - started_cpu
+    replayed = [(name, _json_safe(args), _json_safe(kwargs)) for _t, name, args, kwargs in driver.actions[actions_before:]]
+    recorded = [(e["name"], e["args"], e["kwargs"]) for e in driver.session.actions_between(prompt["t_start"], prompt["t_end"])]
+    return {"prompt_line_no": prompt.get("prompt_line_no"), "recorded_ok": bool(prompt.get("downloaded")), "replayed_ok": bool(ok),
+            "recorded_s": (prompt["t_end"] or prompt["t_start"]) - prompt["t_start"], "virtual_s": driver.clock.now - prompt["t_start"],
+            "cpu_s": cpu_s, "captures": driver.capture_calls - captures_before, "missed_pixels": driver.missed_pixels - missed_before,
+            "action_mismatches": sum(1 for a, b in zip(replayed, recorded) if a != b) + abs(len(replayed) - len(recorded))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.session_replay",
+                                     description="Egy SessionRecorder felvétel visszajátszása böngésző nélkül.")
+    parser.add_argument("archive", help="A felvétel (.zip) útvonala.")
+    parser.add_argument("--summary", action="store_true", help="Csak az archívum összesítőjének kiírása.")
+    parser.add_argument("--prompt", type=int, action="append", help="Csak a megadott sorszámú prompt(ok) visszajátszása.")
+    parser.add_argument("--page-setup", action="store_true", help="Az oldal-előkészítés (OCR) visszajátszása a felvétel elejéről.")
+    args = parser.parse_args(argv)
+
+    session = RecordedSession(args.archive)
+    print(json.dumps(session.summary(), ensure_ascii=False))
+    if args.summary:
+        return 0
+
+    mismatched = 0
+    with ReplayDriver(session) as driver:
+        automator = driver.build_automator()
+        if args.page_setup:
+            driver.seek(0.0)
+            automator.page_is_prepared = False
+            automator.warm_up_ocr()
+            started_cpu = time.perf_counter()
+            ok = automator.page_initializer.run_initial_tool_opening_sequence()
+            print(json.dumps({"page_setup_ok": ok, "virtual_s": round(driver.clock.now, 3),
+                              "cpu_s": round(time.perf_counter() - started_cpu, 3), "captures": driver.capture_calls}))
+        for prompt in session.prompts():
+            if args.prompt and prompt.get("prompt_line_no") not in args.prompt:
+                continue
+            result = replay_prompt(driver, automator, prompt)
+            mismatched += result["recorded_ok"] != result["replayed_ok"]
+            print(json.dumps({k: round(v, 3) if isinstance(v, float) else v for k, v in result.items()}))
+    session.close()
+    return 1 if mismatched else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
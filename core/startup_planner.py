@@ -0,0 +1,148 @@
+# core/startup_planner.py
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class StartupPhase:
+    """
+    Egy indítási fázis leírása: név, a futtatandó függvény és azon fázisok neve,
+    amelyeknek be kell fejeződniük, mielőtt ez elindulhat.
+    """
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.result = None
+        self.error = None
+        self.skipped = False
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def duration_s(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class StartupPlanner:
+    """
+    Az első prompt előtti, egymástól független lépéseket (VPN, böngésző, OCR
+    bemelegítés, promptok betöltése) párhuzamosan futtatja a függőségeik szerint.
+    Minden fázis a saját szálán fut; egy fázis akkor indul, amikor az összes
+    függősége hiba nélkül lefutott. Ha egy függőség hibát dobott, a ráépülő
+    fázisok kimaradnak, és a run() a végén az első hibát továbbdobja.
+    """
+    def __init__(self, max_workers=4, notify_callback=None):
+        self.max_workers = max_workers
+        self.notify_callback = notify_callback
+        self.phases = {}
+        self._order = []
+        self._lock = threading.Lock()
+        self.run_started_at = None
+        self.run_finished_at = None
+
+    def add_phase(self, name, func, depends_on=()):
+        if name in self.phases:
+            raise ValueError(f"Az indítási fázis ('{name}') már szerepel a tervben.")
+        for dep in depends_on:
+            if dep not in self.phases:
+                raise ValueError(f"Ismeretlen függőség ('{dep}') a(z) '{name}' fázisnál.")
+        self.phases[name] = StartupPhase(name, func, depends_on)
+        self._order.append(name)
+        return self.phases[name]
+
+    def result(self, name):
+        return self.phases[name].result
+
+    def _notify(self, message):
+        if self.notify_callback:
+            self.notify_callback(message)
+        else:
+            print(f"[StartupPlanner]: {message}")
+
+    def _run_phase(self, phase):
+        phase.started_at = time.monotonic()
+        try:
+            phase.result = phase.func()
+        except BaseException as e:
+            phase.error = e
+        finally:
+            phase.finished_at = time.monotonic()
+        return phase
+
+    def _ready_phases(self, pending):
+        ready = []
+        for name in list(pending):
+            phase = self.phases[name]
+            deps = [self.phases[d] for d in phase.depends_on]
+            if any(d.error is not None or d.skipped for d in deps):
+                phase.skipped = True
+                pending.remove(name)
+                self._notify(f"'{name}' fázis kihagyva (egy függősége sikertelen volt).")
+            elif all(d.finished_at is not None for d in deps):
+                ready.append(phase)
+                pending.remove(name)
+        return ready
+
+    def run(self):
+        """
+        Lefuttatja az összes fázist. Visszatér a {név: eredmény} szótárral,
+        vagy továbbdobja az első fázis-hibát (a többi fázis befejeződése után).
+        """
+        self.run_started_at = time.monotonic()
+        pending = list(self._order)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as executor:
+            while pending or running:
+                for phase in self._ready_phases(pending):
+                    self._notify(f"'{phase.name}' fázis indítása...")
+                    running[executor.submit(self._run_phase, phase)] = phase
+                if not running:
+                    # Maradt függőben lévő fázis, de egyik sem indítható (hibás függőség miatt kimaradtak)
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    phase = running.pop(future)
+                    if phase.error is not None:
+                        self._notify(f"'{phase.name}' fázis hibával állt le ({phase.duration_s:.1f}s): {phase.error}")
+                    else:
+                        self._notify(f"'{phase.name}' fázis kész ({phase.duration_s:.1f}s).")
+
+        self.run_finished_at = time.monotonic()
+
+        errors = [self.phases[n].error for n in self._order if self.phases[n].error is not None]
+        if errors:
+            raise errors[0]
+        return {name: self.phases[name].result for name in self._order}
+
+    def critical_path(self):
+        """
+        Visszaadja a kritikus utat (fázisnevek listája) és annak hosszát másodpercben.
+        A legkésőbb befejeződő fázistól indulva mindig a legkésőbb befejeződő
+        függőség felé lépünk vissza.
+        """
+        finished = [p for p in self.phases.values() if p.finished_at is not None]
+        if not finished or self.run_started_at is None:
+            return [], 0.0
+        current = max(finished, key=lambda p: p.finished_at)
+        path = [current.name]
+        while current.depends_on:
+            deps = [self.phases[d] for d in current.depends_on if self.phases[d].finished_at is not None]
+            if not deps:
+                break
+            current = max(deps, key=lambda p: p.finished_at)
+            path.append(current.name)
+        path.reverse()
+        end_time = self.phases[path[-1]].finished_at
+        return path, end_time - self.run_started_at
+
+    def report(self):
+        """Rövid, egysoros összefoglaló a kritikus útról és a párhuzamosítással nyert időről."""
+        path, critical_s = self.critical_path()
+        serial_s = sum(p.duration_s for p in self.phases.values())
+        phase_parts = ", ".join(f"{p.name}={p.duration_s:.1f}s" for p in self.phases.values() if p.finished_at is not None)
+        return (f"Indítási kritikus út: {' -> '.join(path) or '-'} = {critical_s:.1f}s "
+                f"(soros összeg: {serial_s:.1f}s; {phase_parts})")
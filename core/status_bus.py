@@ -0,0 +1,122 @@
+# core/status_bus.py
+import collections
+import threading
+import time
+
+# Súlyossági szintek. Szövegként adjuk át őket, hogy a utils/ modulok (pl. ui_scanner)
+# importálás nélkül is megjelölhessék a zajos üzeneteiket (level="debug").
+DEBUG = "debug"
+INFO = "info"
+WARNING = "warning"
+ERROR = "error"
+_LEVEL_ORDER = {DEBUG: 10, INFO: 20, WARNING: 30, ERROR: 40}
+
+StatusMessage = collections.namedtuple("StatusMessage", ["timestamp", "level", "message"])
+
+
+def level_value(level):
+    return _LEVEL_ORDER.get(level, _LEVEL_ORDER[INFO])
+
+
+def resolve_level(is_error=False, level=None):
+    """A régi is_error jelzőből és az opcionális szintből képzi a tényleges szintet."""
+    if level in _LEVEL_ORDER:
+        return level
+    return ERROR if is_error else INFO
+
+
+class StatusSink:
+    """
+    Egy fogadó (pl. a főablak állapotsora vagy az overlay címkéje) a buszon.
+    A min_level alatti üzeneteket nem kapja meg; a többit legfeljebb min_interval_s
+    időközönként, mindig csak a legutolsót (összevonás). A hibák azonnal mennek.
+    """
+    def __init__(self, name, deliver, min_level=INFO, min_interval_s=0.1):
+        self.name = name
+        self.deliver = deliver
+        self.min_level = min_level
+        self.min_interval_s = min_interval_s
+        self.enabled = True
+        self._pending = None
+        self._last_delivery = 0.0
+        self.delivered_count = 0
+        self.coalesced_count = 0
+
+
+class StatusBus:
+    """
+    Szálbiztos állapotüzenet-busz a worker szál(ak) és a GUI között.
+
+    A publish() csak egy zárolt deque-hozzáfűzést és a fogadónkénti "legutolsó üzenet"
+    felülírását végzi, így a worker szálon közel nulla a költsége. A tényleges kézbesítést
+    a flush() végzi, amit a GUI szál időzítője hív (~10 Hz). A hibaszintű üzeneteket a
+    publish() azonnal kézbesíti, hogy egyetlen hiba se vesszen el az összevonásban.
+    A legutóbbi üzenetek (DEBUG szinttel együtt) a körpufferből lekérdezhetők (recent()).
+    """
+    def __init__(self, history_size=500):
+        self._lock = threading.Lock()
+        self._history = collections.deque(maxlen=history_size)
+        self._sinks = []
+        self.published_count = 0
+
+    def add_sink(self, name, deliver, min_level=INFO, min_interval_s=0.1):
+        sink = StatusSink(name, deliver, min_level, min_interval_s)
+        with self._lock:
+            self._sinks.append(sink)
+        return sink
+
+    def publish(self, message, is_error=False, level=None):
+        level = resolve_level(is_error, level)
+        entry = StatusMessage(time.time(), level, message)
+        immediate = []
+        with self._lock:
+            self.published_count += 1
+            self._history.append(entry)
+            for sink in self._sinks:
+                if not sink.enabled or level_value(level) < level_value(sink.min_level):
+                    continue
+                if level == ERROR:
+                    # A hibát azonnal kézbesítjük, és a régebbi függő üzenet sem írhatja felül később.
+                    sink._pending = None
+                    sink._last_delivery = time.monotonic()
+                    immediate.append(sink)
+                else:
+                    if sink._pending is not None:
+                        sink.coalesced_count += 1
+                    sink._pending = entry
+        for sink in immediate:
+            self._deliver(sink, entry)
+        return entry
+
+    def flush(self):
+        """A függő (összevont) üzenetek kézbesítése a rátakorlát figyelembevételével. A GUI szálról hívandó."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for sink in self._sinks:
+                if sink._pending is None or now - sink._last_delivery < sink.min_interval_s:
+                    continue
+                ready.append((sink, sink._pending))
+                sink._pending = None
+                sink._last_delivery = now
+        for sink, entry in ready:
+            self._deliver(sink, entry)
+
+    def _deliver(self, sink, entry):
+        try:
+            sink.deliver(entry)
+            sink.delivered_count += 1
+        except Exception as e:
+            print(f"[StatusBus]: Hiba a(z) '{sink.name}' fogadónak történő kézbesítéskor: {e}")
+
+    def recent(self, count=None, min_level=DEBUG):
+        """A körpufferben lévő legutóbbi üzenetek (a legrégebbitől a legújabbig)."""
+        with self._lock:
+            entries = [e for e in self._history if level_value(e.level) >= level_value(min_level)]
+        return entries[-count:] if count else entries
+
+    def stats(self):
+        with self._lock:
+            return {"published": self.published_count,
+                    "sinks": {s.name: {"delivered": s.delivered_count, "coalesced": s.coalesced_count}
+                              for s in self._sinks}}
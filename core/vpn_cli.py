@@ -0,0 +1,151 @@
+# core/vpn_cli.py
+import collections
+import platform
+import shlex
+import subprocess
+import sys
+import time
+
+from utils.settings_loader import get_section
+
+VPN_STATE_CONNECTED = "connected"
+VPN_STATE_CONNECTING = "connecting"
+VPN_STATE_DISCONNECTED = "disconnected"
+VPN_STATE_UNKNOWN = "unknown"
+
+VpnStatus = collections.namedtuple("VpnStatus", ["state", "country", "server", "ip", "raw"])
+CliResult = collections.namedtuple("CliResult", ["returncode", "stdout", "stderr"])
+
+# A NordVPN CLI hívási formái. A Linuxos 'nordvpn' kliensnek van 'status' parancsa; a Windowsos
+# 'nordvpn.exe' csak csatlakozni/bontani tud, ott az állapotot nem lehet a CLI-ből kiolvasni.
+NORDVPN_LINUX_ARGS = {"connect": ["connect", "{group}"], "disconnect": ["disconnect"], "status": ["status"]}
+NORDVPN_WINDOWS_ARGS = {"connect": ["-c", "-g", "{group}"], "disconnect": ["-d"], "status": None}
+
+
+def parse_status_output(text):
+    """
+    A 'nordvpn status' jellegű "Kulcs: Érték" kimenet feldolgozása VpnStatus-szá.
+    Pl.: "Status: Connected\\nServer: Singapore #512\\nCountry: Singapore\\nIP: 1.2.3.4"
+    Ismeretlen formátumnál a state VPN_STATE_UNKNOWN.
+    """
+    fields = {}
+    for line in (text or "").splitlines():
+        # A Linuxos kliens néha spinner karaktereket (- \\ | /) ír a sor elejére.
+        line = line.strip().lstrip("-\\|/ ").strip()
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        fields[key.strip().lower()] = value.strip()
+    status_text = fields.get("status", "").lower()
+    if status_text.startswith("connected"):
+        state = VPN_STATE_CONNECTED
+    elif status_text.startswith("connecting"):
+        state = VPN_STATE_CONNECTING
+    elif status_text.startswith("disconnected"):
+        state = VPN_STATE_DISCONNECTED
+    else:
+        state = VPN_STATE_UNKNOWN
+    return VpnStatus(state, fields.get("country"), fields.get("server") or fields.get("hostname"),
+                     fields.get("ip") or fields.get("your new ip"), text)
+
+
+def poll_with_backoff(probe, timeout_s, initial_interval_s=0.25, max_interval_s=4.0, factor=2.0, stop_check=None):
+    """
+    A probe()-t hívja exponenciálisan növekvő várakozásokkal (0.25s, 0.5s, 1s, ... max_interval_s),
+    amíg igaz értéket nem ad vagy le nem jár a timeout_s. Visszaadja a probe utolsó igaz eredményét, vagy None-t.
+    """
+    deadline = time.monotonic() + timeout_s
+    interval_s = initial_interval_s
+    while True:
+        result = probe()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (stop_check and stop_check()):
+            return None
+        time.sleep(min(interval_s, remaining))
+        interval_s = min(interval_s * factor, max_interval_s)
+
+
+class VpnCli:
+    """
+    A VPN parancssori kliens absztrakciója: a parancs (command) és a műveletenkénti argumentum
+    sablonok ({group} helyettesítéssel) konfigurálhatók, így a valódi NordVPN CLI helyett egy
+    helyi hamis CLI (python -m utils.fake_vpn_cli) is használható tesztekhez és mérésekhez.
+    """
+    def __init__(self, command, args_by_action, app_process_name=None):
+        self.command = list(command)
+        self.args_by_action = args_by_action
+        self.app_process_name = app_process_name
+
+    @classmethod
+    def for_nordvpn(cls, executable_path):
+        if platform.system() == "Windows":
+            return cls([executable_path], NORDVPN_WINDOWS_ARGS, app_process_name="NordVPN.exe")
+        return cls([executable_path], NORDVPN_LINUX_ARGS)
+
+    @classmethod
+    def from_settings(cls, nordvpn_executable_path=None):
+        """
+        A settings.json "vpn.cli_command" (lista vagy string) felülírja a NordVPN CLI-t;
+        a "vpn.cli_args" a műveletek argumentumait. Ha egyik sincs és a NordVPN nem található, None.
+        """
+        cfg = get_section("vpn")
+        command = cfg.get("cli_command")
+        if command:
+            if isinstance(command, str):
+                command = shlex.split(command, posix=platform.system() != "Windows")
+            command = [sys.executable if part == "{python}" else part for part in command]
+            return cls(command, cfg.get("cli_args") or NORDVPN_LINUX_ARGS)
+        if nordvpn_executable_path:
+            return cls.for_nordvpn(nordvpn_executable_path)
+        return None
+
+    @property
+    def display_name(self):
+        return " ".join(self.command)
+
+    @property
+    def supports_status(self):
+        return bool(self.args_by_action.get("status"))
+
+    def _args(self, action, **params):
+        template = self.args_by_action.get(action)
+        if not template:
+            return None
+        return self.command + [part.format(**params) for part in template]
+
+    def run(self, action, timeout_s, **params):
+        """Egy CLI művelet futtatása. CliResult-ot ad vissza; időtúllépéskor subprocess.TimeoutExpired-et dob."""
+        args = self._args(action, **params)
+        if args is None:
+            raise ValueError(f"A(z) '{action}' művelet nem támogatott ennél a VPN CLI-nél.")
+        process = subprocess.run(args, capture_output=True, text=True, check=False, timeout=timeout_s)
+        return CliResult(process.returncode, process.stdout or "", process.stderr or "")
+
+    def connect(self, server_group_name, timeout_s=20):
+        return self.run("connect", timeout_s, group=server_group_name)
+
+    def disconnect(self, timeout_s=20):
+        return self.run("disconnect", timeout_s)
+
+    def status(self, timeout_s=5):
+        """Az aktuális állapot a CLI kimenetéből; ha nem kérdezhető le, VPN_STATE_UNKNOWN."""
+        if not self.supports_status:
+            return VpnStatus(VPN_STATE_UNKNOWN, None, None, None, "")
+        try:
+            result = self.run("status", timeout_s)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            return VpnStatus(VPN_STATE_UNKNOWN, None, None, None, str(e))
+        return parse_status_output(result.stdout)
+
+    def is_app_running(self):
+        """Windows: fut-e már a NordVPN alkalmazás (a CLI csak akkor működik). Más platformon mindig True."""
+        if not self.app_process_name or platform.system() != "Windows":
+            return True
+        try:
+            output = subprocess.run(["tasklist", "/FI", f"IMAGENAME eq {self.app_process_name}", "/NH"],
+                                    capture_output=True, text=True, timeout=5).stdout
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+        return self.app_process_name.lower() in output.lower()
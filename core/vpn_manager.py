@@ -1,36 +1,60 @@
 # core/vpn_manager.py
 import subprocess
 import platform
+import threading
 import time
-import os
-# import json # Erre már nincs itt szükség
-# try: # Erre már nincs itt szükség
-#     import requests 
-# except ImportError:
-#     print("A 'requests' könyvtár nincs telepítve. Telepítsd: pip install requests")
-#     requests = None
+import traceback
 
 from utils.system_helper import find_executable_path, minimize_window_windows
-from utils.ip_geolocation import get_public_ip_info # <<< ÚJ IMPORT
+from utils.ip_geolocation import get_public_ip_info, invalidate_ip_cache
+from utils.settings_loader import get_section
+from .vpn_cli import VpnCli, VPN_STATE_CONNECTED, poll_with_backoff
 
 class VpnManager:
-    def __init__(self, process_controller_ref=None):
+    def __init__(self, process_controller_ref=None, ip_info_provider=None):
         self.process_controller = process_controller_ref
+        # A publikus IP/ország lekérdezése (get_public_ip_info aláírással); tesztekben és mérésekben
+        # helyettesíthető, pl. a hamis CLI-hez tartozó utils.fake_vpn_cli.fake_public_ip_info-val.
+        self.ip_info_provider = ip_info_provider or get_public_ip_info
         self.nordvpn_executable_path = None
         self.is_connected_to_target_server = False
         self.base_ip_info = None
+        self.last_status = None
+        cfg = get_section("vpn")
+        self.status_poll_timeout_s = cfg.get("status_poll_timeout_s", 45)
+        self.app_startup_timeout_s = cfg.get("app_startup_timeout_s", 15)
+        # Kapcsolat-újrahasznosítás: az ellenőrzött kapcsolat a futás után is megmarad, és csak
+        # idle_disconnect_s tétlenség után (vagy kilépéskor) bontjuk. Az egymást követő futások
+        # egy olcsó állapotlekérdezés után átveszik.
+        self.keep_connected = cfg.get("keep_connected", True)
+        self.idle_disconnect_s = cfg.get("idle_disconnect_s", 900)
+        self.health_check_interval_s = cfg.get("health_check_interval_s", 60)
+        # False: ha a CLI állapota lekérdezhető, a csatlakozást külső IP ellenőrzés nélkül, csak a CLI
+        # alapján fogadjuk el (hamis CLI-vel, ahol a publikus IP nem változik).
+        self.verify_public_ip = cfg.get("verify_public_ip", True)
+        self.connected_group = None
+        self.connected_country_code = None
+        self.connected_at = None
+        self.last_verified_at = None
+        self._idle_timer = None
+        self._session_lock = threading.RLock()
         self._find_nordvpn()
+        # A CLI hívások absztrakciója (settings.json "vpn.cli_command"-dal hamis CLI is beköthető).
+        self.cli = VpnCli.from_settings(self.nordvpn_executable_path)
+        if self.cli and not self.nordvpn_executable_path:
+            self.nordvpn_executable_path = self.cli.display_name
+            self._notify_status(f"Beállított VPN CLI használata: {self.cli.display_name}")
 
-    def _notify_status(self, message, is_error=False):
-        # ... (változatlan)
+    def _notify_status(self, message, is_error=False, level=None):
         if self.process_controller and hasattr(self.process_controller, 'update_gui_status'):
             prefix = "VPN Hiba: " if is_error else "VPN Info: "
-            self.process_controller.update_gui_status(f"{prefix}{message}")
+            self.process_controller.update_gui_status(f"{prefix}{message}", is_error=is_error, level=level)
         else:
             print(f"[VpnManager]: {message}")
 
     def _find_nordvpn(self):
-        # ... (változatlan)
+        if get_section("vpn").get("cli_command"):
+            return # A beállított CLI-t használjuk, nem keresünk NordVPN-t
         executable_to_find = "nordvpn.exe" if platform.system() == "Windows" else "nordvpn"
         path_cli = find_executable_path(executable_to_find)
         if path_cli:
@@ -39,138 +63,248 @@ class VpnManager:
             return
         self._notify_status(f"NordVPN parancssori eszköz ('{executable_to_find}') nem található. VPN műveletek nem lesznek elérhetőek.", is_error=True)
 
+    def _stop_requested(self):
+        return bool(self.process_controller and getattr(self.process_controller, '_stop_requested_by_user', False))
 
-    # Az _get_public_ip_info metódus TÖRÖLVE INNEN, mert átkerült az ip_geolocation.py-ba
-
-    def _launch_nordvpn_if_not_running(self, startup_wait_s=15):
-        # ... (változatlan)
-        if not self.nordvpn_executable_path:
-            return False
-        self._notify_status("NordVPN alkalmazás indítási/ébresztési kísérlet (ha szükséges)...")
-        command_args_startup = [self.nordvpn_executable_path]
+    def _launch_nordvpn_if_not_running(self, startup_timeout_s=15):
+        """Windows: a CLI csak futó NordVPN alkalmazással működik. Ha már fut, nincs várakozás."""
+        if self.cli.is_app_running():
+            return True
+        self._notify_status("NordVPN alkalmazás indítása...")
         try:
-            subprocess.Popen(command_args_startup) 
-            self._notify_status(f"NordVPN indítási parancs ('{self.nordvpn_executable_path}') kiadva a háttérben.")
+            subprocess.Popen([self.nordvpn_executable_path])
         except Exception as e:
             self._notify_status(f"Hiba a NordVPN háttérben történő indítása közben: {e}", is_error=True)
             return False
-        self._notify_status(f"Várakozás {startup_wait_s} másodperc a NordVPN szolgáltatások stabilizálódására az indítás után...")
-        time.sleep(startup_wait_s)
-        return True
+        if poll_with_backoff(self.cli.is_app_running, startup_timeout_s, initial_interval_s=0.5, stop_check=self._stop_requested):
+            self._notify_status("NordVPN alkalmazás fut.")
+            return True
+        self._notify_status(f"A NordVPN alkalmazás nem indult el {startup_timeout_s}s alatt.", is_error=True)
+        return False
+
+    def get_status(self):
+        """Olcsó állapotlekérdezés a CLI kimenetéből (hálózati forgalom nélkül). VpnStatus vagy None."""
+        if not self.cli:
+            return None
+        self.last_status = self.cli.status()
+        return self.last_status
+
+    def _probe_connected_status(self):
+        status = self.get_status()
+        return status if status and status.state == VPN_STATE_CONNECTED else None
+
+    def _probe_ip_in_country(self, target_country_code):
+        ip_info = self.ip_info_provider(use_cache=False)
+        if ip_info and ip_info.get("country_code") == target_country_code.upper():
+            return ip_info
+        return None
 
     def connect_to_server(self, 
                           server_group_name="Singapore", 
                           target_country_code="SG",
-                          connection_command_timeout_s=20, 
-                          max_ip_check_retries=12, 
-                          ip_check_interval_s=5):  
-        
-        self.is_connected_to_target_server = False
-        self.base_ip_info = None
+                          connection_command_timeout_s=20,
+                          status_poll_timeout_s=None,
+                          stop_check=None):
+        """
+        Csatlakozik a szervercsoporthoz. A kapcsolat felépülését a CLI állapotkimenetéből figyeli
+        exponenciálisan növekvő időközökkel (0.25s-tól), és a végén egyetlen külső IP ellenőrzéssel
+        erősíti meg az országot. Ha a CLI-nek nincs állapot parancsa (Windows), az IP lekérdezést
+        használja ugyanilyen ütemezéssel.
+        A stop_check (opcionális) a felhasználói leállítás mellett a várakozást is megszakíthatja
+        (pl. a NetworkHealthMonitor leállításakor).
+        """
+        def should_stop():
+            return self._stop_requested() or bool(stop_check and stop_check())
+
+        if self.try_reuse_connection(server_group_name, target_country_code):
+            return True
+        self._clear_session()
+        status_poll_timeout_s = status_poll_timeout_s or self.status_poll_timeout_s
 
-        if not self.nordvpn_executable_path:
+        if not self.cli:
             self._notify_status("NordVPN CLI ('nordvpn.exe') nincs beállítva vagy nem található.", is_error=True)
             return False
 
-        self._notify_status("Eredeti publikus IP cím lekérdezése...")
-        self.base_ip_info = get_public_ip_info() # <<< AZ IMPORTÁLT FÜGGVÉNY HÍVÁSA
+        skip_ip_check = self.cli.supports_status and not self.verify_public_ip
+        # A VPN lépés előtti lekérdezés gyorsítótárból jöhet
+        self.base_ip_info = None if skip_ip_check else self.ip_info_provider()
         if self.base_ip_info:
             self._notify_status(f"Eredeti IP: {self.base_ip_info.get('ip')}, Ország: {self.base_ip_info.get('country_code')}")
-        else:
-            self._notify_status("Nem sikerült lekérdezni az eredeti IP címet. Folytatás IP ellenőrzés nélkül (csak feltételezett kapcsolódás).", is_error=True)
-            # Itt dönthetünk, hogy leállunk-e, ha az IP ellenőrzés kritikus.
-            # Egyelőre a kód folytatódik, de az IP ellenőrzési ciklus nem fogja tudni, mihez hasonlítson,
-            # vagy nem fogja tudni ellenőrizni az országot. Ezért itt False-t kellene visszaadni.
+        elif not self.cli.supports_status and not skip_ip_check:
+            # Állapot parancs nélkül csak az IP alapján ellenőrizhetünk, ahhoz kell az eredeti IP.
             self._notify_status("Az IP alapú VPN kapcsolat ellenőrzése nem lehetséges az eredeti IP ismerete nélkül.", is_error=True)
-            return False # Ha nincs eredeti IP, nem tudjuk megbízhatóan ellenőrizni a váltást.
+            return False
 
-        if not self._launch_nordvpn_if_not_running(startup_wait_s=10):
+        if not self._launch_nordvpn_if_not_running(startup_timeout_s=self.app_startup_timeout_s):
             self._notify_status("A NordVPN indítási/ébresztési fázisa sikertelen volt.", is_error=True)
             return False
 
-        command_args_connect = [self.nordvpn_executable_path, "-c", "-g", server_group_name]
-        self._notify_status(f"Csatlakozási parancs kiadása: \"{' '.join(command_args_connect)}\"...")
-        
+        self._notify_status(f"Csatlakozási parancs kiadása: {self.cli.display_name} ({server_group_name})...")
         try:
-            self._notify_status(f"subprocess.run indítása a csatlakozáshoz, max {connection_command_timeout_s}s várakozással a parancs befejezésére...")
-            process = subprocess.run(command_args_connect, capture_output=True, text=True, check=False, timeout=connection_command_timeout_s)
-
-            self._notify_status(f"'{' '.join(command_args_connect)}' parancs befejeződött. Return code: {process.returncode}")
-            if process.stdout and process.stdout.strip(): self._notify_status(f"Kimenet (stdout): {process.stdout.strip()}")
-            if process.stderr and process.stderr.strip(): self._notify_status(f"Hibakimenet (stderr): {process.stderr.strip()}", is_error=True)
-
-            if process.returncode == 0:
-                self._notify_status(f"A csatlakozási parancs elfogadva (return code 0). IP cím ellenőrzése következik...")
-                
-                for attempt in range(max_ip_check_retries):
-                    self._notify_status(f"IP ellenőrzési kísérlet ({attempt + 1}/{max_ip_check_retries})... Várakozás {ip_check_interval_s}s.")
-                    time.sleep(ip_check_interval_s)
-
-                    stop_requested = False
-                    if self.process_controller and hasattr(self.process_controller, '_stop_requested_by_user'):
-                        stop_requested = self.process_controller._stop_requested_by_user
-                    if stop_requested:
-                        self._notify_status("VPN IP ellenőrzési ciklus megszakítva felhasználói kéréssel.", is_error=True)
-                        return False
-                    
-                    current_ip_info = get_public_ip_info() # <<< AZ IMPORTÁLT FÜGGVÉNY HÍVÁSA
-                    if current_ip_info:
-                        self._notify_status(f"Aktuális IP: {current_ip_info.get('ip')}, Ország: {current_ip_info.get('country_code')}")
-                        if current_ip_info.get("country_code") == target_country_code.upper():
-                            # Győződjünk meg róla, hogy az IP cím tényleg megváltozott (ha nem Szingapúrban kezdtünk)
-                            if self.base_ip_info and current_ip_info.get("ip") == self.base_ip_info.get("ip") and \
-                               self.base_ip_info.get("country_code") != target_country_code.upper(): # Ha az eredeti ország nem a célország volt
-                                self._notify_status(f"Figyelem: Az országkód {target_country_code}, de az IP cím nem változott. Lehet, hogy a VPN nem tudott új IP-t kiosztani, vagy a geolokációs API lassan frissül.", is_error=True)
-                                # Itt folytathatjuk a ciklust, vagy sikertelennek vehetjük. Egyelőre folytatjuk.
-                            else: # Vagy ha az eredeti ország már a célország volt, vagy ha az IP megváltozott
-                                self.is_connected_to_target_server = True
-                                self._notify_status(f"VPN csatlakozás '{server_group_name}' ({target_country_code}) sikeresen ellenőrizve IP alapján!")
-                                return True
-                    else:
-                        self._notify_status("Nem sikerült lekérdezni az aktuális IP címet az ellenőrzéshez ebben a ciklusban.", is_error=True)
-                
-                self._notify_status(f"Nem sikerült ellenőrizni a csatlakozást '{target_country_code}'-hoz {max_ip_check_retries} próbálkozás után IP alapján.", is_error=True)
-                return False
-            else:
-                self._notify_status(f"A \"{' '.join(command_args_connect)}\" csatlakozási parancs hibával tért vissza (kód: {process.returncode}).", is_error=True)
-                return False
-        # ... (a többi except blokk és a disconnect_vpn, minimize_nordvpn_window változatlan)
+            result = self.cli.connect(server_group_name, timeout_s=connection_command_timeout_s)
         except subprocess.TimeoutExpired:
-            self._notify_status(f"Időtúllépés a \"{' '.join(command_args_connect)}\" csatlakozási parancs végrehajtása közben.", is_error=True)
+            self._notify_status(f"Időtúllépés a csatlakozási parancs végrehajtása közben ({connection_command_timeout_s}s).", is_error=True)
             return False
         except Exception as e:
-            self._notify_status(f"Váratlan hiba a \"{' '.join(command_args_connect)}\" csatlakozási parancs kiadása közben: {e}", is_error=True)
-            import traceback
+            self._notify_status(f"Váratlan hiba a csatlakozási parancs kiadása közben: {e}", is_error=True)
             print(traceback.format_exc())
             return False
+        finally:
+            invalidate_ip_cache() # A csatlakozási kísérlet után a korábbi IP már nem érvényes
+
+        if result.stdout.strip(): self._notify_status(f"Kimenet (stdout): {result.stdout.strip()}", level="debug")
+        if result.stderr.strip(): self._notify_status(f"Hibakimenet (stderr): {result.stderr.strip()}", is_error=True)
+        if result.returncode != 0:
+            self._notify_status(f"A csatlakozási parancs hibával tért vissza (kód: {result.returncode}).", is_error=True)
+            return False
+
+        if not self.cli.supports_status:
+            self._notify_status(f"Kapcsolat ellenőrzése IP alapján (max {status_poll_timeout_s}s)...")
+            ip_info = poll_with_backoff(lambda: self._probe_ip_in_country(target_country_code), status_poll_timeout_s,
+                                        initial_interval_s=0.5, stop_check=should_stop)
+            if not ip_info:
+                if not should_stop():
+                    self._notify_status(f"Nem sikerült ellenőrizni a csatlakozást '{target_country_code}'-hoz IP alapján.", is_error=True)
+                return False
+            return self._mark_connected(server_group_name, target_country_code, ip_info)
+
+        self._notify_status(f"Kapcsolat állapotának figyelése a CLI-n keresztül (max {status_poll_timeout_s}s)...")
+        status = poll_with_backoff(self._probe_connected_status, status_poll_timeout_s, stop_check=should_stop)
+        if not status:
+            if should_stop():
+                self._notify_status("VPN állapotfigyelés megszakítva felhasználói kéréssel.", is_error=True)
+            else:
+                last_state = self.last_status.state if self.last_status else "?"
+                self._notify_status(f"A VPN nem csatlakozott {status_poll_timeout_s}s alatt (utolsó állapot: {last_state}).", is_error=True)
+            return False
+        if skip_ip_check:
+            self._notify_status(f"CLI állapot: csatlakozva ({status.server or '?'}, {status.country or '?'}); "
+                                f"IP ellenőrzés kikapcsolva (vpn.verify_public_ip).")
+            return self._mark_connected(server_group_name, target_country_code, None)
+        self._notify_status(f"CLI állapot: csatlakozva ({status.server or '?'}, {status.country or '?'}). Végső IP ellenőrzés...")
+
+        # Egyetlen külső IP ellenőrzés a végén, megerősítésként.
+        ip_info = self.ip_info_provider(use_cache=False)
+        if ip_info is None:
+            self._notify_status("A végső IP ellenőrzés nem sikerült (IP API elérhetetlen); a CLI állapota alapján folytatás.", is_error=True)
+            return self._mark_connected(server_group_name, target_country_code, None)
+        if ip_info.get("country_code") != target_country_code.upper():
+            self._notify_status(f"A CLI szerint csatlakozva, de az IP országa {ip_info.get('country_code')} (várt: {target_country_code}).", is_error=True)
+            return False
+        return self._mark_connected(server_group_name, target_country_code, ip_info)
+
+    def _mark_connected(self, server_group_name, target_country_code, ip_info):
+        self.is_connected_to_target_server = True
+        self.connected_group = server_group_name
+        self.connected_country_code = target_country_code.upper()
+        self.connected_at = self.last_verified_at = time.monotonic()
+        ip_text = f" IP: {ip_info.get('ip')}" if ip_info else ""
+        self._notify_status(f"VPN csatlakozás '{server_group_name}' ({target_country_code}) sikeresen ellenőrizve.{ip_text}")
+        return True
+
+    # --- Kapcsolat-újrahasznosítás ---
+    def _clear_session(self):
+        self.is_connected_to_target_server = False
+        self.connected_group = None
+        self.connected_country_code = None
+        self.connected_at = None
+        self.last_verified_at = None
+
+    def verify_session(self):
+        """
+        Olcsó ellenőrzés, hogy a megjegyzett kapcsolat még él-e: a CLI állapota, vagy ha az nem
+        kérdezhető le (Windows), egy friss IP lekérdezés. Sikertelenség esetén elfelejti a kapcsolatot.
+        """
+        with self._session_lock:
+            if not self.is_connected_to_target_server or not self.cli:
+                return False
+            if self.cli.supports_status:
+                status = self.get_status()
+                alive = bool(status and status.state == VPN_STATE_CONNECTED)
+            else:
+                alive = self._probe_ip_in_country(self.connected_country_code) is not None
+            if alive:
+                self.last_verified_at = time.monotonic()
+            else:
+                self._notify_status("A megjegyzett VPN kapcsolat már nem él.", is_error=True)
+                self._clear_session()
+                invalidate_ip_cache()
+            return alive
+
+    def try_reuse_connection(self, server_group_name, target_country_code):
+        """
+        True, ha egy korábbi futás ellenőrzött kapcsolata ugyanarra az országra átvehető. Ha az utolsó
+        ellenőrzés health_check_interval_s-nál régebbi, előbb verify_session()-t hív. Leállítja a bontási időzítőt.
+        """
+        with self._session_lock:
+            self.cancel_idle_disconnect()
+            if not self.is_connected_to_target_server or self.connected_country_code != target_country_code.upper():
+                return False
+            age_s = time.monotonic() - (self.last_verified_at or 0)
+            if age_s > self.health_check_interval_s and not self.verify_session():
+                return False
+            self._notify_status(f"Meglévő VPN kapcsolat újrahasznosítva ('{self.connected_group}', {self.connected_country_code}, "
+                                f"{int(time.monotonic() - self.connected_at)}s óta él).")
+            return True
+
+    def release_session(self):
+        """A futás végén hívandó: keep_connected esetén elindítja a tétlenségi bontási időzítőt, különben azonnal bont."""
+        with self._session_lock:
+            if not self.is_connected_to_target_server:
+                return
+            if not self.keep_connected or self.idle_disconnect_s <= 0:
+                self.disconnect_vpn()
+                return
+            self.cancel_idle_disconnect()
+            self._idle_timer = threading.Timer(self.idle_disconnect_s, self._disconnect_after_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+            self._notify_status(f"VPN kapcsolat megtartva a következő futáshoz; bontás {self.idle_disconnect_s}s tétlenség után.")
+
+    def cancel_idle_disconnect(self):
+        with self._session_lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+    def _disconnect_after_idle(self):
+        with self._session_lock:
+            self._idle_timer = None
+            if self.is_connected_to_target_server:
+                self._notify_status("VPN tétlenségi idő lejárt, kapcsolat bontása...")
+                self.disconnect_vpn()
+
+    def shutdown(self):
+        """Alkalmazás kilépéskor: időzítő leállítása és a megtartott kapcsolat bontása."""
+        self.cancel_idle_disconnect()
+        if self.is_connected_to_target_server:
+            self.disconnect_vpn()
 
     def disconnect_vpn(self, disconnection_timeout_s=15):
-        # Ez a metódus nagyrészt változatlan maradhat
-        if not self.nordvpn_executable_path:
+        self.cancel_idle_disconnect()
+        if not self.cli:
             self._notify_status("NordVPN CLI ('nordvpn.exe') nincs beállítva, bontás nem lehetséges.", is_error=True)
             return False
-        command_args = [self.nordvpn_executable_path, "-d"]
-        self._notify_status(f"VPN kapcsolat bontási parancs kiadása: \"{' '.join(command_args)}\"...")
+        self._notify_status(f"VPN kapcsolat bontási parancs kiadása: {self.cli.display_name}...")
         try:
-            process_execution_timeout = disconnection_timeout_s + 5
-            process = subprocess.run(command_args, capture_output=True, text=True, check=False, timeout=process_execution_timeout)
-            self._notify_status(f"'{' '.join(command_args)}' parancs befejeződött. Return code: {process.returncode}")
-            if process.stdout and process.stdout.strip(): self._notify_status(f"Kimenet (stdout): {process.stdout.strip()}")
-            if process.stderr and process.stderr.strip(): self._notify_status(f"Hibakimenet (stderr): {process.stderr.strip()}", is_error=True)
-            if process.returncode == 0:
-                self._notify_status(f"A bontási parancs sikeresen elfogadva (return code 0). Feltételezzük a kapcsolat bontását.")
-                self.is_connected_to_target_server = False
-                return True
-            else:
-                self._notify_status(f"A bontási parancs hibával tért vissza (kód: {process.returncode}).", is_error=True)
-                return False
+            result = self.cli.disconnect(timeout_s=disconnection_timeout_s + 5)
         except subprocess.TimeoutExpired:
             self._notify_status(f"Időtúllépés a bontási parancs közben.", is_error=True)
             return False
         except Exception as e:
             self._notify_status(f"Hiba a VPN kapcsolat bontása közben: {e}", is_error=True)
-            import traceback; print(traceback.format_exc())
+            print(traceback.format_exc())
             return False
+        finally:
+            invalidate_ip_cache()
+        if result.stdout.strip(): self._notify_status(f"Kimenet (stdout): {result.stdout.strip()}", level="debug")
+        if result.stderr.strip(): self._notify_status(f"Hibakimenet (stderr): {result.stderr.strip()}", is_error=True)
+        if result.returncode == 0:
+            self._notify_status(f"A bontási parancs sikeresen elfogadva (return code 0).")
+            self._clear_session()
+            return True
+        self._notify_status(f"A bontási parancs hibával tért vissza (kód: {result.returncode}).", is_error=True)
+        return False
 
     def minimize_nordvpn_window(self, window_title="NordVPN"):
         pass # Valószínűleg nem releváns
@@ -6,6 +6,7 @@ from .widgets.title_widget import TitleWidget
 from .widgets.prompt_input_widget import PromptInputWidget
 from .widgets.music_player_widget import MusicPlayerWidget 
 from core.process_controller import ProcessController
+from utils.startup_profiler import profile_section
 
 
 class MainWindow(QMainWindow):
@@ -19,7 +20,8 @@ class MainWindow(QMainWindow):
         self.main_layout = QVBoxLayout(self.central_widget)
 
         self._create_widgets() 
-        self.process_controller = ProcessController(self)
+        with profile_section("ProcessController()"):
+            self.process_controller = ProcessController(self)
         self._setup_layout()
         self._connect_signals()
         print("MainWindow inicializálva.")
@@ -29,7 +31,8 @@ class MainWindow(QMainWindow):
         self.title_widget = TitleWidget()
         self.prompt_input_widget = PromptInputWidget()
         
-        self.music_player_widget = MusicPlayerWidget(parent=self)
+        with profile_section("MusicPlayerWidget() (főablak)"):
+            self.music_player_widget = MusicPlayerWidget(parent=self)
 
         self.status_label = QLabel("Állapot: Indítás...")
         self.status_label.setAlignment(Qt.AlignCenter)
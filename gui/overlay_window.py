@@ -40,6 +40,10 @@ class OverlayWindow(QWidget):
                 font-size: 9px;
                 color: #AAAAAA;
             }
+            #RunStatsLabel {
+                font-size: 10px;
+                color: #CCCCCC;
+            }
         """)
 
         self.main_layout = QVBoxLayout(self)
@@ -58,6 +62,11 @@ class OverlayWindow(QWidget):
         self.image_count_label.setAlignment(Qt.AlignCenter)
         self.main_layout.addWidget(self.image_count_label)
 
+        self.run_stats_label = QLabel("-- prompt/perc | ETA: --:--\nRender várakozás: --% | Hibaarány: --%")
+        self.run_stats_label.setObjectName("RunStatsLabel")
+        self.run_stats_label.setAlignment(Qt.AlignCenter)
+        self.main_layout.addWidget(self.run_stats_label)
+
         line = QFrame()
         line.setFrameShape(QFrame.Shape.HLine)
         line.setFrameShadow(QFrame.Shadow.Sunken)
@@ -77,7 +86,7 @@ class OverlayWindow(QWidget):
         self.shortcut_info_label.setWordWrap(True)
         self.main_layout.addWidget(self.shortcut_info_label)
 
-        self.setFixedSize(330, 310) 
+        self.setFixedSize(330, 350) 
         self.setFocusPolicy(Qt.StrongFocus)
 
 
@@ -101,6 +110,10 @@ class OverlayWindow(QWidget):
         else:
             self.image_count_label.setText("Kép: -/-")
 
+    @Slot(str)
+    def update_run_stats_label(self, text):
+        self.run_stats_label.setText(text)
+
     def position_in_top_right(self, margin=10): 
         primary_screen = QApplication.primaryScreen()
         if not primary_screen:
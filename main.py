@@ -1,15 +1,45 @@
 # main.py
+import os
 import sys
-from PySide6.QtWidgets import QApplication
-from gui.main_window import MainWindow
+from utils.startup_profiler import activate_startup_profiler, profile_section
 
-def run_app():
+PROFILE_STARTUP_FLAG = "--profile-startup"
+
+def run_app(profile_startup=False):
     """
     Inicializálja és elindítja a PySide6 alkalmazást.
+    profile_startup=True esetén az első ablakmegjelenítés után kiírja az indítási profilt
+    (modulonkénti import- és komponensenkénti inicializálási idők), és elmenti
+    a logs/startup_profile.json fájlba.
     """
-    app = QApplication(sys.argv)
-    main_win = MainWindow()
-    main_win.show()
+    profiler = activate_startup_profiler() if profile_startup else None
+
+    with profile_section("import PySide6.QtWidgets"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtCore import QTimer
+    with profile_section("import gui.main_window"):
+        from gui.main_window import MainWindow
+
+    with profile_section("QApplication()"):
+        app = QApplication(sys.argv)
+    with profile_section("MainWindow()"):
+        main_win = MainWindow()
+    with profile_section("MainWindow.show()"):
+        main_win.show()
+
+    if profiler:
+        def _report_startup_profile():
+            profiler.mark("első eseményciklus (ablak megjelenítve)")
+            profiler.uninstall_import_hook()
+            print(profiler.report())
+            profile_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "startup_profile.json")
+            try:
+                profiler.save_json(profile_path)
+                print(f"Indítási profil elmentve: {profile_path}")
+            except Exception as e:
+                print(f"Hiba az indítási profil mentésekor: {e}")
+        QTimer.singleShot(0, _report_startup_profile)
+
     sys.exit(app.exec())
 
 if __name__ == '__main__':
@@ -17,5 +47,9 @@ if __name__ == '__main__':
     # from utils.logger import setup_logging
     # setup_logging() # Ezt majd később implementáljuk
 
+    profile_startup = PROFILE_STARTUP_FLAG in sys.argv
+    if profile_startup:
+        sys.argv.remove(PROFILE_STARTUP_FLAG)
+
     print("Alkalmazás indítása...")
-    run_app()
+    run_app(profile_startup=profile_startup)
@@ -0,0 +1,40 @@
+# tests/test_batch_runner.py
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from core import batch_runner
+from core.automation_engine import OUTCOME_CRASHED
+
+
+class BatchRunnerMainTest(unittest.TestCase):
+    def _run_main(self, argv):
+        """A main() futtatása; visszaadja a kilépési kódot és a stdout JSON sorait."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        # A main() a sys.stdout-ot a stderr-re állítja; a patch a végén visszaállítja
+        with mock.patch("sys.stdout", stdout), contextlib.redirect_stderr(stderr):
+            code = batch_runner.main(argv)
+        return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_invalid_line_range_returns_2(self):
+        for argv in (["promptok.txt", "--start", "0"], ["promptok.txt", "--start", "5", "--end", "3"]):
+            code, records = self._run_main(argv)
+            self.assertEqual(code, 2)
+            self.assertEqual(records, [])
+
+    def test_component_construction_failure_exits_with_crash_code(self):
+        failure = ImportError("pyautogui: nincs DISPLAY")
+        with mock.patch.object(batch_runner, "HeadlessController", side_effect=failure):
+            code, records = self._run_main(["promptok.txt", "--no-vpn"])
+        self.assertEqual(code, batch_runner.EXIT_CODES[OUTCOME_CRASHED])
+        self.assertEqual(code, 6)
+        self.assertEqual([r["event"] for r in records], ["start", "exit"])
+        self.assertEqual(records[-1]["outcome"], OUTCOME_CRASHED)
+        self.assertEqual(records[-1]["code"], 6)
+        self.assertIn("nincs DISPLAY", records[-1]["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
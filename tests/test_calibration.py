@@ -0,0 +1,59 @@
+# tests/test_calibration.py
+import unittest
+
+import numpy as np
+
+try:
+    from core import calibration
+except Exception:  # pyautogui (vagy kijelző) nélkül a modul nem tölthető be
+    calibration = None
+
+BACKGROUND = (240, 240, 240)
+
+
+def _screen(height=300, width=400):
+    return np.tile(np.array(BACKGROUND, dtype=np.int16), (height, width, 1))
+
+
+@unittest.skipIf(calibration is None, "a pyautogui nem érhető el")
+class RenderWatchPixelTest(unittest.TestCase):
+    def setUp(self):
+        self.before = _screen()
+        self.during = _screen()
+        # Generálás gomb (kicsi, bal felül) és render csempe (nagy, jobb alul): a befoglaló téglalap
+        # közepe a kettő közötti háttérre esne.
+        self.during[10:40, 10:60] = (41, 25, 32)
+        self.during[150:290, 250:390] = (60, 60, 60)
+        # A csempe közepén forgó töltésjelző
+        self.during[210:230, 310:330] = (200, 0, 0)
+
+    def test_largest_component_excludes_the_button(self):
+        changed = calibration.changed_pixel_mask(self.before, self.during)
+        component = calibration.largest_changed_component(changed)
+        region = calibration._bounding_region(component)
+        self.assertEqual((region['x'], region['y'], region['width'], region['height']), (250, 150, 140, 140))
+        self.assertFalse(component[20, 20])
+        bounding_center = calibration._bounding_region(changed)
+        self.assertTrue(np.all(self.during[bounding_center['center_y'], bounding_center['center_x']] == BACKGROUND))
+
+    def test_watch_pixel_is_changed_and_not_animated(self):
+        component = calibration.largest_changed_component(calibration.changed_pixel_mask(self.before, self.during))
+        later = []
+        for angle in range(3):
+            frame = self.during.copy()
+            frame[210:230, 310:330] = (0, 200 - angle * 50, 0)  # A töltésjelző színe képkockánként változik
+            later.append(frame)
+        x, y = calibration.pick_stable_watch_pixel(component, self.during, later)
+        self.assertTrue(component[y, x])
+        self.assertTrue(np.all(self.during[y, x] == (60, 60, 60)))
+        self.assertFalse(310 <= x < 330 and 210 <= y < 230)
+
+    def test_no_stable_pixel_gives_none(self):
+        component = calibration.largest_changed_component(calibration.changed_pixel_mask(self.before, self.during))
+        self.assertIsNone(calibration.pick_stable_watch_pixel(component, self.during, [self.before]))
+        self.assertIsNone(calibration.largest_changed_component(
+            calibration.changed_pixel_mask(self.before, self.before)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# tests/test_engine_host.py
+import threading
+import unittest
+
+from core.engine_host import EngineHostClient, EVENT_HOST_EXIT, EVENT_RUN_DONE
+
+
+def _failing_controller(writer):
+    # Mint amikor a gyermek folyamatban a pyautogui nem tölthető be (nincs kijelző)
+    raise RuntimeError("nincs kijelző")
+
+
+class EngineHostFailingControllerTest(unittest.TestCase):
+    def test_host_that_fails_to_start_still_finishes_the_run(self):
+        events = []
+        host_exited = threading.Event()
+
+        def on_event(event, fields):
+            events.append((event, fields))
+            if event == EVENT_HOST_EXIT:
+                host_exited.set()
+
+        client = EngineHostClient(on_event, shutdown_timeout_s=2, controller_factory=_failing_controller)
+        self.addCleanup(client.shutdown)
+        self.assertTrue(client.start_run("promptok.txt", 1, 5))
+        self.assertTrue(host_exited.wait(60))
+
+        names = [event for event, _ in events]
+        self.assertFalse(client.is_run_active)
+        self.assertEqual(names[-3:], ["finished", EVENT_RUN_DONE, EVENT_HOST_EXIT])
+        self.assertEqual(names.count(EVENT_RUN_DONE), 1)
+        errors = [fields["message"] for event, fields in events if event == "status" and fields.get("is_error")]
+        self.assertTrue(any("nincs kijelző" in message for message in errors), errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# tests/test_frame_ring.py
+import multiprocessing
+import time
+import unittest
+
+import numpy as np
+
+from core.frame_ring import SharedFrameRing, _WRITING
+
+HEIGHT, WIDTH = 540, 960
+FRAMES_PER_WRITER = 150
+
+
+def _frame_value(writer_id, index):
+    # Írónként eltérő értékek: egy két íróból összekevert képkocka nem lehet egyszínű
+    return (writer_id * 128 + index) % 256
+
+
+def _writer_process(handle, writer_id, start_event):
+    ring = SharedFrameRing.attach(*handle)
+    start_event.wait(30)
+    frame = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    for index in range(FRAMES_PER_WRITER):
+        frame[:] = _frame_value(writer_id, index)
+        while ring.write(frame) is None:
+            pass
+    ring.close()
+
+
+def _reader_process(handle, frame_total, result_queue, start_event):
+    ring = SharedFrameRing.attach(*handle)
+    start_event.set()
+    last_seq, seen, torn = -1, 0, 0
+    while last_seq < frame_total - 1:
+        frame = ring.wait_for(last_seq, timeout_s=10.0)
+        if frame is None:
+            break
+        with frame:
+            # Rögzítés alatt egy író sem írhat a slotba: a képkockának egyszínűnek kell lennie,
+            # és egy rövid várakozás után is változatlannak kell maradnia
+            value = frame.array[0, 0, 0]
+            if not np.all(frame.array == value):
+                torn += 1
+            time.sleep(0.001)
+            if not np.all(frame.array == value):
+                torn += 1
+            last_seq = frame.seq
+            seen += 1
+    ring.close()
+    result_queue.put((seen, torn, last_seq))
+
+
+class SharedFrameRingTest(unittest.TestCase):
+    def setUp(self):
+        self.context = multiprocessing.get_context("spawn")
+        self.ring = SharedFrameRing(slot_count=3, max_height=HEIGHT, max_width=WIDTH, lock=self.context.Lock())
+        self.addCleanup(self.ring.close)
+
+    def _frame(self, value, height=HEIGHT, width=WIDTH):
+        return np.full((height, width, 3), value, dtype=np.uint8)
+
+    def test_write_and_acquire_latest(self):
+        self.assertIsNone(self.ring.acquire_latest())
+        self.assertEqual(self.ring.write(self._frame(7, 50, 60)), 0)
+        with self.ring.acquire_latest() as frame:
+            self.assertEqual(frame.seq, 0)
+            self.assertEqual(frame.array.shape, (50, 60, 3))
+            self.assertTrue(np.all(frame.array == 7))
+            self.assertFalse(frame.array.flags.writeable)
+        self.assertIsNone(self.ring.acquire_latest(newer_than=0))
+
+    def test_pinned_slot_is_not_overwritten(self):
+        self.ring.write(self._frame(1))
+        pinned = self.ring.acquire(0)
+        for value in range(2, 10):
+            self.ring.write(self._frame(value))
+        self.assertTrue(np.all(pinned.array == 1))
+        pinned.release()
+        self.ring.write(self._frame(10))  # A felszabadult (legrégebbi) slot újra írható
+        self.assertIsNone(self.ring.acquire(0))
+
+    def test_frame_dropped_when_all_slots_pinned(self):
+        frames = []
+        for value in range(3):
+            seq = self.ring.write(self._frame(value))
+            frames.append(self.ring.acquire(seq))
+        self.assertIsNone(self.ring.write(self._frame(99)))
+        self.assertEqual(self.ring.dropped_count, 1)
+        frames[0].release()
+        self.assertIsNotNone(self.ring.write(self._frame(99)))
+        for frame in frames[1:]:
+            frame.release()
+
+    def test_oversized_frame_is_dropped(self):
+        self.assertIsNone(self.ring.write(self._frame(1, HEIGHT + 1, WIDTH)))
+        self.assertEqual(self.ring.dropped_count, 1)
+
+    def test_slot_being_written_is_not_chosen_by_another_writer(self):
+        for value in range(3):
+            self.ring.write(self._frame(value))
+        # A legrégebbi slotot (seq 0) egy másik író épp írja
+        self.ring._header[0, _WRITING] = 1
+        self.ring.write(self._frame(50))
+        self.assertEqual(self.ring._header[0, _WRITING], 1)
+        self.assertIsNone(self.ring.acquire(1))  # A következő legrégebbi íródott felül
+        self.ring._header[1:, _WRITING] = 1
+        self.assertIsNone(self.ring.write(self._frame(51)))
+
+    def test_two_writer_processes_produce_no_torn_frames(self):
+        frame_total = 2 * FRAMES_PER_WRITER
+        results = self.context.Queue()
+        start_event = self.context.Event()
+        handle = self.ring.handle()
+        reader = self.context.Process(target=_reader_process, args=(handle, frame_total, results, start_event))
+        writers = [self.context.Process(target=_writer_process, args=(handle, writer_id, start_event))
+                   for writer_id in range(2)]
+        reader.start()
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        seen, torn, last_seq = results.get(timeout=60)
+        reader.join(10)
+        self.assertEqual(torn, 0)
+        self.assertGreater(seen, 0)
+        self.assertEqual(last_seq, frame_total - 1)
+        self.assertEqual(self.ring.latest_seq, frame_total - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
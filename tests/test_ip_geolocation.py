@@ -0,0 +1,102 @@
+# tests/test_ip_geolocation.py
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from utils import ip_geolocation
+from utils.ip_geolocation import get_cached_ip_info, get_public_ip_info, invalidate_ip_cache
+
+
+def _start_provider(delay_s, payload):
+    """Helyi HTTP "szolgáltató", amely delay_s késleltetéssel a payload JSON-t adja vissza."""
+    class Handler(BaseHTTPRequestHandler):
+        hits = 0
+
+        def do_GET(self):
+            Handler.hits += 1
+            time.sleep(delay_s)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler
+
+
+@unittest.skipIf(ip_geolocation.requests is None, "a 'requests' nincs telepítve")
+class PublicIpLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.slow, _ = _start_provider(3.0, {"ip": "10.0.0.1", "country": "hu"})
+        self.failing, _ = _start_provider(0.0, {"status": "fail", "message": "quota"})
+        self.fast, self.fast_handler = _start_provider(0.1, {"ipAddress": "10.0.0.2", "countryCode": "sg"})
+        self.providers = [
+            {"url": self._url(self.slow), "ip_key": "ip", "country_key": "country"},
+            {"url": self._url(self.failing), "ip_key": "query", "country_key": "countryCode"},
+            {"url": self._url(self.fast), "ip_key": "ipAddress", "country_key": "countryCode"},
+        ]
+        invalidate_ip_cache()
+        self.addCleanup(invalidate_ip_cache)
+
+    def tearDown(self):
+        for server in (self.slow, self.failing, self.fast):
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def _url(server):
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    def test_fastest_valid_answer_wins(self):
+        started = time.monotonic()
+        info = get_public_ip_info(timeout_s=5, providers=self.providers)
+        self.assertEqual((info["ip"], info["country_code"]), ("10.0.0.2", "SG"))
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_cache_and_invalidation(self):
+        info = get_public_ip_info(timeout_s=5, providers=self.providers)
+        hits = self.fast_handler.hits
+        self.assertEqual(get_public_ip_info(timeout_s=5, providers=self.providers), info)
+        self.assertEqual(self.fast_handler.hits, hits)
+
+        invalidate_ip_cache()
+        get_public_ip_info(timeout_s=5, providers=self.providers)
+        self.assertEqual(self.fast_handler.hits, hits + 1)
+        get_public_ip_info(timeout_s=5, use_cache=False, providers=self.providers)
+        self.assertEqual(self.fast_handler.hits, hits + 2)
+
+    def test_timeout_or_failed_answers_give_none(self):
+        self.assertIsNone(get_public_ip_info(timeout_s=0.5, providers=self.providers[:2]))
+
+    def test_unexpected_provider_error_does_not_escape(self):
+        broken_session = mock.Mock()
+        broken_session.get.side_effect = RuntimeError("váratlan hiba")
+        with mock.patch.object(ip_geolocation, "_get_session", return_value=broken_session):
+            self.assertIsNone(get_public_ip_info(timeout_s=1, providers=self.providers))
+        malformed = [{"url": self._url(self.fast)}]  # Hiányzó kulcsok -> KeyError a szolgáltatón belül
+        self.assertIsNone(get_public_ip_info(timeout_s=1, providers=malformed))
+
+    def test_lookup_in_flight_during_invalidation_is_not_cached(self):
+        results = []
+        slow_only = self.providers[:1]
+        lookup = threading.Thread(target=lambda: results.append(get_public_ip_info(timeout_s=5, providers=slow_only)))
+        lookup.start()
+        time.sleep(0.5)
+        invalidate_ip_cache()  # Pl. VPN csatlakozás a lekérdezés közben
+        lookup.join(10)
+        self.assertEqual(results[0]["country_code"], "HU")
+        self.assertIsNone(get_cached_ip_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_iteration_profiler.py
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.iteration_profiler import IterationProfiler, StackSampler, MODE_BOTH, MODE_SAMPLER
+
+
+def _busy_loop(seconds):
+    deadline = time.monotonic() + seconds
+    total = 0
+    while time.monotonic() < deadline:
+        total += sum(i * i for i in range(200))
+    return total
+
+
+class IterationProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+
+    def _profiler(self, **kwargs):
+        profiler = IterationProfiler(output_dir=self.output_dir, notify_callback=lambda msg: None, **kwargs)
+        profiler.new_run("teszt")
+        self.addCleanup(profiler.close)
+        return profiler
+
+    def _run_iterations(self, profiler, durations_s):
+        saved = {}
+        for index, seconds in enumerate(durations_s):
+            profiler.begin(index, 100 + index)
+            _busy_loop(seconds)
+            saved[index] = profiler.end()
+        return saved
+
+    def test_every_n_selects_scheduled_iterations(self):
+        profiler = self._profiler(mode=MODE_SAMPLER, every_n=2, sample_interval_s=0.001)
+        saved = self._run_iterations(profiler, [0.02] * 5)
+        self.assertEqual([index for index, files in saved.items() if files], [0, 2, 4])
+        self.assertEqual(profiler.saved_count, 3)
+
+    def test_slow_threshold_saves_only_slow_iterations(self):
+        profiler = self._profiler(mode=MODE_SAMPLER, every_n=0, slow_threshold_s=0.15, sample_interval_s=0.001)
+        saved = self._run_iterations(profiler, [0.01, 0.2, 0.01])
+        self.assertEqual([index for index, files in saved.items() if files], [1])
+        self.assertTrue(os.path.basename(saved[1][0]).endswith("_slow.collapsed"))
+
+    def test_both_mode_writes_prof_txt_and_collapsed_stacks(self):
+        profiler = self._profiler(mode=MODE_BOTH, every_n=1, sample_interval_s=0.001)
+        files = self._run_iterations(profiler, [0.1])[0]
+        self.assertEqual(sorted(os.path.splitext(path)[1] for path in files), [".collapsed", ".prof", ".txt"])
+        for path in files:
+            self.assertTrue(os.path.getsize(path) > 0, path)
+            self.assertEqual(os.path.dirname(path), os.path.join(self.output_dir, "teszt"))
+        with open([p for p in files if p.endswith(".txt")][0], encoding="utf-8") as f:
+            self.assertIn("_busy_loop", f.read())
+        with open([p for p in files if p.endswith(".collapsed")][0], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any("_busy_loop" in line for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+
+    def test_discarded_iteration_writes_nothing(self):
+        profiler = self._profiler(mode=MODE_SAMPLER, every_n=1, sample_interval_s=0.001)
+        profiler.begin(0, 100)
+        profiler.begin(1, 101)  # Az előző iteráció lezáratlan: eldobódik
+        self.assertEqual(len(profiler.end()), 1)
+        profiler.begin(2, 102)
+        profiler.close()
+        self.assertEqual(profiler.saved_count, 1)
+
+
+class StackSamplerTest(unittest.TestCase):
+    def test_samples_the_target_thread(self):
+        sampler = StackSampler(threading.get_ident(), interval_s=0.001)
+        sampler.start()
+        _busy_loop(0.1)
+        sampler.stop()
+        self.assertGreater(sampler.sample_count, 0)
+        self.assertEqual(sum(sampler.stacks.values()), sampler.sample_count)
+        self.assertIn("_busy_loop", sampler.collapsed())
+
+
+class IterationProfilerFromSettingsTest(unittest.TestCase):
+    def _from_settings(self, cfg):
+        with mock.patch("core.iteration_profiler.get_section", return_value=cfg):
+            return IterationProfiler.from_settings()
+
+    def test_disabled_or_without_trigger_returns_none(self):
+        self.assertIsNone(self._from_settings({}))
+        self.assertIsNone(self._from_settings({"enabled": False, "every_n": 5}))
+        self.assertIsNone(self._from_settings({"enabled": True, "every_n": 0, "slow_threshold_s": 0}))
+
+    def test_enabled_reads_settings(self):
+        profiler = self._from_settings({"enabled": True, "mode": "both", "every_n": 3, "slow_threshold_s": 2.5,
+                                        "sample_interval_ms": 10, "output_dir": "logs/teszt_profiles"})
+        self.assertEqual((profiler.mode, profiler.every_n, profiler.slow_threshold_s), (MODE_BOTH, 3, 2.5))
+        self.assertAlmostEqual(profiler.sample_interval_s, 0.01)
+        self.assertTrue(os.path.isabs(profiler.base_output_dir))
+        self.assertTrue(profiler.base_output_dir.endswith(os.path.join("logs", "teszt_profiles")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_metrics.py
+import unittest
+import urllib.error
+import urllib.request
+
+from core.metrics import MetricsRegistry, MetricsServer, PROMETHEUS_CONTENT_TYPE
+
+
+class MetricsServerScrapeTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.server = MetricsServer(registry=self.registry, port=0).start()
+        self.addCleanup(self.server.stop)
+
+    def _scrape(self, path="/metrics"):
+        url = f"http://{self.server.host}:{self.server.port}{path}"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.headers["Content-Type"], response.read().decode("utf-8")
+
+    def test_scrape_returns_prometheus_text_format(self):
+        prompts = self.registry.counter("prompts_total", "Feldolgozott promptok.", ("outcome",))
+        retries = self.registry.counter("retries_total", "Újrapróbálások.")
+        phases = self.registry.histogram("phase_seconds", "Szakaszok ideje.", ("phase",), buckets=(1.0, 5.0, 20.0))
+        prompts.inc(outcome="ok")
+        prompts.inc(2, outcome="failed")
+        phases.observe(0.5, phase="typing")
+        phases.observe(12.5, phase="render_wait")
+        phases.observe(30.0, phase="render_wait")
+
+        content_type, text = self._scrape()
+        self.assertEqual(content_type, PROMETHEUS_CONTENT_TYPE)
+        self.assertTrue(text.endswith("\n"))
+        lines = text.splitlines()
+        for expected in (
+                "# HELP autoimagegen_prompts_total Feldolgozott promptok.",
+                "# TYPE autoimagegen_prompts_total counter",
+                'autoimagegen_prompts_total{outcome="failed"} 2',
+                'autoimagegen_prompts_total{outcome="ok"} 1',
+                "autoimagegen_retries_total 0",  # Címke nélküli számláló megfigyelés előtt is megjelenik
+                "# TYPE autoimagegen_phase_seconds histogram",
+                'autoimagegen_phase_seconds_bucket{phase="render_wait",le="1.0"} 0',
+                'autoimagegen_phase_seconds_bucket{phase="render_wait",le="20.0"} 1',
+                'autoimagegen_phase_seconds_bucket{phase="render_wait",le="+Inf"} 2',
+                'autoimagegen_phase_seconds_sum{phase="render_wait"} 42.5',
+                'autoimagegen_phase_seconds_count{phase="render_wait"} 2',
+                'autoimagegen_phase_seconds_bucket{phase="typing",le="1.0"} 1'):
+            self.assertIn(expected, lines)
+        # Minden mintasor "név[{címkék}] érték" alakú
+        for line in lines:
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                self.assertTrue(name.startswith("autoimagegen_"), line)
+                float(value.replace("+Inf", "inf"))
+
+    def test_label_values_are_escaped(self):
+        self.registry.counter("events_total", "Események.", ("reason",)).inc(reason='a "b"\\c\nd')
+        _, text = self._scrape("/")
+        self.assertIn('autoimagegen_events_total{reason="a \\"b\\"\\\\c\\nd"} 1', text.splitlines())
+
+    def test_unknown_path_is_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self._scrape("/other")
+        self.assertEqual(context.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_network_health_monitor.py
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.network_health_monitor import NetworkHealthMonitor
+
+
+class _BlockingVpnManager:
+    """Elveszett kapcsolat, és egy újracsatlakozás, amely csak a stop_check jelzésére tér vissza."""
+    def __init__(self, connect_result=True):
+        self.is_connected_to_target_server = True
+        self.connect_result = connect_result
+        self.connect_started = threading.Event()
+        self.connect_calls = 0
+
+    def verify_session(self):
+        return False
+
+    def connect_to_server(self, server_group_name, target_country_code, stop_check=None):
+        self.connect_calls += 1
+        self.connect_started.set()
+        while not (stop_check and stop_check()):
+            time.sleep(0.01)
+        time.sleep(0.2)  # A félbeszakított CLI hívás még lefut
+        return self.connect_result
+
+
+class NetworkHealthMonitorStopTest(unittest.TestCase):
+    def _engine(self):
+        return mock.Mock(is_paused=False, target_vpn_server_group="singapore", target_vpn_country_code="SG")
+
+    def _start_monitor(self, engine, vpn_manager):
+        monitor = NetworkHealthMonitor(engine, vpn_manager, check_interval_s=0.05, fallback_server_groups=["japan"],
+                                       retry_delay_s=0.05, stop_timeout_s=5, notify_callback=lambda *a: None)
+        monitor.start()
+        self.assertTrue(vpn_manager.connect_started.wait(5))
+        return monitor
+
+    def test_stop_during_reconnect_waits_and_leaves_engine_alone(self):
+        for connect_result in (True, False):
+            engine, vpn_manager = self._engine(), _BlockingVpnManager(connect_result)
+            monitor = self._start_monitor(engine, vpn_manager)
+            thread = monitor._thread
+            monitor.stop()
+            self.assertFalse(thread.is_alive())
+            engine.suspend_for_network.assert_called_once()
+            engine.request_hard_stop.assert_not_called()
+            engine.resume_after_network.assert_not_called()
+            self.assertEqual(vpn_manager.connect_calls, 1)
+
+    def test_successful_reconnect_resumes_engine(self):
+        engine, vpn_manager = self._engine(), _BlockingVpnManager()
+        release = threading.Event()
+        original_connect = vpn_manager.connect_to_server
+
+        def connect_once(server_group_name, target_country_code, stop_check=None):
+            vpn_manager.is_connected_to_target_server = False  # Ne induljon új ellenőrzés
+            return original_connect(server_group_name, target_country_code, stop_check=release.is_set)
+
+        vpn_manager.connect_to_server = connect_once
+        monitor = NetworkHealthMonitor(engine, vpn_manager, check_interval_s=0.05, notify_callback=lambda *a: None)
+        monitor.start()
+        self.assertTrue(vpn_manager.connect_started.wait(5))
+        release.set()
+        deadline = time.monotonic() + 5
+        while not engine.resume_after_network.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        monitor.stop()
+        engine.resume_after_network.assert_called_once()
+        engine.request_hard_stop.assert_not_called()
+        self.assertEqual(monitor.incident_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
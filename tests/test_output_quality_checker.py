@@ -0,0 +1,50 @@
+# tests/test_output_quality_checker.py
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.output_quality_checker import OutputQualityChecker
+
+
+class OutputQualityCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.checker = OutputQualityChecker(notify_callback=lambda *a, **k: None)
+
+    def _save(self, name, array):
+        path = os.path.join(self.temp_dir, name)
+        Image.fromarray(array.astype(np.uint8)).save(path)
+        return path
+
+    def _noise(self, name, height=64, width=64, seed=0):
+        return self._save(name, np.random.default_rng(seed).integers(0, 256, (height, width, 3)))
+
+    def test_accepts_new_image_and_rejects_duplicate(self):
+        self.assertEqual(self.checker.check(self._noise("a.png", seed=1)), (True, None))
+        self.assertEqual(self.checker.check(self._noise("b.png", seed=1)), (False, "az előző kép másolata"))
+        self.assertEqual(self.checker.check(self._noise("c.png", seed=2)), (True, None))
+
+    def test_rejects_blank_and_unreadable_images(self):
+        self.assertEqual(self.checker.check(self._save("blank.png", np.full((64, 64, 3), 255))),
+                         (False, "üres/egyszínű kép"))
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"nem kep")
+        ok, reason = self.checker.check(broken)
+        self.assertFalse(ok)
+        self.assertTrue(reason.startswith("a kép nem olvasható"))
+
+    def test_image_too_small_to_hash_is_rejected_not_raised(self):
+        ok, reason = self.checker.check(self._noise("narrow.png", height=64, width=8))
+        self.assertFalse(ok)
+        self.assertTrue(reason.startswith("a kép nem ellenőrizhető"))
+        self.assertIsNone(self.checker.previous_hashes)
+
+
+if __name__ == '__main__':
+    unittest.main()
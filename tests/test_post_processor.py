@@ -0,0 +1,75 @@
+# tests/test_post_processor.py
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from PIL import Image
+
+from core.post_processor import PostProcessor
+
+
+def _wait_until(condition, timeout_s=30.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class PostProcessorOverflowTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.messages = []
+        self.processor = PostProcessor(workers=1, max_pending=1, thumbnail_size=16,
+                                       notify_callback=lambda message, is_error: self.messages.append(message))
+        self.addCleanup(self.processor.drain)
+
+    def _image(self, index):
+        path = os.path.join(self.temp_dir, f"kep_{index}.png")
+        Image.new("RGB", (32, 32), (index * 40, 0, 0)).save(path)
+        return path
+
+    def test_deferred_jobs_are_processed_before_drain(self):
+        processor = self.processor
+        processor._ensure_started()
+        paths = [self._image(i) for i in range(5)]
+        processor._in_flight.acquire()  # Az egyetlen munkahely foglalt: az adagoló az első feladatnál megáll
+        try:
+            self.assertTrue(processor.submit(paths[0], "első", 1))
+            self.assertTrue(_wait_until(processor._queue.empty))
+            self.assertTrue(processor.submit(paths[1], "második", 2))
+            self.assertEqual([processor.submit(path, f"prompt {i}", i + 1) for i, path in enumerate(paths[2:], 2)],
+                             [False, False, False])
+            self.assertEqual(processor.deferred_count, 3)
+        finally:
+            processor._in_flight.release()
+        self.assertTrue(_wait_until(lambda: processor.completed_count == len(paths)))
+        self.assertEqual(processor.deferred_count, 0)
+        self.assertEqual(processor.failed_count, 0)
+        for index, path in enumerate(paths):
+            with Image.open(path) as image:
+                self.assertEqual(image.text["prompt_line"], str(index + 1))
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "thumbnails", f"kep_{index}.jpg")))
+
+    def test_drain_processes_jobs_still_deferred(self):
+        processor = self.processor
+        processor._ensure_started()
+        paths = [self._image(i) for i in range(4)]
+        processor._in_flight.acquire()
+        try:
+            for index, path in enumerate(paths):
+                processor.submit(path, "prompt", index + 1)
+            self.assertGreater(processor.deferred_count, 0)
+        finally:
+            processor._in_flight.release()
+        processor.drain()
+        self.assertEqual((processor.completed_count, processor.failed_count, processor.deferred_count), (4, 0, 0))
+        self.assertIn("pool leürítve (4 kész, 0 hibás).", self.messages[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_session_replay.py
+import os
+import shutil
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+try:
+    from core import session_recorder, session_replay
+except Exception:  # pyautogui (vagy kijelző) nélkül a modul nem tölthető be
+    session_replay = None
+
+WIDTH, HEIGHT = 40, 30
+
+
+def _frame(seed):
+    return np.random.default_rng(seed).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+class _StubScreen:
+    """A pyautogui helyettesítője a felvételhez: a képernyő tartalmát a teszt állítja be."""
+    def __init__(self):
+        self.image = _frame(1)
+        self.actions = []
+
+    def functions(self):
+        def action(name):
+            return lambda *args, **kwargs: self.actions.append(name)
+        return dict(screenshot=self.screenshot, pixel=self.pixel, size=lambda: (WIDTH, HEIGHT),
+                    locateOnScreen=lambda *args, **kwargs: None,
+                    **{name: action(name) for name in session_recorder.ACTION_FUNCTIONS})
+
+    def screenshot(self, imageFilename=None, region=None):
+        left, top, width, height = region or (0, 0, WIDTH, HEIGHT)
+        return Image.fromarray(self.image[top:top + height, left:left + width].copy())
+
+    def pixel(self, x, y):
+        return tuple(int(c) for c in self.image[y, x])
+
+
+@unittest.skipIf(session_replay is None, "a pyautogui nem érhető el")
+class SessionReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.frame_a, self.frame_b = _frame(1), _frame(2)
+        self.archive = self._record()
+        self.session = session_replay.RecordedSession(self.archive)
+        self.addCleanup(self.session.close)
+
+    def _record(self):
+        """Szintetikus felvétel: A, pixel, kattintás, B, ismét A (a felvételi idő lépésenként 1 s)."""
+        pyautogui = session_replay.pyautogui
+        screen = _StubScreen()
+        clock = iter(range(100))
+        fake_time = types.SimpleNamespace(monotonic=lambda: float(next(clock)), strftime=time.strftime)
+        recorder = session_recorder.SessionRecorder(os.path.join(self.temp_dir, "run.zip"),
+                                                    notify_callback=lambda message: None)
+        with mock.patch.multiple(pyautogui, **screen.functions()), mock.patch.object(session_recorder, "time", fake_time):
+            self.assertTrue(recorder.install({"run_id": "teszt"}))           # t=0
+            recorder.mark("prompt_start", prompt_line_no=7)                   # t=1
+            pyautogui.screenshot()                                            # t=2: A
+            pyautogui.pixel(5, 5)                                             # t=3
+            pyautogui.click(10, 12)                                           # t=4
+            screen.image = self.frame_b
+            pyautogui.screenshot()                                            # t=5: B
+            screen.image = self.frame_a
+            pyautogui.screenshot()                                            # t=6: A ismét
+            recorder.mark("prompt_end", ok=True, downloaded=True)             # t=7
+            recorder.close()
+        self.assertEqual(screen.actions, ["click"])
+        return recorder.archive_path
+
+    def test_frames_are_deduplicated_by_frame_key(self):
+        key_a = session_recorder.frame_key(Image.fromarray(self.frame_a))
+        key_b = session_recorder.frame_key(Image.fromarray(self.frame_b))
+        screenshots = [e["frame"] for e in self.session.events if e["kind"] == "screenshot"]
+        self.assertEqual(screenshots, [key_a, key_b, key_a])
+        self.assertEqual(self.session.meta["frame_count"], 2)
+        self.assertEqual(self.session.screen_size, (WIDTH, HEIGHT))
+        np.testing.assert_array_equal(self.session.frame(key_a), self.frame_a)
+        np.testing.assert_array_equal(self.session.frame(key_b), self.frame_b)
+        prompt, = self.session.prompts()
+        self.assertEqual((prompt["prompt_line_no"], prompt["t_start"], prompt["t_end"], prompt["downloaded"]), (7, 1, 7, True))
+
+    def test_replay_serves_recorded_frames_in_order(self):
+        pyautogui = session_replay.pyautogui
+        originals = (time.sleep, time.time, time.monotonic, pyautogui.screenshot, pyautogui.click)
+        prompt, = self.session.prompts()
+        with session_replay.ReplayDriver(self.session) as driver:
+            self.assertEqual(time.sleep, driver.clock.sleep)
+            driver.seek_to_prompt(prompt)
+            # A t=1-es állapotból olvasva az első felvett olvasás (A) tartalmát kapja
+            np.testing.assert_array_equal(np.asarray(pyautogui.screenshot()), self.frame_a)
+            self.assertEqual(pyautogui.pixel(5, 5), tuple(int(c) for c in self.frame_a[5, 5]))
+            pyautogui.click(10, 12)
+            self.assertEqual(driver.matched_actions, 1)
+            self.assertGreaterEqual(driver.clock.now, 4)
+            time.sleep(5.2 - driver.clock.now)
+            np.testing.assert_array_equal(np.asarray(pyautogui.screenshot()), self.frame_b)
+            time.sleep(1.0)
+            np.testing.assert_array_equal(np.asarray(pyautogui.screenshot(region=(2, 3, 10, 8))), self.frame_a[3:11, 2:12])
+            pyautogui.press("enter")  # Nem szerepel a felvételben
+            self.assertEqual(driver.matched_actions, 1)
+            self.assertEqual([name for _t, name, _args, _kwargs in driver.actions], ["click", "press"])
+            self.assertEqual(driver.missed_pixels, 0)
+            self.assertEqual(driver.capture_calls, 4)
+        self.assertEqual((time.sleep, time.time, time.monotonic, pyautogui.screenshot, pyautogui.click), originals)
+
+    def test_backward_seek_rebuilds_the_screen(self):
+        with session_replay.ReplayDriver(self.session) as driver:
+            driver.seek(5.5)
+            np.testing.assert_array_equal(np.asarray(session_replay.pyautogui.screenshot()), self.frame_b)
+            driver.seek(2.0)
+            np.testing.assert_array_equal(np.asarray(session_replay.pyautogui.screenshot()), self.frame_a)
+
+
+if __name__ == '__main__':
+    unittest.main()
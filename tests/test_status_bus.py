@@ -0,0 +1,131 @@
+# tests/test_status_bus.py
+import contextlib
+import io
+import types
+import unittest
+from unittest import mock
+
+from core import status_bus
+from core.status_bus import StatusBus, DEBUG, INFO, WARNING, ERROR
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1700000000.0 + self.now
+
+
+class StatusBusTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _FakeClock()
+        fake_time = types.SimpleNamespace(monotonic=self.clock.monotonic, time=self.clock.time)
+        patcher = mock.patch.object(status_bus, "time", fake_time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bus = StatusBus(history_size=5)
+        self.delivered = []
+        self.sink = self.bus.add_sink("ablak", lambda entry: self.delivered.append(entry.message), min_interval_s=0.1)
+
+    def test_pending_messages_are_coalesced_per_sink(self):
+        overlay = []
+        self.bus.add_sink("overlay", lambda entry: overlay.append(entry.message), min_interval_s=0.1)
+        for message in ("első", "második", "harmadik"):
+            self.bus.publish(message)
+        self.assertEqual(self.delivered, [])  # A publish() nem kézbesít, csak a flush()
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["harmadik"])
+        self.assertEqual(overlay, ["harmadik"])
+        self.assertEqual(self.sink.coalesced_count, 2)
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["harmadik"])
+
+    def test_min_interval_limits_the_delivery_rate(self):
+        self.bus.publish("a")
+        self.bus.flush()
+        self.clock.now += 0.05
+        self.bus.publish("b")
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["a"])
+        self.clock.now += 0.06
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["a", "b"])
+
+    def test_error_is_delivered_immediately_and_clears_pending(self):
+        self.bus.publish("folyamatban")
+        self.bus.publish("elakadt", is_error=True)
+        self.assertEqual(self.delivered, ["elakadt"])
+        self.clock.now += 1.0
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["elakadt"])  # A régebbi függő üzenet nem írja felül a hibát
+        # A hiba a rátakorláthoz is számít
+        self.bus.publish("újra")
+        self.bus.flush()
+        self.clock.now += 0.05
+        self.bus.publish("még egyszer")
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["elakadt", "újra"])
+        self.bus.publish("hiba szinttel", level=ERROR)
+        self.assertEqual(self.delivered[-1], "hiba szinttel")
+
+    def test_min_level_filters_per_sink(self):
+        warnings = []
+        self.bus.add_sink("napló", lambda entry: warnings.append((entry.level, entry.message)), min_level=WARNING,
+                          min_interval_s=0.0)
+        self.bus.publish("részletek", level=DEBUG)
+        self.bus.publish("információ")
+        self.bus.flush()
+        self.assertEqual(self.delivered, ["információ"])
+        self.assertEqual(warnings, [])
+        self.bus.publish("figyelmeztetés", level=WARNING)
+        self.clock.now += 1.0
+        self.bus.flush()
+        self.assertEqual(warnings, [(WARNING, "figyelmeztetés")])
+
+    def test_disabled_sink_receives_nothing(self):
+        self.sink.enabled = False
+        self.bus.publish("a")
+        self.bus.publish("b", is_error=True)
+        self.bus.flush()
+        self.assertEqual(self.delivered, [])
+
+    def test_failing_sink_does_not_block_others(self):
+        def broken(entry):
+            raise RuntimeError("a widget már nem létezik")
+        self.bus.add_sink("hibás", broken, min_interval_s=0.0)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.bus.publish("hiba", is_error=True)
+        self.assertEqual(self.delivered, ["hiba"])
+        self.assertIn("hibás", output.getvalue())
+
+    def test_ring_buffer_keeps_the_latest_messages(self):
+        for index in range(7):
+            self.bus.publish(f"üzenet {index}", level=DEBUG if index % 2 else INFO)
+        self.assertEqual([e.message for e in self.bus.recent()], [f"üzenet {i}" for i in range(2, 7)])
+        self.assertEqual([e.message for e in self.bus.recent(2)], ["üzenet 5", "üzenet 6"])
+        self.assertEqual([e.message for e in self.bus.recent(min_level=INFO)], ["üzenet 2", "üzenet 4", "üzenet 6"])
+        entry = self.bus.recent(1)[0]
+        self.assertEqual((entry.level, entry.timestamp), (INFO, self.clock.time()))
+
+    def test_stats_counts_published_delivered_and_coalesced(self):
+        self.bus.publish("a")
+        self.bus.publish("b")
+        self.bus.flush()
+        self.bus.publish("c", is_error=True)
+        self.assertEqual(self.bus.stats(), {"published": 3, "sinks": {"ablak": {"delivered": 2, "coalesced": 1}}})
+
+
+class ResolveLevelTest(unittest.TestCase):
+    def test_explicit_level_wins_over_is_error(self):
+        self.assertEqual(status_bus.resolve_level(True), ERROR)
+        self.assertEqual(status_bus.resolve_level(False), INFO)
+        self.assertEqual(status_bus.resolve_level(True, DEBUG), DEBUG)
+        self.assertEqual(status_bus.resolve_level(False, "ismeretlen"), INFO)
+
+
+if __name__ == '__main__':
+    unittest.main()
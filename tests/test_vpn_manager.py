@@ -0,0 +1,75 @@
+# tests/test_vpn_manager.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from core.vpn_cli import VPN_STATE_CONNECTED, VPN_STATE_DISCONNECTED
+from core.vpn_manager import VpnManager
+from utils import fake_vpn_cli
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class VpnManagerFakeCliTest(unittest.TestCase):
+    """A VpnManager a hamis CLI-vel (python -m utils.fake_vpn_cli), valódi VPN és hálózat nélkül."""
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        env = {"FAKE_VPN_STATE_FILE": os.path.join(temp_dir, "state.json"),
+               "FAKE_VPN_CONNECT_DELAY_S": "0.3",
+               "FAKE_VPN_HOME_COUNTRY": "HU",
+               "PYTHONPATH": PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+        env_patch = mock.patch.dict(os.environ, env)
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        self.vpn_settings = {"cli_command": ["{python}", "-m", "utils.fake_vpn_cli"],
+                             "status_poll_timeout_s": 10, "keep_connected": False}
+        for target in ("core.vpn_manager.get_section", "core.vpn_cli.get_section"):
+            settings_patch = mock.patch(target, side_effect=self._get_section)
+            settings_patch.start()
+            self.addCleanup(settings_patch.stop)
+
+    def _get_section(self, key):
+        return dict(self.vpn_settings) if key == "vpn" else {}
+
+    def test_connect_and_disconnect_with_fake_ip_provider(self):
+        manager = VpnManager(ip_info_provider=fake_vpn_cli.fake_public_ip_info)
+        self.assertTrue(manager.connect_to_server("singapore", "SG"))
+        self.assertTrue(manager.is_connected_to_target_server)
+        self.assertEqual(manager.connected_country_code, "SG")
+        self.assertEqual(manager.base_ip_info["country_code"], "HU")
+        self.assertEqual(manager.get_status().state, VPN_STATE_CONNECTED)
+
+        self.assertTrue(manager.try_reuse_connection("singapore", "SG"))
+        self.assertTrue(manager.disconnect_vpn())
+        self.assertFalse(manager.is_connected_to_target_server)
+        self.assertEqual(manager.get_status().state, VPN_STATE_DISCONNECTED)
+        self.assertEqual(fake_vpn_cli.fake_public_ip_info()["country_code"], "HU")
+
+    def test_ip_country_mismatch_fails(self):
+        manager = VpnManager(ip_info_provider=fake_vpn_cli.fake_public_ip_info)
+        self.assertFalse(manager.connect_to_server("germany", "SG"))
+        self.assertFalse(manager.is_connected_to_target_server)
+
+    def test_verify_public_ip_disabled_skips_ip_lookup(self):
+        self.vpn_settings["verify_public_ip"] = False
+        ip_lookup = mock.Mock(side_effect=AssertionError("IP lekérdezés nem várt"))
+        manager = VpnManager(ip_info_provider=ip_lookup)
+        self.assertTrue(manager.connect_to_server("singapore", "SG"))
+        self.assertTrue(manager.is_connected_to_target_server)
+        ip_lookup.assert_not_called()
+        manager.shutdown()
+        self.assertEqual(manager.get_status().state, VPN_STATE_DISCONNECTED)
+
+    def test_failing_connect_command(self):
+        os.environ["FAKE_VPN_FAIL_CONNECT"] = "1"
+        manager = VpnManager(ip_info_provider=fake_vpn_cli.fake_public_ip_info)
+        self.assertFalse(manager.connect_to_server("singapore", "SG"))
+        self.assertEqual(manager.get_status().state, VPN_STATE_DISCONNECTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
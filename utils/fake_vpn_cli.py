@@ -0,0 +1,109 @@
+# utils/fake_vpn_cli.py
+"""
+Hamis VPN parancssori kliens a VpnManager teszteléséhez és méréséhez, valódi VPN nélkül.
+A 'nordvpn' Linuxos kliens parancsait és 'status' kimenetét utánozza; az állapotot egy
+JSON fájlban tartja, így a hívások között megmarad.
+
+Használat (settings.json):
+    "vpn": {"cli_command": ["{python}", "-m", "utils.fake_vpn_cli"], "verify_public_ip": false}
+
+A valódi publikus IP a hamis kapcsolattól nem változik, ezért a VpnManager IP ellenőrzését vagy ki
+kell kapcsolni (verify_public_ip), vagy a fake_public_ip_info-t kell átadni neki
+(VpnManager(..., ip_info_provider=fake_public_ip_info)), amely az állapotfájlból válaszol.
+
+Környezeti változók:
+    FAKE_VPN_STATE_FILE       az állapotfájl (alapértelmezés: <temp>/fake_vpn_state.json)
+    FAKE_VPN_CONNECT_DELAY_S  ennyi idő után vált "Connecting"-ről "Connected"-re (alapértelmezés: 1.5)
+    FAKE_VPN_FAIL_CONNECT     ha "1", a connect parancs hibakóddal tér vissza
+    FAKE_VPN_HOME_COUNTRY     a fake_public_ip_info országkódja bontott állapotban (alapértelmezés: HU)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+COUNTRY_BY_GROUP = {"singapore": "Singapore", "japan": "Japan", "hong_kong": "Hong Kong", "germany": "Germany"}
+COUNTRY_CODE_BY_GROUP = {"singapore": "SG", "japan": "JP", "hong_kong": "HK", "germany": "DE"}
+
+
+def _state_file():
+    return os.environ.get("FAKE_VPN_STATE_FILE") or os.path.join(tempfile.gettempdir(), "fake_vpn_state.json")
+
+
+def _load_state():
+    try:
+        with open(_state_file(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"connected_group": None, "connect_started_at": None}
+
+
+def _save_state(state):
+    with open(_state_file(), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _connect_delay_s():
+    return float(os.environ.get("FAKE_VPN_CONNECT_DELAY_S", "1.5"))
+
+
+def fake_public_ip_info(use_cache=True, **kwargs):
+    """
+    A get_public_ip_info hamis megfelelője: a kapcsolat felépülése után a csoport országát adja,
+    addig (és bontott állapotban) a FAKE_VPN_HOME_COUNTRY-t. Hálózati forgalom nélkül.
+    """
+    state = _load_state()
+    group = state.get("connected_group")
+    if group and time.time() - state["connect_started_at"] >= _connect_delay_s():
+        return {"ip": f"10.8.0.{len(group)}", "country_code": COUNTRY_CODE_BY_GROUP.get(group.lower(), group[:2].upper()),
+                "source": "fake_vpn_cli"}
+    return {"ip": "192.0.2.1", "country_code": os.environ.get("FAKE_VPN_HOME_COUNTRY", "HU"), "source": "fake_vpn_cli"}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: fake_vpn_cli connect <group> | disconnect | status", file=sys.stderr)
+        return 2
+    command, state = argv[0], _load_state()
+
+    if command in ("connect", "c"):
+        if os.environ.get("FAKE_VPN_FAIL_CONNECT") == "1":
+            print("Whoops! We couldn't connect you.", file=sys.stderr)
+            return 1
+        group = argv[1] if len(argv) > 1 else "singapore"
+        state.update(connected_group=group, connect_started_at=time.time())
+        _save_state(state)
+        print(f"Connecting to {COUNTRY_BY_GROUP.get(group.lower(), group)} #1 (fake{len(group)}.nordvpn.com)")
+        return 0
+
+    if command in ("disconnect", "d"):
+        state.update(connected_group=None, connect_started_at=None)
+        _save_state(state)
+        print("You are disconnected from NordVPN.")
+        return 0
+
+    if command == "status":
+        group = state.get("connected_group")
+        if not group:
+            print("Status: Disconnected")
+            return 0
+        if time.time() - state["connect_started_at"] < _connect_delay_s():
+            print("Status: Connecting")
+            return 0
+        country = COUNTRY_BY_GROUP.get(group.lower(), group)
+        print("Status: Connected")
+        print(f"Hostname: fake{len(group)}.nordvpn.com")
+        print(f"IP: 10.8.0.{len(group)}")
+        print(f"Country: {country}")
+        print(f"City: {country}")
+        print("Current technology: NORDLYNX")
+        return 0
+
+    print(f"Command '{command}' doesn't exist.", file=sys.stderr)
+    return 64
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# utils/image_hash.py
+import numpy as np
+
+
+def load_grayscale(image_path):
+    """Betölt egy képfájlt és szürkeárnyalatos float32 NumPy tömbként adja vissza."""
+    from PIL import Image
+    with Image.open(image_path) as img:
+        return np.asarray(img.convert("L"), dtype=np.float32)
+
+
+def _downscale(gray, rows, cols):
+    """Terület-átlagolásos kicsinyítés tiszta NumPy-ban (a széleken levágott maradékkal)."""
+    height, width = gray.shape
+    if height < rows or width < cols:
+        raise ValueError(f"A kép túl kicsi a hash-hez ({width}x{height} < {cols}x{rows}).")
+    block_h, block_w = height // rows, width // cols
+    cropped = gray[:block_h * rows, :block_w * cols]
+    return cropped.reshape(rows, block_h, cols, block_w).mean(axis=(1, 3))
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def average_hash(gray, hash_size=8):
+    """aHash: a kicsinyített kép pixelei az átlagnál világosabbak-e (hash_size*hash_size bit)."""
+    small = _downscale(gray, hash_size, hash_size)
+    return _bits_to_int(small > small.mean())
+
+
+def difference_hash(gray, hash_size=8):
+    """dHash: vízszintesen szomszédos pixelek közül a jobb oldali világosabb-e (hash_size*hash_size bit)."""
+    small = _downscale(gray, hash_size, hash_size + 1)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count("1")
+
+
+def hash_to_hex(value, hash_size=8):
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hex_to_hash(text):
+    return int(text, 16)
+
+
+def is_blank(gray, std_threshold=4.0):
+    """Egyszínű (üres, teljesen fehér/fekete/szürke) kép: a pixelértékek szórása a küszöb alatt van."""
+    return float(gray.std()) < std_threshold
+
+
+if __name__ == '__main__':
+    # Egy kép hash-einek kiírása, pl. egy ismert hibakártya felvételéhez a
+    # config/bad_output_signatures.json fájlba.
+    import sys
+    if len(sys.argv) < 2:
+        print("Használat: python -m utils.image_hash <kép> [<kép> ...]")
+        sys.exit(2)
+    for path in sys.argv[1:]:
+        gray = load_grayscale(path)
+        print(f"{path}: ahash={hash_to_hex(average_hash(gray))} dhash={hash_to_hex(difference_hash(gray))} "
+              f"std={gray.std():.2f}")
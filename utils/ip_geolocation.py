@@ -1,79 +1,142 @@
 # utils/ip_geolocation.py
-import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("FIGYELEM: A 'requests' könyvtár nincs telepítve. Az IP alapú geolokáció nem fog működni.")
     print("Telepítsd: pip install requests")
     requests = None
 
-# Opcionálisan itt definiálhatnánk egy loggert, ha a fő loggerünket akarjuk használni
-# import logging
-# logger = logging.getLogger(__name__) # Vagy a fő logger referenciája
+# API-k listája (URL, JSON kulcs az IP-hez és az országkódhoz)
+# Az ipinfo.io néha token-t kérhet nagyobb forgalomnál, de az alap ingyenes.
+DEFAULT_PROVIDERS = [
+    {"url": "https://ipinfo.io/json", "ip_key": "ip", "country_key": "country"},
+    {"url": "https://ip-api.com/json/?fields=status,message,countryCode,query", "ip_key": "query", "country_key": "countryCode"},
+    {"url": "https://freeipapi.com/api/json/", "ip_key": "ipAddress", "country_key": "countryCode"}
+]
 
-def get_public_ip_info(timeout_s=5):
+# Ennyi ideig (mp) adjuk vissza a legutóbbi eredményt új lekérdezés nélkül. A VPN állapotváltozásainál
+# a VpnManager explicit érvényteleníti (invalidate_ip_cache), így a TTL csak a közeli ismételt hívásokat fogja össze.
+DEFAULT_CACHE_TTL_S = 30
+
+_session = None
+_executor = None
+_init_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_cached_info = None
+_cached_at = None
+_cache_generation = 0   # Az invalidate_ip_cache() növeli; az előtte indult lekérdezés eredménye nem kerül a gyorsítótárba
+
+
+def _get_session():
+    """Közös, kapcsolat-újrahasznosító requests.Session (a TLS kézfogás csak egyszer fut szolgáltatónként)."""
+    global _session
+    with _init_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(DEFAULT_PROVIDERS), pool_maxsize=len(DEFAULT_PROVIDERS) * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _get_executor():
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=len(DEFAULT_PROVIDERS) * 2, thread_name_prefix="ip-lookup")
+        return _executor
+
+
+def _query_provider(provider, timeout_s):
+    """Egy szolgáltató lekérdezése; {"ip", "country_code"} vagy None."""
+    url = provider["url"]
+    try:
+        response = _get_session().get(url, timeout=timeout_s)
+        response.raise_for_status() # HTTP hibák esetén kivételt dob (4xx, 5xx)
+        data = response.json()
+
+        # Ellenőrzés, hogy az API sikeres választ adott-e (az ip-api.com esetében)
+        if not isinstance(data, dict) or data.get("status") == "fail":
+            return None
+        ip_address = data.get(provider["ip_key"])
+        country_code = data.get(provider["country_key"])
+        if ip_address and country_code:
+            return {"ip": ip_address, "country_code": str(country_code).upper(), "source": url.split('/')[2]}
+    except Exception: # Hálózati, JSON vagy bármilyen egyéb hiba: ez a szolgáltató kiesik a versenyből
+        pass
+    return None
+
+
+def invalidate_ip_cache():
+    """A gyorsítótárazott IP törlése (VPN csatlakozás/bontás után kötelező)."""
+    global _cached_info, _cached_at, _cache_generation
+    with _cache_lock:
+        _cached_info = None
+        _cached_at = None
+        _cache_generation += 1
+
+
+def get_cached_ip_info(max_age_s=DEFAULT_CACHE_TTL_S):
+    with _cache_lock:
+        if _cached_info is not None and time.monotonic() - _cached_at <= max_age_s:
+            return dict(_cached_info)
+    return None
+
+
+def get_public_ip_info(timeout_s=5, use_cache=True, max_age_s=DEFAULT_CACHE_TTL_S, providers=None):
     """
-    Lekérdezi az aktuális publikus IP címet és országkódot több külső API-n keresztül.
-    Visszaad egy dictionary-t {"ip": "x.x.x.x", "country_code": "XX"} formában,
+    Lekérdezi az aktuális publikus IP címet és országkódot.
+    Az összes szolgáltatót egyszerre kérdezi le (közös Session-nel), és az első érvényes
+    választ adja vissza, így a legrosszabb eset is kb. timeout_s (nem szolgáltatónként összeadva).
+    Visszaad egy dictionary-t {"ip": "x.x.x.x", "country_code": "XX", "source": "..."} formában,
     vagy None-t, ha nem sikerült.
+
+    use_cache=False: mindenképp friss lekérdezés (pl. a VPN ellenőrzési ciklusban).
     """
+    global _cached_info, _cached_at
     if not requests:
-        # print("Hiba: A 'requests' könyvtár nem érhető el az IP ellenőrzéshez.") # Ezt már az importnál jeleztük
-        return None
-    
-    # API-k listája (URL, JSON kulcs az országkódhoz)
-    # Az ipinfo.io néha token-t kérhet nagyobb forgalomnál, de az alap ingyenes.
-    apis_to_try = [
-        {"url": "https://ipinfo.io/json", "ip_key": "ip", "country_key": "country"},
-        {"url": "https://ip-api.com/json/?fields=status,message,countryCode,query", "ip_key": "query", "country_key": "countryCode"},
-        {"url": "https://freeipapi.com/api/json/", "ip_key": "ipAddress", "country_key": "countryCode"}
-    ]
-    
-    for api_details in apis_to_try:
-        url = api_details["url"]
-        ip_key = api_details["ip_key"]
-        country_key = api_details["country_key"]
-        
-        # print(f"IP lekérdezési kísérlet: {url}") # Debug üzenet
-        try:
-            response = requests.get(url, timeout=timeout_s)
-            response.raise_for_status() # HTTP hibák esetén kivételt dob (4xx, 5xx)
-            data = response.json()
-            
-            # Ellenőrzés, hogy az API sikeres választ adott-e (az ip-api.com esetében)
-            if "status" in data and data["status"] == "fail":
-                # print(f"IP API ({url}) 'fail' státuszt adott: {data.get('message', 'Ismeretlen hiba')}")
-                continue # Próbálkozzunk a következő API-val
-
-            ip_address = data.get(ip_key)
-            country_code = data.get(country_key)
-            
-            if ip_address and country_code:
-                # print(f"Sikeres IP lekérdezés: {ip_address}, Országkód: {country_code} (Forrás: {url.split('/')[2]})")
-                return {"ip": ip_address, "country_code": str(country_code).upper()}
-        except requests.exceptions.Timeout:
-            # print(f"Időtúllépés az IP API ({url}) elérése közben.")
-            pass # Csak logoljuk, vagy hagyjuk, hogy a hívó kezelje, ha mindegyik sikertelen
-        except requests.exceptions.RequestException as e:
-            # print(f"Hálózati hiba az IP API ({url}) elérése közben: {e}")
-            pass
-        except json.JSONDecodeError:
-            # print(f"JSON dekódolási hiba az IP API ({url}) válaszában.")
-            pass
-        except Exception as e: # Bármilyen egyéb váratlan hiba
-            # print(f"Váratlan hiba az IP API ({url}) használata közben: {e}")
-            pass
-            
-    # Ha egyik API sem adott sikeres választ
-    # print("Nem sikerült lekérdezni az IP információkat egyetlen API-ról sem.")
-    return None
+        return None # A hiányzó 'requests'-et már az importnál jeleztük
+
+    if use_cache:
+        cached = get_cached_ip_info(max_age_s)
+        if cached:
+            return cached
+
+    with _cache_lock:
+        generation = _cache_generation
+    futures = [_get_executor().submit(_query_provider, provider, timeout_s) for provider in (providers or DEFAULT_PROVIDERS)]
+    result = None
+    try:
+        for future in as_completed(futures, timeout=timeout_s + 1):
+            result = future.result()
+            if result:
+                break
+    except FuturesTimeoutError:
+        result = None
+    finally:
+        for future in futures:
+            future.cancel()  # A még el sem indult kéréseket eldobjuk; a futók a saját timeoutjukig futnak le
+
+    if result:
+        with _cache_lock:
+            if generation == _cache_generation: # Közben érvénytelenítették (pl. VPN váltás): nem tároljuk
+                _cached_info = dict(result)
+                _cached_at = time.monotonic()
+    return result
+
 
 if __name__ == '__main__':
-    # Tesztelés, ha a fájlt közvetlenül futtatjuk
+    # Tesztelés, ha a fájlt közvetlenül futtatjuk (helyi szerverekkel: tests/test_ip_geolocation.py)
     print("IP Geolokációs modul tesztelése...")
-    info = get_public_ip_info()
+    info = get_public_ip_info(use_cache=False)
     if info:
         print(f"  Lekérdezett IP: {info.get('ip')}")
         print(f"  Országkód: {info.get('country_code')}")
+        print(f"  Forrás: {info.get('source')}")
     else:
         print("  Nem sikerült lekérdezni az IP információkat.")
@@ -0,0 +1,112 @@
+# utils/phase_report.py
+"""
+A logs/prompt_phases.jsonl (és a forgatott .1, .2, ... fájlok) elemzése: szakaszonkénti
+percentilisek és a teljes idő megoszlása.
+
+Használat:
+    python -m utils.phase_report [naplófájl] [--run RUN_ID] [--outcome ok]
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+
+DEFAULT_LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "prompt_phases.jsonl")
+PERCENTILES = (50, 90, 95, 99)
+# A szakaszok megjelenítési sorrendje (a core.phase_timer.PHASES-szel egyezik; a Qt-/pyautogui-mentes
+# futtathatóság miatt nem importáljuk onnan). Az ismeretlen szakaszok a lista végére kerülnek.
+PHASE_ORDER = ("field_activation", "typing", "generate_click", "render_wait", "download_confirm", "inter_prompt_pause")
+
+
+def log_files(base_path):
+    """A forgatott fájlok a legrégebbitől a legújabbig (pl. .3, .2, .1, majd az aktuális)."""
+    rotated = [p for p in glob.glob(base_path + ".*") if p.rsplit(".", 1)[-1].isdigit()]
+    rotated.sort(key=lambda p: int(p.rsplit(".", 1)[-1]), reverse=True)
+    return rotated + ([base_path] if os.path.exists(base_path) else [])
+
+
+def load_records(base_path, run_id=None, outcome=None):
+    records = []
+    for path in log_files(base_path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Figyelmeztetés: hibás JSON sor kihagyva ({os.path.basename(path)}:{line_no})", file=sys.stderr)
+                    continue
+                if run_id and record.get("run_id") != run_id:
+                    continue
+                if outcome and record.get("outcome") != outcome:
+                    continue
+                records.append(record)
+    return records
+
+
+def percentile(sorted_values, pct):
+    """Lineáris interpolációs percentilis egy rendezett listán."""
+    if not sorted_values:
+        return float("nan")
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return sorted_values[int(rank)]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(records):
+    durations = {}
+    for record in records:
+        for phase, entry in record.get("phases", {}).items():
+            durations.setdefault(phase, []).append(float(entry.get("duration_s", 0.0)))
+    totals = sorted(float(r.get("total_s", 0.0)) for r in records)
+    ordered = [p for p in PHASE_ORDER if p in durations] + sorted(p for p in durations if p not in PHASE_ORDER)
+    grand_total = sum(totals) or 1.0
+    rows = []
+    for phase in ordered:
+        values = sorted(durations[phase])
+        rows.append({"phase": phase, "count": len(values), "sum_s": sum(values), "share": sum(values) / grand_total,
+                     "percentiles": {p: percentile(values, p) for p in PERCENTILES}, "max_s": values[-1]})
+    total_row = {"phase": "total", "count": len(totals), "sum_s": sum(totals), "share": 1.0 if totals else 0.0,
+                 "percentiles": {p: percentile(totals, p) for p in PERCENTILES}, "max_s": totals[-1] if totals else float("nan")}
+    return rows, total_row
+
+
+def format_report(records):
+    rows, total_row = summarize(records)
+    outcomes = {}
+    for record in records:
+        outcomes[record.get("outcome", "?")] = outcomes.get(record.get("outcome", "?"), 0) + 1
+    header = f"{'szakasz':<20}{'db':>6}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}{'össz.':>10}{'arány':>8}"
+    lines = [f"Rekordok: {len(records)}  Kimenetek: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())),
+             header, "-" * len(header)]
+    for row in rows + [total_row]:
+        lines.append(f"{row['phase']:<20}{row['count']:>6}"
+                     + "".join(f"{row['percentiles'][p]:>8.2f}s" for p in PERCENTILES)
+                     + f"{row['max_s']:>8.2f}s{row['sum_s']:>9.1f}s{row['share'] * 100:>7.1f}%")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.phase_report",
+                                     description="Promptonkénti szakaszidők percentilis-összesítése.")
+    parser.add_argument("log_file", nargs="?", default=DEFAULT_LOG_FILE, help="A JSONL napló (alapértelmezés: logs/prompt_phases.jsonl).")
+    parser.add_argument("--run", dest="run_id", help="Csak az adott futás (run_id) rekordjai.")
+    parser.add_argument("--outcome", help="Csak az adott kimenetelű rekordok (pl. ok).")
+    args = parser.parse_args(argv)
+
+    records = load_records(args.log_file, args.run_id, args.outcome)
+    if not records:
+        print(f"Nincs rekord: {args.log_file}")
+        return 1
+    print(format_report(records))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# utils/settings_loader.py
+import json
+import os
+import threading
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS_FILE = os.path.join(_PROJECT_ROOT, "config", "settings.json")
+
+_settings_cache = None
+_settings_lock = threading.Lock()
+
+
+def load_settings(force_reload=False):
+    """
+    Betölti a config/settings.json tartalmát (gyorsítótárazva).
+    Hiányzó vagy hibás fájl esetén üres szótárat ad vissza, hogy a hívók
+    az alapértelmezéseikkel tovább tudjanak dolgozni.
+    """
+    global _settings_cache
+    with _settings_lock:
+        if _settings_cache is not None and not force_reload:
+            return _settings_cache
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            _settings_cache = data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            _settings_cache = {}
+        except Exception as e:
+            print(f"FIGYELEM: Hiba a beállítások ({SETTINGS_FILE}) betöltésekor: {e}")
+            _settings_cache = {}
+        return _settings_cache
+
+
+def get_setting(key, default=None):
+    """Egy legfelső szintű beállítás értéke, vagy a default, ha nincs megadva."""
+    value = load_settings().get(key)
+    return default if value is None else value
+
+
+def get_section(key):
+    """Egy beágyazott beállításcsoport (szótár); ha nincs megadva, üres szótár."""
+    value = load_settings().get(key)
+    return value if isinstance(value, dict) else {}
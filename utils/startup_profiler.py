@@ -0,0 +1,115 @@
+# utils/startup_profiler.py
+import builtins
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Az aktív profilozó (csak --profile-startup esetén van beállítva).
+_active_profiler = None
+
+
+class StartupProfiler:
+    """
+    Az alkalmazásindítás idejét méri: az első alkalommal betöltött modulok importálási idejét
+    (a builtins.__import__ becsomagolásával) és a megnevezett inicializálási szakaszokat.
+    Kikapcsolt állapotban semmilyen többletköltséget nem okoz (lásd profile_section()).
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.imports = []    # (modulnév, időtartam mp, mélység)
+        self.sections = []   # (név, kezdet mp a starthoz képest, időtartam mp)
+        self.marks = []      # (név, idő mp a starthoz képest)
+        self._original_import = None
+        self._local = threading.local()
+
+    # --- Import időmérés ---
+    def install_import_hook(self):
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        original_import = self._original_import
+        profiler = self
+
+        def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level != 0 or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            depth = getattr(profiler._local, "depth", 0)
+            profiler._local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                profiler._local.depth = depth
+                profiler.imports.append((name, time.perf_counter() - start, depth))
+
+        builtins.__import__ = _timed_import
+
+    def uninstall_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # --- Szakaszok ---
+    @contextlib.contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.sections.append((name, start - self.started_at, end - start))
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.started_at))
+
+    # --- Jelentés ---
+    def as_dict(self, top_imports=20):
+        top_level_imports = sorted((i for i in self.imports if i[2] == 0), key=lambda i: i[1], reverse=True)
+        return {
+            "total_s": round(time.perf_counter() - self.started_at, 4),
+            "marks": [{"name": n, "at_s": round(t, 4)} for n, t in self.marks],
+            "sections": [{"name": n, "start_s": round(s, 4), "duration_s": round(d, 4)} for n, s, d in self.sections],
+            "imports": [{"module": n, "duration_s": round(d, 4)} for n, d, _ in top_level_imports[:top_imports]],
+        }
+
+    def report(self, top_imports=20):
+        data = self.as_dict(top_imports)
+        lines = ["=== Indítási profil (--profile-startup) ==="]
+        for mark in data["marks"]:
+            lines.append(f"  [jel]      {mark['at_s']*1000:9.1f} ms  {mark['name']}")
+        lines.append("  Szakaszok (kezdet / időtartam):")
+        for sec in data["sections"]:
+            lines.append(f"    {sec['start_s']*1000:9.1f} ms  {sec['duration_s']*1000:9.1f} ms  {sec['name']}")
+        lines.append(f"  Legdrágább legfelső szintű importok (top {top_imports}):")
+        for imp in data["imports"]:
+            lines.append(f"    {imp['duration_s']*1000:9.1f} ms  {imp['module']}")
+        lines.append(f"  Összesen: {data['total_s']*1000:.1f} ms")
+        return "\n".join(lines)
+
+    def save_json(self, file_path, top_imports=50):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(top_imports), f, indent=2, ensure_ascii=False)
+
+
+def activate_startup_profiler():
+    """Bekapcsolja a profilozást és telepíti az import-horgot. Visszaadja az aktív profilozót."""
+    global _active_profiler
+    if _active_profiler is None:
+        _active_profiler = StartupProfiler()
+        _active_profiler.install_import_hook()
+    return _active_profiler
+
+
+def get_startup_profiler():
+    return _active_profiler
+
+
+def profile_section(name):
+    """Context manager egy indítási szakasz méréséhez; kikapcsolt profilozásnál no-op."""
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.section(name)
@@ -119,3 +119,24 @@ def minimize_window_windows(window_title_substring):
     except Exception as e:
         # print(f"Hiba az ablak minimalizálása közben: {e}")
         return False
+
+
+def get_display_scale():
+    """
+    A rendszer kijelző skálázása (1.0 = 96 DPI / 100%). Windowson a rendszer DPI-ből,
+    Linuxon a GDK_SCALE / QT_SCALE_FACTOR környezeti változókból; ismeretlen esetben 1.0.
+    """
+    if platform.system() == "Windows":
+        try:
+            import ctypes
+            return round(ctypes.windll.user32.GetDpiForSystem() / 96.0, 2)
+        except Exception:
+            return 1.0
+    for env_name in ("GDK_SCALE", "QT_SCALE_FACTOR"):
+        try:
+            value = float(os.environ.get(env_name, ""))
+        except ValueError:
+            continue
+        if value > 0:
+            return round(value, 2)
+    return 1.0
@@ -1,6 +1,10 @@
 # utils/ui_scanner.py
 import pyautogui
 import time
+try:
+    import numpy as np  # A lokális (régió alapú) újrakereséshez
+except ImportError:
+    np = None
 
 # Színkonstansok
 PROMPT_AREA_WHITE_COLOR_TUPLE = (255, 255, 255) # Egzakt fehér
@@ -25,9 +29,18 @@ def is_color_prompt_area_like(color_tuple): # <<< MÓDOSÍTOTT FÜGGVÉNY
     if color_tuple is None: return False
     return color_tuple == PROMPT_AREA_WHITE_COLOR_TUPLE # Csak az egzakt fehéret fogadja el
 
+def _prompt_size_limits(screen_width, screen_height):
+    # A magasság felső határát a logban lévő (278) magassághoz igazítottam, ami kb 25% 1080p-n
+    return (int(screen_width * 0.30), int(screen_width * 0.90),
+            int(screen_height * 0.10), int(screen_height * 0.35))
+
+def is_plausible_prompt_size(width, height, screen_width, screen_height):
+    min_w, max_w, min_h, max_h = _prompt_size_limits(screen_width, screen_height)
+    return min_w <= width <= max_w and min_h <= height <= max_h
+
 def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=None):
     if notify_callback is None:
-        notify_callback = lambda msg, error=False: print(f"UI_SCANNER: {msg}")
+        notify_callback = lambda msg, **kwargs: print(f"UI_SCANNER: {msg}")
 
     seed_x = screen_width // 2
     seed_y = -1
@@ -41,7 +54,7 @@ def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=No
     for y_current in range(scan_start_y_for_seed, scan_end_y_for_seed, 20):
         color = get_pixel_color_safe_util(seed_x, y_current, screen_width, screen_height)
         if notify_callback and y_current % (20*2) == 0 : # Ritkított logolás
-            notify_callback(f"  Lefelé pásztázás Y={y_current}, talált szín: {color}")
+            notify_callback(f"  Lefelé pásztázás Y={y_current}, talált szín: {color}", level="debug")
         if is_color_prompt_area_like(color): # Most már csak (255,255,255)-re lesz True
             seed_y = y_current
             notify_callback(f"Fehér 'mag' pixel (lefelé pásztázva) található itt: ({seed_x}, {seed_y})")
@@ -58,7 +71,7 @@ def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=No
             if y_current < 0 : break
             color = get_pixel_color_safe_util(seed_x, y_current, screen_width, screen_height)
             if notify_callback and y_current % (20*2) == 0 :
-                notify_callback(f"  Felfelé pásztázás Y={y_current}, talált szín: {color}")
+                notify_callback(f"  Felfelé pásztázás Y={y_current}, talált szín: {color}", level="debug")
             if is_color_prompt_area_like(color):
                 seed_y = y_current
                 notify_callback(f"Fehér 'mag' pixel (felfelé pásztázva) található itt: ({seed_x}, {seed_y})")
@@ -110,15 +123,11 @@ def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=No
         width = r_x - l_x + 1
         height = b_y - t_y + 1
         
-        min_expected_width = int(screen_width * 0.30)
-        max_expected_width = int(screen_width * 0.90)
-        min_expected_height = int(screen_height * 0.10)
-        max_expected_height = int(screen_height * 0.35) # Ezt a határt a logodban lévő (278) magassághoz igazítottam, ami kb 25% 1080p-n
+        min_expected_width, max_expected_width, min_expected_height, max_expected_height = _prompt_size_limits(screen_width, screen_height)
 
         notify_callback(f"Talált terület mérete: {width}x{height}. Várt határok: W:[{min_expected_width}-{max_expected_width}], H:[{min_expected_height}-{max_expected_height}]")
 
-        if not (min_expected_width <= width <= max_expected_width and \
-                min_expected_height <= height <= max_expected_height):
+        if not is_plausible_prompt_size(width, height, screen_width, screen_height):
             notify_callback(f"Talált világos terület mérete ({width}x{height}) kívül esik a várható prompt mező méretein.", is_error=True)
             return None
         
@@ -136,7 +145,7 @@ def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notif
         if notify_callback: notify_callback("Generálás gomb keresés: Nincs érvényes prompt terület.", is_error=True)
         return None
     if notify_callback is None:
-        notify_callback = lambda msg, error=False: print(f"UI_SCANNER: {msg}")
+        notify_callback = lambda msg, **kwargs: print(f"UI_SCANNER: {msg}")
 
     x_scan_start = prompt_rect['x'] + prompt_rect['width'] - 1
     x_scan_width_percentage = 0.25 
@@ -153,7 +162,7 @@ def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notif
         for y_current in range(y_scan_start, max(prompt_rect['y']-1, y_end_limit -1), -1): 
             pixel_scan_count +=1
             if pixel_scan_count % 500 == 0: 
-                notify_callback(f"  Gen.gomb scan: ({x_current},{y_current})")
+                notify_callback(f"  Gen.gomb scan: ({x_current},{y_current})", level="debug")
 
             color = get_pixel_color_safe_util(x_current, y_current, screen_width, screen_height)
             if color == GENERATE_BUTTON_COLOR_TARGET:
@@ -164,3 +173,115 @@ def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notif
     
     notify_callback(f"Generálás gomb színe ({GENERATE_BUTTON_COLOR_TARGET}) nem található a relatív régióban ({pixel_scan_count} pixel ellenőrizve).", is_error=True)
     return None
+
+
+# --- Lokális újrakeresés az utolsó ismert pozíció körül ---
+# Az oldal elrendezése gyakran csak néhány pixelt csúszik; ilyenkor a teljes képernyős, pixelenkénti
+# keresés helyett egy, a régi pozíció köré fokozatosan bővülő ablakról készítünk EGY képernyőképet
+# lépésenként, és numpy-jal, vektorizáltan keressük benne az elemet.
+
+def capture_region_array(left, top, width, height, screen_width, screen_height):
+    """A képernyő egy (képernyőre vágott) régiója numpy tömbként (H, W, 3), és a tényleges (left, top)."""
+    left, top = max(0, left), max(0, top)
+    width, height = min(width, screen_width - left), min(height, screen_height - top)
+    if width <= 0 or height <= 0:
+        return None, left, top
+    image = pyautogui.screenshot(region=(left, top, width, height)).convert("RGB")
+    return np.asarray(image), left, top
+
+def _expanding_windows(left, top, right, bottom, step_px, max_expand_px):
+    margin = step_px
+    while margin <= max_expand_px:
+        yield margin, (left - margin, top - margin, right - left + 2 * margin, bottom - top + 2 * margin)
+        margin += step_px
+
+def _nearest_true(mask, anchor_x, anchor_y):
+    """A maszk anchor-hoz legközelebbi igaz pixelének (x, y) indexe, vagy None."""
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        return None
+    index = int(np.argmin((xs - anchor_x) ** 2 + (ys - anchor_y) ** 2))
+    return int(xs[index]), int(ys[index])
+
+def _run_bounds(line, index):
+    """Az index körüli összefüggő igaz szakasz [kezdet, vég] határai egy 1D bool tömbben."""
+    before = np.nonzero(~line[:index + 1])[0]
+    after = np.nonzero(~line[index:])[0]
+    start = int(before[-1]) + 1 if len(before) else 0
+    end = index + int(after[0]) - 1 if len(after) else len(line) - 1
+    return start, end
+
+def find_prompt_area_near(last_rect, screen_width, screen_height, step_px=40, max_expand_px=240, notify_callback=None):
+    """
+    A prompt terület keresése az utolsó ismert téglalap körül, lépésenként bővülő ablakban.
+    A find_prompt_area_dynamically-val azonos formátumú téglalapot ad, vagy None-t, ha
+    max_expand_px-en belül nincs zárt, ésszerű méretű fehér terület.
+    """
+    if notify_callback is None:
+        notify_callback = lambda msg, **kwargs: print(f"UI_SCANNER: {msg}")
+    if np is None or not last_rect:
+        return None
+    started = time.perf_counter()
+    right, bottom = last_rect['x'] + last_rect['width'], last_rect['y'] + last_rect['height']
+    for margin, (left, top, width, height) in _expanding_windows(last_rect['x'], last_rect['y'], right, bottom, step_px, max_expand_px):
+        try:
+            pixels, left, top = capture_region_array(left, top, width, height, screen_width, screen_height)
+        except Exception as e_capture:
+            notify_callback(f"Hiba a lokális prompt keresés képernyőképénél: {e_capture}", is_error=True)
+            return None
+        if pixels is None:
+            return None
+        mask = np.all(pixels == PROMPT_AREA_WHITE_COLOR_TUPLE, axis=-1)
+        # A mag a mező alsó részén van (oda a beírt szöveg nem ér el); a magasságot több oszlopban
+        # mérjük, és a leghosszabbat vesszük, mert a szöveg csak rövidítheti a fehér szakaszt.
+        seed = _nearest_true(mask, last_rect['center_x'] - left, last_rect['y'] + int(last_rect['height'] * 0.85) - top)
+        if seed is None:
+            continue
+        seed_x, seed_y = seed
+        l_x, r_x = _run_bounds(mask[seed_y, :], seed_x)
+        inset = min(8, (r_x - l_x) // 2)
+        t_y, b_y = max((_run_bounds(mask[:, column], seed_y) for column in (l_x + inset, (l_x + r_x) // 2, r_x - inset)),
+                       key=lambda bounds: bounds[1] - bounds[0])
+        h, w = mask.shape
+        # Ha a terület az ablak szélébe ér (és az nem a képernyő széle), még nem láttuk az egészet: bővítünk.
+        touches_edge = ((l_x == 0 and left > 0) or (t_y == 0 and top > 0) or
+                        (r_x == w - 1 and left + w < screen_width) or (b_y == h - 1 and top + h < screen_height))
+        if touches_edge:
+            continue
+        width, height = r_x - l_x + 1, b_y - t_y + 1
+        if not is_plausible_prompt_size(width, height, screen_width, screen_height):
+            continue
+        abs_x, abs_y = left + l_x, top + t_y
+        prompt_rect = {'x': abs_x, 'y': abs_y, 'width': width, 'height': height,
+                       'center_x': abs_x + width // 2, 'center_y': abs_y + height // 2}
+        notify_callback(f"Prompt terület lokálisan újra megtalálva (±{margin}px, {(time.perf_counter() - started) * 1000:.0f} ms): {prompt_rect}")
+        return prompt_rect
+    notify_callback(f"A prompt terület nem található az előző pozíció ±{max_expand_px}px környezetében.", level="debug")
+    return None
+
+def find_generate_button_near(last_point, screen_width, screen_height, step_px=20, max_expand_px=160, notify_callback=None):
+    """
+    A generálás gomb színének keresése az utolsó ismert kattintási pont körül bővülő ablakban;
+    a ponthoz legközelebbi egyező pixelt adja vissza (x, y) formában, vagy None-t.
+    """
+    if notify_callback is None:
+        notify_callback = lambda msg, **kwargs: print(f"UI_SCANNER: {msg}")
+    if np is None or not last_point or GENERATE_BUTTON_COLOR_TARGET is None:
+        return None
+    started = time.perf_counter()
+    last_x, last_y = last_point
+    for margin, (left, top, width, height) in _expanding_windows(last_x, last_y, last_x + 1, last_y + 1, step_px, max_expand_px):
+        try:
+            pixels, left, top = capture_region_array(left, top, width, height, screen_width, screen_height)
+        except Exception as e_capture:
+            notify_callback(f"Hiba a lokális generálás gomb keresés képernyőképénél: {e_capture}", is_error=True)
+            return None
+        if pixels is None:
+            return None
+        match = _nearest_true(np.all(pixels == GENERATE_BUTTON_COLOR_TARGET, axis=-1), last_x - left, last_y - top)
+        if match:
+            found = (left + match[0], top + match[1])
+            notify_callback(f"Generálás gomb lokálisan újra megtalálva (±{margin}px, {(time.perf_counter() - started) * 1000:.0f} ms): {found}")
+            return found
+    notify_callback(f"A generálás gomb nem található az előző pozíció ±{max_expand_px}px környezetében.", level="debug")
+    return None
@@ -0,0 +1,100 @@
+# utils/window_finder.py
+import collections
+import platform
+import shutil
+import subprocess
+
+try:
+    import pygetwindow  # Windows/macOS ablakkezelés (opcionális)
+except ImportError:
+    pygetwindow = None
+
+WindowInfo = collections.namedtuple("WindowInfo", ["window_id", "title", "backend"])
+
+
+def _run(args, timeout_s=3):
+    try:
+        process = subprocess.run(args, capture_output=True, text=True, timeout=timeout_s, check=False)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return process.stdout if process.returncode == 0 else None
+
+
+def _list_windows_wmctrl():
+    # "0x03a00007  0 host Whisk - Google Chrome" -> az első három oszlop után a cím
+    output = _run(["wmctrl", "-l"])
+    windows = []
+    for line in (output or "").splitlines():
+        parts = line.split(None, 3)
+        if len(parts) == 4:
+            windows.append(WindowInfo(parts[0], parts[3], "wmctrl"))
+    return windows
+
+
+def _list_windows_xdotool(title_keyword):
+    output = _run(["xdotool", "search", "--onlyvisible", "--name", title_keyword])
+    windows = []
+    for window_id in (output or "").split():
+        title = (_run(["xdotool", "getwindowname", window_id]) or "").strip()
+        windows.append(WindowInfo(window_id, title, "xdotool"))
+    return windows
+
+
+def is_window_lookup_available():
+    """Van-e a platformon használható ablaklistázó eszköz (különben a find_windows mindig üres)."""
+    if platform.system() == "Linux":
+        return bool(shutil.which("wmctrl") or shutil.which("xdotool"))
+    return pygetwindow is not None
+
+
+def find_windows(title_keywords):
+    """
+    A látható felső szintű ablakok közül azokat adja vissza (WindowInfo lista), amelyek címe
+    tartalmazza valamelyik kulcsszót (kis-/nagybetű független). A böngészőablak címe az aktív lap címe.
+    Linuxon (X11) wmctrl, ennek hiányában xdotool; Windowson/macOS-en pygetwindow kell hozzá.
+    """
+    keywords = [k.lower() for k in title_keywords if k]
+    if not keywords:
+        return []
+    if platform.system() == "Linux":
+        if shutil.which("wmctrl"):
+            candidates = _list_windows_wmctrl()
+        elif shutil.which("xdotool"):
+            by_id = {w.window_id: w for keyword in title_keywords for w in _list_windows_xdotool(keyword)}
+            candidates = list(by_id.values())
+        else:
+            return []
+    elif pygetwindow:
+        try:
+            candidates = [WindowInfo(w, w.title, "pygetwindow") for w in pygetwindow.getAllWindows() if w.title]
+        except Exception:
+            return []
+    else:
+        return []
+    return [w for w in candidates if any(k in w.title.lower() for k in keywords)]
+
+
+def activate_window(window):
+    """Előtérbe hozza az ablakot. True, ha a parancs sikeres volt."""
+    if window.backend == "wmctrl":
+        return _run(["wmctrl", "-i", "-a", window.window_id]) is not None
+    if window.backend == "xdotool":
+        return _run(["xdotool", "windowactivate", "--sync", window.window_id], timeout_s=5) is not None
+    if window.backend == "pygetwindow":
+        try:
+            if window.window_id.isMinimized:
+                window.window_id.restore()
+            window.window_id.activate()
+            return True
+        except Exception:
+            return False
+    return False
+
+
+if __name__ == '__main__':
+    import sys
+    keywords = sys.argv[1:] or ["Whisk"]
+    found = find_windows(keywords)
+    print(f"{len(found)} ablak a(z) {keywords} kulcsszavakra:")
+    for w in found:
+        print(f"  [{w.backend}] {w.window_id if w.backend != 'pygetwindow' else ''} {w.title}")